@@ -0,0 +1,286 @@
+import asyncio
+import logging
+import sys
+from typing import Optional
+from bson import ObjectId
+from pymongo import UpdateOne
+from app.db import db
+from app.board_version import bump_board_versions
+from app.transactions import in_order
+
+# 📌 **Dashboard labels** (DB value -> response key)
+STATUS_KEYS = {"Not Started": "not_started", "Working on It": "working_on_it", "Done": "done"}
+PRIORITY_KEYS = {"High": "high", "Medium": "medium", "Low": "low"}
+
+def _priority_count(priority: str) -> dict:
+    return {"$sum": {"$cond": [{"$eq": ["$priority", priority]}, 1, 0]}}
+
+def dashboard_pipeline(group_oid: ObjectId) -> list:
+    """
+    Single aggregation for the board dashboard.
+    One facet groups by (status, priority), the other counts the tasks of every assignee,
+    so only counts leave the server no matter how big the board is.
+    """
+    return [
+        {"$match": {"board_id": group_oid}},
+        {"$facet": {
+            "by_status_priority": [
+                {"$group": {"_id": {"status": "$status", "priority": "$priority"}, "count": {"$sum": 1}}},
+            ],
+            "by_assignee": [
+                {"$unwind": "$assigned_to"},
+                {"$group": {
+                    # assigned_to holds both str and ObjectId values, normalize before grouping
+                    "_id": {"$toString": "$assigned_to"},
+                    "total": {"$sum": 1},
+                    **{key: _priority_count(priority) for priority, key in PRIORITY_KEYS.items()},
+                }},
+            ],
+        }},
+    ]
+
+def assignee_tasks_pipeline(group_oid: ObjectId, user_ids: list, per_assignee: int) -> list:
+    """
+    The first `per_assignee` tasks (by `_id`) of each of `user_ids` on a board, grouped by assignee.
+    Served by the `board_assigned_to` index; the full lists are paged through `GET /api/tasks/user/...`.
+    """
+    assigned = [*user_ids, *(ObjectId(user_id) for user_id in user_ids)]
+    return [
+        {"$match": {"board_id": group_oid, "assigned_to": {"$in": assigned}}},
+        {"$sort": {"_id": 1}},
+        {"$project": {"title": 1, "status": 1, "priority": 1, "assigned_to": 1}},
+        {"$unwind": "$assigned_to"},
+        {"$match": {"assigned_to": {"$in": assigned}}},
+        # ✅ `$firstN` (MongoDB 5.2+) keeps at most `per_assignee` tasks in memory per group,
+        # the first ones in `_id` order since the input is sorted
+        {"$group": {
+            "_id": {"$toString": "$assigned_to"},
+            "tasks": {"$firstN": {"n": per_assignee, "input": {
+                "task_id": {"$toString": "$_id"},
+                "title": "$title",
+                "status": "$status",
+                "priority": "$priority",
+            }}},
+        }},
+    ]
+
+def summarize_status_priority(rows: list) -> dict:
+    """Fold the (status, priority) group rows into the dashboard count fields."""
+    status_counts = {key: 0 for key in STATUS_KEYS.values()}
+    priority_counts = {key: 0 for key in PRIORITY_KEYS.values()}
+    priority_breakdown = {p: {s: 0 for s in STATUS_KEYS.values()} for p in PRIORITY_KEYS.values()}
+    total = 0
+
+    for row in rows:
+        count = row["count"]
+        status_key = STATUS_KEYS.get(row["_id"].get("status"))
+        priority_key = PRIORITY_KEYS.get(row["_id"].get("priority"))
+        total += count
+        if status_key:
+            status_counts[status_key] += count
+        if priority_key:
+            priority_counts[priority_key] += count
+        if status_key and priority_key:
+            priority_breakdown[priority_key][status_key] += count
+
+    return {
+        "total": total,
+        "status_counts": status_counts,
+        "priority_counts": priority_counts,
+        "priority_breakdown": priority_breakdown,
+    }
+
+### 📌 **board_stats documents**
+# {
+#   "_id": <group ObjectId>,
+#   "total": int,
+#   "status": {"not_started": int, "working_on_it": int, "done": int},
+#   "priority": {"high": int, "medium": int, "low": int},
+#   "breakdown": {"high": {"not_started": int, ...}, ...},
+#   "assignees": {"<user_id>": {"total": int, "high": int, "medium": int, "low": int}}
+# }
+# Only counters, so the document stays small however many tasks the board has; the task lists
+# of the dashboard come from an indexed query on `tasks` (see `assignee_tasks_pipeline`).
+
+def empty_stats(group_oid: ObjectId) -> dict:
+    """A zeroed counter document for a brand new board."""
+    return {
+        "_id": group_oid,
+        "total": 0,
+        "status": {key: 0 for key in STATUS_KEYS.values()},
+        "priority": {key: 0 for key in PRIORITY_KEYS.values()},
+        "breakdown": {p: {s: 0 for s in STATUS_KEYS.values()} for p in PRIORITY_KEYS.values()},
+        "assignees": {},
+    }
+
+# The task fields the counters depend on (besides `board_id`)
+COUNTED_FIELDS = ("status", "priority", "assigned_to")
+
+def _assignee_ids(task: dict) -> set:
+    return {str(uid) for uid in task.get("assigned_to") or [] if ObjectId.is_valid(str(uid))}
+
+def _contribution(task: dict) -> dict:
+    """The counters a single task adds to its board's stats."""
+    counts = {"total": 1}
+    status_key = STATUS_KEYS.get(task.get("status"))
+    priority_key = PRIORITY_KEYS.get(task.get("priority"))
+
+    if status_key:
+        counts[f"status.{status_key}"] = 1
+    if priority_key:
+        counts[f"priority.{priority_key}"] = 1
+    if status_key and priority_key:
+        counts[f"breakdown.{priority_key}.{status_key}"] = 1
+
+    for uid in _assignee_ids(task):
+        counts[f"assignees.{uid}.total"] = 1
+        if priority_key:
+            counts[f"assignees.{uid}.{priority_key}"] = 1
+    return counts
+
+def stats_update(before: Optional[dict], after: Optional[dict]) -> dict:
+    """
+    Build the `$inc` update that moves a board's stats from `before` to `after`.
+    Either side may be None (task created / deleted). Returns {} when nothing changes.
+    """
+    before_counts = _contribution(before) if before else {}
+    after_counts = _contribution(after) if after else {}
+
+    inc = {}
+    for path in set(before_counts) | set(after_counts):
+        delta = after_counts.get(path, 0) - before_counts.get(path, 0)
+        if delta:
+            inc[path] = delta
+    return {"$inc": inc} if inc else {}
+
+async def record_task_change(before: Optional[dict], after: Optional[dict], session=None):
+    """
+    Apply one task write to its board's counters in a single atomic update,
+    then bump the board version (inside `session` when the task write is part of a transaction).
+    Boards without a stats document (created before counters existed) are skipped;
+    their stats get built from scratch on the next dashboard read.
+    """
+    task = after or before
+    if not task or not task.get("board_id"):
+        return
+    board_oid = ObjectId(task["board_id"])
+    writes = []
+    update = stats_update(before, after)
+    if update:
+        writes.append(lambda s: db.board_stats.update_one({"_id": board_oid}, update, session=s))
+    # ✅ The version goes last: a reader revalidating right after it must see the new data
+    writes.append(lambda s: bump_board_versions([board_oid], session=s))
+    await in_order(writes, session)
+
+def merge_stats_updates(updates: list) -> dict:
+    """Combine several `stats_update` results for the same board into one `$inc`."""
+    inc = {}
+    for update in updates:
+        for path, delta in update.get("$inc", {}).items():
+            inc[path] = inc.get(path, 0) + delta
+    inc = {path: delta for path, delta in inc.items() if delta}
+    return {"$inc": inc} if inc else {}
+
+async def record_task_changes(changes: list):
+    """
+    Apply many `(before, after)` task changes with one `bulk_write`,
+    folding all changes of a board into a single update, then bump every touched board's version.
+    """
+    per_board = {}
+    for before, after in changes:
+        task = after or before
+        if task and task.get("board_id"):
+            per_board.setdefault(ObjectId(task["board_id"]), []).append(stats_update(before, after))
+
+    requests = []
+    for board_oid, updates in per_board.items():
+        update = merge_stats_updates(updates)
+        if update:
+            requests.append(UpdateOne({"_id": board_oid}, update))
+    if requests:
+        await db.board_stats.bulk_write(requests, ordered=False)
+    await bump_board_versions(per_board)
+
+async def remove_assignee(group_oid: ObjectId, user_id: str):
+    """Drop every counter of a user that was just unassigned from all tasks on the board."""
+    await remove_assignees(group_oid, [user_id])
+
+async def remove_assignees(group_oid: ObjectId, user_ids: list, session=None):
+    """`remove_assignee` for many users in one update."""
+    unset = {f"assignees.{user_id}": "" for user_id in user_ids}
+    await db.board_stats.update_one({"_id": group_oid}, {"$unset": unset}, session=session)
+
+async def rebuild_board_stats(group_oid: ObjectId) -> dict:
+    """
+    Recompute one board's stats from its tasks and overwrite the stored document.
+    Writes that land while the aggregation runs may be lost; rerun if the board was busy.
+    """
+    result = await db.tasks.aggregate(dashboard_pipeline(group_oid)).to_list(length=1)
+    facets = result[0] if result else {"by_status_priority": [], "by_assignee": []}
+    summary = summarize_status_priority(facets["by_status_priority"])
+
+    stats = empty_stats(group_oid)
+    stats["total"] = summary["total"]
+    stats["status"] = summary["status_counts"]
+    stats["priority"] = summary["priority_counts"]
+    stats["breakdown"] = summary["priority_breakdown"]
+    for row in facets["by_assignee"]:
+        if not ObjectId.is_valid(row["_id"]):
+            continue
+        stats["assignees"][row["_id"]] = {"total": row["total"], **{key: row[key] for key in PRIORITY_KEYS.values()}}
+
+    await db.board_stats.replace_one({"_id": group_oid}, stats, upsert=True)
+    return stats
+
+async def rebuild_all_board_stats() -> int:
+    """Repair command: rebuild the counters of every board. Returns the number of boards rebuilt."""
+    count = 0
+    async for group in db.groups.find({}, {"_id": 1}):
+        await rebuild_board_stats(group["_id"])
+        count += 1
+    # ✅ Clean up counters of boards that no longer exist
+    await db.board_stats.delete_many({"_id": {"$nin": await db.groups.distinct("_id")}})
+    return count
+
+def active_assignees(stats: dict) -> list:
+    """Ids of the users that still have tasks assigned on the board."""
+    return [user_id for user_id, entry in stats["assignees"].items() if entry.get("total", 0) > 0]
+
+def format_dashboard(stats: dict, users: list, tasks_by_assignee: dict) -> dict:
+    """
+    Turn a stats document, the assignees' user documents and their task lists
+    (`assignee_tasks_pipeline` rows keyed by user id) into the dashboard response.
+    """
+    assigned_tasks = []
+    for user in users:
+        entry = stats["assignees"].get(str(user["_id"]))
+        tasks = tasks_by_assignee.get(str(user["_id"]))
+        if not entry or not tasks:
+            continue
+        assigned_tasks.append({
+            "name": user["username"],
+            "tasks": tasks,
+            **{key: entry.get(key, 0) for key in PRIORITY_KEYS.values()},
+        })
+
+    return {
+        "total": stats["total"],
+        "status_counts": stats["status"],
+        "priority_counts": stats["priority"],
+        "assigned_tasks": assigned_tasks,
+        "priority_breakdown": stats["breakdown"],
+    }
+
+# 📌 **CLI**: `python -m app.board_stats [board_id]` rebuilds one board, or all boards when omitted
+async def _main(board_ids: list):
+    if not board_ids:
+        count = await rebuild_all_board_stats()
+        logging.info(f"✅ Rebuilt stats for {count} boards")
+        return
+    for board_id in board_ids:
+        stats = await rebuild_board_stats(ObjectId(board_id))
+        logging.info(f"✅ Rebuilt stats for board {board_id}: {stats['total']} tasks")
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_main(sys.argv[1:]))
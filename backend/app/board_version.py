@@ -0,0 +1,40 @@
+from typing import Optional
+from bson import ObjectId
+from fastapi import Request, Response
+from app.db import db
+from app.read_routing import PRIMARY_READS, RoutedReads
+
+# 📌 **Board versions**
+# `groups.version` is incremented by every task or membership write on the board.
+# Board reads derive their ETag from it, so an unchanged board is answered with a 304
+# after a single `find_one` on the group, without running the actual query.
+BOARD_VERSION_INC = {"$inc": {"version": 1}}
+
+async def bump_board_versions(board_ids, session=None):
+    board_ids = list({ObjectId(board_id) for board_id in board_ids})
+    if len(board_ids) == 1:
+        await db.groups.update_one({"_id": board_ids[0]}, BOARD_VERSION_INC, session=session)
+    elif board_ids:
+        await db.groups.update_many({"_id": {"$in": board_ids}}, BOARD_VERSION_INC, session=session)
+
+async def board_version(board_oid: ObjectId, reads: RoutedReads = PRIMARY_READS) -> Optional[int]:
+    """Current version of a board, or None when the board does not exist."""
+    group = await reads.db.groups.find_one({"_id": board_oid}, {"version": 1}, session=reads.session)
+    return group.get("version", 0) if group else None
+
+def board_etag(kind: str, board_id, version: int, page=None) -> str:
+    """Strong ETag of a board read; paginated reads pass their `PageParams` so every page has its own."""
+    if page is None:
+        return f'"{kind}-{board_id}-v{version}"'
+    return f'"{kind}-{board_id}-v{version}-l{page.limit}-a{page.after or 0}"'
+
+def not_modified(request: Request, etag: str) -> Optional[Response]:
+    """A 304 response when the client already holds `etag`, else None."""
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+    return None
+
+def set_etag(response: Response, etag: str):
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"  # always revalidate, the 304 is cheap
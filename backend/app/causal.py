@@ -0,0 +1,154 @@
+import base64
+import binascii
+import threading
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import Optional
+import bson
+from bson.errors import BSONError
+from pymongo import monitoring
+from starlette.datastructures import Headers, MutableHeaders
+from app.config import settings
+
+# 📌 **Read-your-writes across requests**
+# Reads routed to secondaries (app/read_routing.py) may lag behind the primary. To let a user see
+# their own writes anyway, `causal_listener` picks the `operationTime` / `$clusterTime` out of every
+# write reply on a replica set and keeps the latest one on the request. When the response starts,
+# `CausalConsistencyMiddleware` returns it as an `X-Causal-Token` header and remembers it for the
+# caller (keyed by its Authorization header). A later read from the same caller, or one that sends
+# the token back, runs in a causally consistent session advanced to that point, so the secondary
+# waits until it has applied the write before answering. Standalone servers report no
+# `operationTime`, so nothing is tracked there.
+CAUSAL_TOKEN_HEADER = "X-Causal-Token"
+WRITE_COMMANDS = {"insert", "update", "delete", "findAndModify"}
+
+class CausalPoint:
+    """The latest write a request knows about: `(operationTime, $clusterTime)`."""
+    __slots__ = ("operation_time", "cluster_time")
+
+    def __init__(self, operation_time=None, cluster_time=None):
+        self.operation_time = operation_time
+        self.cluster_time = cluster_time
+
+    def advance(self, other: Optional["CausalPoint"]):
+        if other is None:
+            return
+        if other.operation_time is not None and (self.operation_time is None or other.operation_time > self.operation_time):
+            self.operation_time = other.operation_time
+        if other.cluster_time is not None and (
+            self.cluster_time is None or other.cluster_time["clusterTime"] > self.cluster_time["clusterTime"]
+        ):
+            self.cluster_time = other.cluster_time
+
+    def __bool__(self):
+        return self.operation_time is not None
+
+def encode_token(point: CausalPoint) -> str:
+    document = {"o": point.operation_time}
+    if point.cluster_time is not None:
+        document["c"] = point.cluster_time
+    return base64.urlsafe_b64encode(bson.encode(document)).decode().rstrip("=")
+
+def decode_token(token: str) -> Optional[CausalPoint]:
+    """None for anything that is not a token issued by `encode_token`."""
+    try:
+        document = bson.decode(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+    except (binascii.Error, BSONError, ValueError):
+        return None
+    operation_time, cluster_time = document.get("o"), document.get("c")
+    if not isinstance(operation_time, bson.Timestamp):
+        return None
+    if not (isinstance(cluster_time, dict) and isinstance(cluster_time.get("clusterTime"), bson.Timestamp)):
+        cluster_time = None
+    return CausalPoint(operation_time, cluster_time)
+
+### 📌 **Latest write per caller**
+class CallerClocks:
+    """LRU map of caller key -> latest `CausalPoint` written by that caller in this process."""
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._points = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Optional[str]) -> Optional[CausalPoint]:
+        if key is None:
+            return None
+        with self._lock:
+            point = self._points.get(key)
+            return CausalPoint(point.operation_time, point.cluster_time) if point else None
+
+    def record(self, key: Optional[str], point: CausalPoint):
+        if key is None or not point:
+            return
+        with self._lock:
+            stored = self._points.pop(key, None) or CausalPoint()
+            stored.advance(point)
+            self._points[key] = stored
+            while len(self._points) > self.max_size:
+                self._points.popitem(last=False)
+
+caller_clocks = CallerClocks(settings.CAUSAL_CALLERS)
+
+class RequestClock:
+    def __init__(self, caller: Optional[str], read_after: Optional[CausalPoint]):
+        self.caller = caller
+        self.read_after = read_after  # what this request's reads must observe
+        self.written = CausalPoint()  # what this request wrote
+        self._lock = threading.Lock()
+
+    def add_write(self, point: CausalPoint):
+        with self._lock:
+            self.written.advance(point)
+
+_current_clock: ContextVar[Optional[RequestClock]] = ContextVar("causal_clock", default=None)
+
+def read_after() -> Optional[CausalPoint]:
+    """The point the current request's secondary reads have to catch up with, if any."""
+    clock = _current_clock.get()
+    return clock.read_after if clock else None
+
+### 📌 **MongoDB command listener**
+class CausalListener(monitoring.CommandListener):
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        if event.command_name not in WRITE_COMMANDS:
+            return
+        clock = _current_clock.get()
+        operation_time = event.reply.get("operationTime")
+        if clock is not None and operation_time is not None:
+            clock.add_write(CausalPoint(operation_time, event.reply.get("$clusterTime")))
+
+    def failed(self, event):
+        pass
+
+causal_listener = CausalListener()
+
+### 📌 **ASGI middleware**
+class CausalConsistencyMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        caller = headers.get("authorization")
+        read_after = caller_clocks.get(caller) or CausalPoint()
+        read_after.advance(decode_token(headers.get(CAUSAL_TOKEN_HEADER, "")))
+        clock = RequestClock(caller, read_after if read_after else None)
+        token = _current_clock.set(clock)
+
+        async def send_with_token(message):
+            if message["type"] == "http.response.start" and clock.written:
+                caller_clocks.record(caller, clock.written)
+                MutableHeaders(scope=message)[CAUSAL_TOKEN_HEADER] = encode_token(clock.written)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_token)
+        finally:
+            _current_clock.reset(token)
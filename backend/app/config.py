@@ -5,7 +5,59 @@ load_dotenv()  # Load environment variables from .env file
 
 class Settings:
     MONGO_URI: str = os.getenv("MONGO_URI", "mongodb://localhost:27017")
-    DB_NAME: str = os.getenv("DB_NAME", "task_manager")
+    DB_NAME: str = os.getenv("DB_NAME", "test_db" if os.getenv("PYTEST_RUNNING") else "task_manager")
     PORT: int = int(os.getenv("PORT", 8000))
 
+    # Board dashboard: tasks listed per assignee (the counts always cover every task; page the rest
+    # through `GET /api/tasks/user/{user_id}`)
+    DASHBOARD_TASKS_PER_ASSIGNEE: int = int(os.getenv("DASHBOARD_TASKS_PER_ASSIGNEE", 100))
+
+    # MongoDB connection pool (app/db.py): one client for the whole process
+    MONGO_MAX_POOL_SIZE: int = int(os.getenv("MONGO_MAX_POOL_SIZE", 100))
+    MONGO_MIN_POOL_SIZE: int = int(os.getenv("MONGO_MIN_POOL_SIZE", 10))  # opened at startup
+    MONGO_MAX_IDLE_TIME_MS: int = int(os.getenv("MONGO_MAX_IDLE_TIME_MS", 300000))
+    MONGO_COMPRESSORS: str = os.getenv("MONGO_COMPRESSORS", "zstd,snappy,zlib")  # first one the server also supports wins
+    MONGO_CONNECT_TIMEOUT_MS: int = int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", 5000))
+    MONGO_SERVER_SELECTION_TIMEOUT_MS: int = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", 5000))
+    MONGO_SOCKET_TIMEOUT_MS: int = int(os.getenv("MONGO_SOCKET_TIMEOUT_MS", 30000))
+    MONGO_WAIT_QUEUE_TIMEOUT_MS: int = int(os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", 5000))  # wait for a free pooled connection
+    # Multi-document writes (app/transactions.py): "auto" uses transactions on replica sets, else plain ordered writes
+    MONGO_TRANSACTIONS: str = os.getenv("MONGO_TRANSACTIONS", "auto")
+
+    # Read routing (app/read_routing.py, app/causal.py): read preference per route, read-your-writes via causal sessions
+    READ_POLICY: str = os.getenv(
+        "READ_POLICY",
+        "get_board_dashboard=secondaryPreferred,get_tasks=secondaryPreferred,"
+        "get_users_tasks=secondaryPreferred,get_all_users=secondaryPreferred",
+    )
+    READ_MAX_STALENESS_SECONDS: int = int(os.getenv("READ_MAX_STALENESS_SECONDS", -1))  # -1 = no limit, else >= 90
+    CAUSAL_CALLERS: int = int(os.getenv("CAUSAL_CALLERS", 10000))  # callers whose latest write is remembered
+
+    # Authentication: "db" loads the user on every request, "stateless" trusts the signed JWT claims
+    AUTH_MODE: str = os.getenv("AUTH_MODE", "db")
+    REVOCATION_REFRESH_SECONDS: int = int(os.getenv("REVOCATION_REFRESH_SECONDS", 30))
+
+    # In-process user directory cache (app/user_directory.py)
+    USER_CACHE_SIZE: int = int(os.getenv("USER_CACHE_SIZE", 10000))
+    USER_CACHE_TTL_SECONDS: float = float(os.getenv("USER_CACHE_TTL_SECONDS", 300))
+
+    # Profile photos (app/photos.py)
+    PHOTO_MAX_BYTES: int = int(os.getenv("PHOTO_MAX_BYTES", 5 * 1024 * 1024))
+    PHOTO_THUMBNAIL_WORKERS: int = int(os.getenv("PHOTO_THUMBNAIL_WORKERS", 2))
+
+    # Board events source (app/events.py): "auto" uses change streams on a replica set, else "local"
+    EVENTS_SOURCE: str = os.getenv("EVENTS_SOURCE", "auto")
+
+    # Password hashing (bcrypt runs in a dedicated thread pool, see app/passwords.py)
+    BCRYPT_ROUNDS: int = int(os.getenv("BCRYPT_ROUNDS", 12))
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", 4))
+    PASSWORD_HASH_MAX_QUEUE: int = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", 256))
+
+    # Logging (app/logs.py): JSON lines through a background queue, optional per-logger sampling/rate limits
+    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
+    LOG_FORMAT: str = os.getenv("LOG_FORMAT", "json")
+    LOG_QUEUE_SIZE: int = int(os.getenv("LOG_QUEUE_SIZE", 10000))
+    LOG_SAMPLING: str = os.getenv("LOG_SAMPLING", "")
+    LOG_RATE_LIMITS: str = os.getenv("LOG_RATE_LIMITS", "")
+
 settings = Settings()
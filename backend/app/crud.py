@@ -1,7 +1,15 @@
 from .db import db
+from app.projections import GROUP_MEMBERS, TASK_FIELDS, TASK_OWNER, USER_PUBLIC
 from bson import ObjectId
 from datetime import datetime
+from pymongo import ReturnDocument
 from app.models import User, Group, Task
+from app.board_stats import empty_stats, record_task_change
+from app.board_version import BOARD_VERSION_INC
+from app.transactions import write_all
+
+# Writes touching several documents go through `write_all`, data first and counters after: one
+# transaction on a replica set, the same writes in order on a standalone server (see app/transactions.py).
 
 ### ✅ USER OPERATIONS ###
 async def create_user(user_data: User):
@@ -10,17 +18,15 @@ async def create_user(user_data: User):
         "username": user_data.username,
         "email": user_data.email,
         "hashed_password": user_data.hashed_password,
-        "groups": [],
-        "tasks": []
     }
     await db.users.insert_one(user)
     return user
 
 async def get_user_by_email(email: str):
-    return await db.users.find_one({"email": email})
+    return await db.users.find_one({"email": email}, USER_PUBLIC)
 
 async def get_user_by_id(user_id: str):
-    return await db.users.find_one({"_id": ObjectId(user_id)})
+    return await db.users.find_one({"_id": ObjectId(user_id)}, USER_PUBLIC)
 
 ### ✅ GROUP OPERATIONS ###
 async def create_group(group_data: Group):
@@ -29,19 +35,18 @@ async def create_group(group_data: Group):
         "name": group_data.name,
         "created_by": ObjectId(group_data.created_by),
         "members": [],
-        "tasks": []
     }
-    await db.groups.insert_one(group)
+    await write_all(
+        lambda s: db.groups.insert_one(group, session=s),
+        lambda s: db.board_stats.insert_one(empty_stats(group["_id"]), session=s),
+    )
     return group
 
 async def add_user_to_group(user_id: str, group_id: str):
+    # A user's groups are found through `groups.members` (indexed), not stored on the user
     await db.groups.update_one(
         {"_id": ObjectId(group_id)},
-        {"$push": {"members": ObjectId(user_id)}}
-    )
-    await db.users.update_one(
-        {"_id": ObjectId(user_id)},
-        {"$push": {"groups": ObjectId(group_id)}}
+        {"$push": {"members": ObjectId(user_id)}, **BOARD_VERSION_INC}
     )
     return {"message": "User added to group"}
 
@@ -51,12 +56,12 @@ async def remove_user_from_group(group_id: str, user_id: str):
     """
     result = await db.groups.update_one(
         {"_id": ObjectId(group_id)},
-        {"$pull": {"members": ObjectId(user_id)}}
+        {"$pull": {"members": ObjectId(user_id)}, **BOARD_VERSION_INC}
     )
     return result.modified_count > 0  # Returns True if update was successful
 
 async def get_group_by_id(group_id: str):
-    return await db.groups.find_one({"_id": ObjectId(group_id)})
+    return await db.groups.find_one({"_id": ObjectId(group_id)}, GROUP_MEMBERS)
 
 ### ✅ TASK OPERATIONS ###
 async def create_task(task_data: Task):
@@ -71,54 +76,54 @@ async def create_task(task_data: Task):
         "board_id": ObjectId(task_data.board_id),
         "owner_id": ObjectId(task_data.owner_id)
     }
-    await db.tasks.insert_one(task)
-
-    # Update group and user references
-    await db.groups.update_one(
-        {"_id": ObjectId(task_data.board_id)},
-        {"$push": {"tasks": task["_id"]}}
-    )
-    await db.users.update_one(
-        {"_id": ObjectId(task_data.owner_id)},
-        {"$push": {"tasks": task["_id"]}}
+    # ✅ The task and its board counters are written together; boards and users hold no task
+    # references, their tasks are found through the indexed `tasks.board_id` / `tasks.assigned_to`
+    await write_all(
+        lambda s: db.tasks.insert_one(task, session=s),
+        lambda s: record_task_change(None, task, session=s),
     )
-
     return task
 
 async def get_task_by_id(task_id: str):
-    return await db.tasks.find_one({"_id": ObjectId(task_id)})
+    return await db.tasks.find_one({"_id": ObjectId(task_id)}, TASK_FIELDS)
 
 async def update_task_status(task_id: str, status: str):
-    await db.tasks.update_one(
+    previous_task = await db.tasks.find_one_and_update(
         {"_id": ObjectId(task_id)},
-        {"$set": {"status": status}}
+        {"$set": {"status": status}},
+        projection=TASK_FIELDS,
+        return_document=ReturnDocument.BEFORE
     )
+    if previous_task:
+        await record_task_change(previous_task, {**previous_task, "status": status})
     return {"message": "Task status updated"}
 
 async def assign_task_to_user(task_id: str, user_id: str):
     """
     Assigns a task to a specific user in MongoDB
     """
-    result = await db.tasks.update_one(
+    previous_task = await db.tasks.find_one_and_update(
         {"_id": ObjectId(task_id)},
-        {"$set": {"owner_id": ObjectId(user_id)}}
+        {"$set": {"owner_id": ObjectId(user_id)}},
+        projection=TASK_OWNER,
+        return_document=ReturnDocument.BEFORE
     )
-    return result.modified_count > 0  # Returns True if update was successful
+    if not previous_task:
+        return False
+    await record_task_change(previous_task, {**previous_task, "owner_id": ObjectId(user_id)})
+    return previous_task.get("owner_id") != ObjectId(user_id)  # Returns True if update was successful
 
 async def delete_task(task_id: str):
-    task = await db.tasks.find_one({"_id": ObjectId(task_id)})
-    if not task:
-        return {"error": "Task not found"}
+    task_oid = ObjectId(task_id)
 
-    # Remove task from group and user references
-    await db.groups.update_one(
-        {"_id": ObjectId(task["board_id"])},
-        {"$pull": {"tasks": ObjectId(task_id)}}
-    )
-    await db.users.update_one(
-        {"_id": ObjectId(task["created_by"])},
-        {"$pull": {"tasks": ObjectId(task_id)}}
-    )
+    async def delete(session):
+        # Only the request that actually deleted the task adjusts the board counters
+        deleted_task = await db.tasks.find_one_and_delete({"_id": task_oid}, projection=TASK_FIELDS, session=session)
+        if deleted_task:
+            await record_task_change(deleted_task, None, session=session)
+        return deleted_task
 
-    await db.tasks.delete_one({"_id": ObjectId(task_id)})
+    [deleted_task] = await write_all(delete)
+    if not deleted_task:
+        return {"error": "Task not found"}
     return {"message": "Task deleted"}
@@ -1,11 +1,186 @@
+import asyncio
+import importlib.util
+import logging
+import threading
+import time
 from motor.motor_asyncio import AsyncIOMotorClient
-import os
-from dotenv import load_dotenv
+from pymongo import monitoring
+from pymongo.errors import PyMongoError
+from app.config import settings
+from app.causal import causal_listener
+from app.metrics import command_listener
 
-load_dotenv()  # Load environment variables from .env file
+logger = logging.getLogger(__name__)
 
-MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017")
-DB_NAME = os.getenv("DB_NAME", "task_manager")
+# 📌 **MongoDB connection**
+# The process has exactly one Motor client, configured from `settings` (pool size, wire
+# compression, timeouts). The app lifespan opens it with `connect_db()`, which also warms up
+# `MONGO_MIN_POOL_SIZE` connections so the first requests don't pay for TCP + handshake, and
+# closes it with `close_db()`. Modules keep using `from app.db import db`; outside the app
+# (CLIs, benchmarks, tests) the client is created on first use.
+COMPRESSOR_MODULES = {"zstd": "zstandard", "snappy": "snappy", "zlib": "zlib"}
+SATURATION_WARNING = 0.9  # /health reports "degraded" from this share of maxPoolSize in use
 
-client = AsyncIOMotorClient(MONGO_URI)
-db = client[DB_NAME]
+def available_compressors(spec: str) -> list:
+    """The configured compressors whose Python package is installed, in order of preference."""
+    names = [name.strip() for name in spec.split(",") if name.strip()]
+    return [
+        name for name in names
+        if name in COMPRESSOR_MODULES and importlib.util.find_spec(COMPRESSOR_MODULES[name]) is not None
+    ]
+
+def client_options() -> dict:
+    options = {
+        "maxPoolSize": settings.MONGO_MAX_POOL_SIZE,
+        "minPoolSize": settings.MONGO_MIN_POOL_SIZE,
+        "maxIdleTimeMS": settings.MONGO_MAX_IDLE_TIME_MS,
+        "connectTimeoutMS": settings.MONGO_CONNECT_TIMEOUT_MS,
+        "serverSelectionTimeoutMS": settings.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        "socketTimeoutMS": settings.MONGO_SOCKET_TIMEOUT_MS or None,
+        "waitQueueTimeoutMS": settings.MONGO_WAIT_QUEUE_TIMEOUT_MS or None,
+    }
+    compressors = available_compressors(settings.MONGO_COMPRESSORS)
+    if compressors:
+        options["compressors"] = ",".join(compressors)
+    return options
+
+### 📌 **Pool monitoring**
+class PoolMonitor(monitoring.ConnectionPoolListener):
+    """Open / checked-out / waiting connections per server, fed by the driver's pool events."""
+    def __init__(self):
+        self._lock = threading.Lock()  # events arrive on the driver's threads
+        self._pools = {}  # address -> {"open", "in_use", "waiting"}
+        self.checkout_failures = 0
+
+    def _update(self, address, **deltas):
+        with self._lock:
+            pool = self._pools.setdefault(address, {"open": 0, "in_use": 0, "waiting": 0})
+            for key, delta in deltas.items():
+                pool[key] += delta
+
+    def pool_created(self, event):
+        self._update(event.address)
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        with self._lock:
+            self._pools.pop(event.address, None)
+
+    def connection_created(self, event):
+        self._update(event.address, open=1)
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self._update(event.address, open=-1)
+
+    def connection_check_out_started(self, event):
+        self._update(event.address, waiting=1)
+
+    def connection_check_out_failed(self, event):
+        self._update(event.address, waiting=-1)
+        with self._lock:
+            self.checkout_failures += 1
+
+    def connection_checked_out(self, event):
+        self._update(event.address, waiting=-1, in_use=1)
+
+    def connection_checked_in(self, event):
+        self._update(event.address, in_use=-1)
+
+    def stats(self) -> dict:
+        with self._lock:
+            pools = {f"{host}:{port}": dict(pool) for (host, port), pool in self._pools.items()}
+            failures = self.checkout_failures
+        in_use = max((pool["in_use"] for pool in pools.values()), default=0)
+        return {
+            "max_size": settings.MONGO_MAX_POOL_SIZE,
+            "min_size": settings.MONGO_MIN_POOL_SIZE,
+            "open": sum(pool["open"] for pool in pools.values()),
+            "in_use": sum(pool["in_use"] for pool in pools.values()),
+            "waiting": sum(pool["waiting"] for pool in pools.values()),
+            "checkout_failures": failures,
+            # ✅ maxPoolSize applies per server: the busiest pool is the one that runs out first
+            "saturation": round(in_use / settings.MONGO_MAX_POOL_SIZE, 3) if settings.MONGO_MAX_POOL_SIZE else 0.0,
+            "servers": pools,
+        }
+
+pool_monitor = PoolMonitor()
+
+### 📌 **Client lifecycle**
+_client = None
+_database = None
+
+def get_client() -> AsyncIOMotorClient:
+    global _client, _database
+    if _client is None:
+        _client = AsyncIOMotorClient(
+            settings.MONGO_URI, event_listeners=[command_listener, causal_listener, pool_monitor], **client_options()
+        )
+        _database = _client[settings.DB_NAME]
+    return _client
+
+class _Database:
+    """`db.tasks` / `db["tasks"]` on the managed client's database."""
+    def __getattr__(self, name):
+        if _database is None:
+            get_client()
+        return getattr(_database, name)
+
+    def __getitem__(self, name):
+        if _database is None:
+            get_client()
+        return _database[name]
+
+db = _Database()
+
+async def connect_db():
+    """Called from the app lifespan: check the server is reachable and open the minimum pool."""
+    client = get_client()
+    started = time.perf_counter()
+    await client.admin.command("ping")
+    # ✅ Concurrent pings each check out a connection, filling the pool up to minPoolSize now
+    await asyncio.gather(*(client.admin.command("ping") for _ in range(settings.MONGO_MIN_POOL_SIZE)))
+    logger.info(
+        "📌 MongoDB connected: %s connections open in %.0f ms, compressors=%s",
+        pool_monitor.stats()["open"], (time.perf_counter() - started) * 1000, client_options().get("compressors"),
+    )
+
+def close_db():
+    global _client, _database
+    if _client is not None:
+        _client.close()
+    _client = _database = None
+
+async def db_health() -> dict:
+    """Ping round-trip, the driver's per-server latency and pool saturation, for `GET /health`."""
+    client = get_client()
+    started = time.perf_counter()
+    try:
+        await client.admin.command("ping")
+        ping_ms, error = round((time.perf_counter() - started) * 1000, 2), None
+    except PyMongoError as e:
+        ping_ms, error = None, str(e)
+
+    servers = [
+        {
+            "address": f"{host}:{port}",
+            "type": server.server_type_name,
+            "rtt_ms": round(server.round_trip_time * 1000, 2) if server.round_trip_time is not None else None,
+        }
+        for (host, port), server in client.topology_description.server_descriptions().items()
+    ]
+    pool = pool_monitor.stats()
+    if error is not None:
+        status = "down"
+    elif pool["saturation"] >= SATURATION_WARNING:
+        status = "degraded"
+    else:
+        status = "ok"
+    return {"status": status, "mongo": {"ping_ms": ping_ms, "error": error, "servers": servers}, "pool": pool}
@@ -0,0 +1,181 @@
+import asyncio
+import json
+import logging
+from contextlib import asynccontextmanager
+from pymongo.errors import OperationFailure, PyMongoError
+from app.config import settings
+from app.db import db
+from app.serializers import board_task_payload
+
+# 📌 **Board events**
+# Subscribers of a board get every task and membership change pushed to them instead of
+# polling `GET /api/tasks` and the dashboard. Events come from MongoDB change streams when
+# the server is a replica set (so every API process sees every write), otherwise from the
+# write handlers themselves through the in-process bus below.
+#
+# A delete only carries the task id, so change streams can route `task.deleted` to its board
+# only with pre-images (MongoDB 6.0+, enabled on `tasks` at startup). Without them the
+# delete handlers publish it themselves, reaching the subscribers of their own process.
+#
+# Event types: task.created / task.updated (`task`), task.deleted (`task_id`),
+# members.changed (`members`), board.updated (`name`), board.deleted, and resync
+# (the subscriber fell behind and should re-fetch once).
+SUBSCRIBER_QUEUE_SIZE = 256
+KEEP_ALIVE_SECONDS = 15
+
+class BoardEventBus:
+    def __init__(self):
+        self._subscribers = {}  # board_id (str) -> set of asyncio.Queue
+
+    @asynccontextmanager
+    async def subscribe(self, board_id: str):
+        queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self._subscribers.setdefault(board_id, set()).add(queue)
+        try:
+            yield queue
+        finally:
+            subscribers = self._subscribers.get(board_id, set())
+            subscribers.discard(queue)
+            if not subscribers:
+                self._subscribers.pop(board_id, None)
+
+    def publish(self, board_id: str, event: dict):
+        for queue in self._subscribers.get(board_id, ()):
+            self._deliver(queue, event)
+
+    def has_subscribers(self, board_id: str) -> bool:
+        return bool(self._subscribers.get(board_id))
+
+    @staticmethod
+    def _deliver(queue: asyncio.Queue, event: dict):
+        try:
+            queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # ✅ A slow client gets one resync instead of an unbounded backlog
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait({"type": "resync"})
+
+event_bus = BoardEventBus()
+_change_stream_tasks = []
+_task_pre_images = False
+
+def using_change_streams() -> bool:
+    return bool(_change_stream_tasks)
+
+def deletes_from_change_stream() -> bool:
+    return using_change_streams() and _task_pre_images
+
+### 📌 **Publishing from the write handlers** (no-ops while change streams feed the bus)
+async def publish_task_event(event_type: str, task: dict):
+    board_id = str(task["board_id"])
+    from_change_stream = deletes_from_change_stream() if event_type == "task.deleted" else using_change_streams()
+    if from_change_stream or not event_bus.has_subscribers(board_id):
+        return
+    if event_type == "task.deleted":
+        event_bus.publish(board_id, {"type": event_type, "board_id": board_id, "task_id": str(task["_id"])})
+    else:
+        event_bus.publish(board_id, {"type": event_type, "board_id": board_id, "task": await board_task_payload(task)})
+
+def publish_board_event(board_id, event_type: str, **data):
+    board_id = str(board_id)
+    if using_change_streams():
+        return
+    event_bus.publish(board_id, {"type": event_type, "board_id": board_id, **data})
+
+def members_payload(members: list) -> list:
+    return [str(member) for member in members]
+
+### 📌 **Change stream feed**
+async def _handle_task_change(change: dict):
+    operation = change["operationType"]
+    task = change.get("fullDocument")
+    if operation in ("insert", "update", "replace") and task:
+        board_id = str(task["board_id"])
+        if event_bus.has_subscribers(board_id):
+            event_type = "task.created" if operation == "insert" else "task.updated"
+            event_bus.publish(board_id, {"type": event_type, "board_id": board_id, "task": await board_task_payload(task)})
+    elif operation == "delete":
+        # ✅ Only the pre-image knows the board; without one the delete handler publishes it
+        before = change.get("fullDocumentBeforeChange")
+        if before and before.get("board_id"):
+            board_id = str(before["board_id"])
+            event_bus.publish(board_id, {"type": "task.deleted", "board_id": board_id, "task_id": str(change["documentKey"]["_id"])})
+
+async def _handle_group_change(change: dict):
+    operation = change["operationType"]
+    board_id = str(change["documentKey"]["_id"])
+    if operation == "delete":
+        event_bus.publish(board_id, {"type": "board.deleted", "board_id": board_id})
+        return
+
+    group = change.get("fullDocument")
+    if not group:
+        return
+    updated = (change.get("updateDescription") or {}).get("updatedFields", {})
+    removed = (change.get("updateDescription") or {}).get("removedFields", [])
+    changed_fields = {field.split(".")[0] for field in list(updated) + list(removed)}
+    if operation == "replace" or "members" in changed_fields:
+        event_bus.publish(board_id, {"type": "members.changed", "board_id": board_id, "members": members_payload(group.get("members", []))})
+    if operation == "replace" or "name" in changed_fields:
+        event_bus.publish(board_id, {"type": "board.updated", "board_id": board_id, "name": group.get("name")})
+
+async def _watch(collection, handler, **options):
+    """Follow one collection's change stream forever, resuming after errors."""
+    resume_token = None
+    while True:
+        try:
+            async with collection.watch(full_document="updateLookup", resume_after=resume_token, **options) as stream:
+                async for change in stream:
+                    resume_token = stream.resume_token
+                    try:
+                        await handler(change)
+                    except Exception as e:
+                        logging.error(f"❌ Failed to publish change {change.get('_id')}: {e}")
+        except asyncio.CancelledError:
+            raise
+        except PyMongoError as e:
+            logging.warning(f"⚠️ Change stream on {collection.name} interrupted: {e}")
+            await asyncio.sleep(1)
+
+async def start():
+    """Called from the app lifespan: use change streams when the server supports them."""
+    if settings.EVENTS_SOURCE == "local":
+        return
+    hello = await db.client.admin.command("hello")
+    if "setName" not in hello:
+        if settings.EVENTS_SOURCE == "change_stream":
+            raise RuntimeError("EVENTS_SOURCE=change_stream requires a MongoDB replica set")
+        logging.info("📌 Board events: standalone MongoDB, using the in-process bus")
+        return
+
+    global _task_pre_images
+    try:
+        await db.command("collMod", "tasks", changeStreamPreAndPostImages={"enabled": True})
+        _task_pre_images = True
+    except OperationFailure as e:
+        logging.info(f"📌 Board events: no pre-images for tasks ({e}), deletes are published by the API process")
+    task_options = {"full_document_before_change": "whenAvailable"} if _task_pre_images else {}
+
+    _change_stream_tasks.append(asyncio.create_task(_watch(db.tasks, _handle_task_change, **task_options)))
+    _change_stream_tasks.append(asyncio.create_task(_watch(db.groups, _handle_group_change)))
+    logging.info(f"📌 Board events: following change streams on replica set {hello['setName']}")
+
+def stop():
+    for task in _change_stream_tasks:
+        task.cancel()
+    _change_stream_tasks.clear()
+
+### 📌 **Server-Sent Events stream**
+async def sse_stream(board_id: str, request):
+    async with event_bus.subscribe(board_id) as queue:
+        yield ": connected\n\n"
+        while not await request.is_disconnected():
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout=KEEP_ALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            yield f"event: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
+            if event["type"] == "board.deleted":
+                break
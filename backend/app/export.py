@@ -0,0 +1,72 @@
+import csv
+import io
+import json
+from app.db import db
+from app.projections import TASK_EXPORT
+from app.user_directory import user_directory
+
+# 📌 **Task export**
+# Rows are produced straight from the Motor cursor one server batch at a time,
+# so memory stays flat however many tasks the board (or user) has.
+EXPORT_BATCH_SIZE = 1000
+EXPORT_FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+EXPORT_FIELDS = [
+    "id", "title", "description", "status", "priority", "board_id",
+    "deadline", "created_at", "created_by", "assigned_to", "assigned_to_ids",
+]
+
+async def _resolve_batch(tasks: list) -> list:
+    """Turn one batch of task documents into export rows with at most one username query."""
+    user_map = await user_directory.usernames(
+        user_id for task in tasks for user_id in task.get("assigned_to", [])
+    )
+
+    return [
+        {
+            "id": str(task["_id"]),
+            "title": task.get("title"),
+            "description": task.get("description", ""),
+            "status": task.get("status"),
+            "priority": task.get("priority"),
+            "board_id": str(task.get("board_id")),
+            "deadline": task["deadline"].isoformat() if task.get("deadline") else None,
+            "created_at": task["created_at"].isoformat() if task.get("created_at") else None,
+            "created_by": str(task.get("created_by")) if task.get("created_by") else None,
+            "assigned_to": [user_map.get(str(user_id), "Unknown User") for user_id in task.get("assigned_to", [])],
+            "assigned_to_ids": [str(user_id) for user_id in task.get("assigned_to", [])],
+        }
+        for task in tasks
+    ]
+
+async def export_row_batches(filter_query: dict):
+    """Yield lists of export rows, one list per cursor batch."""
+    cursor = db.tasks.find(filter_query, TASK_EXPORT).sort("_id", 1).batch_size(EXPORT_BATCH_SIZE)
+    batch = []
+    async for task in cursor:
+        batch.append(task)
+        if len(batch) == EXPORT_BATCH_SIZE:
+            yield await _resolve_batch(batch)
+            batch = []
+    if batch:
+        yield await _resolve_batch(batch)
+
+async def stream_ndjson(filter_query: dict):
+    async for rows in export_row_batches(filter_query):
+        yield "".join(json.dumps(row) + "\n" for row in rows)
+
+async def stream_csv(filter_query: dict):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+    writer.writeheader()
+    yield buffer.getvalue()
+
+    async for rows in export_row_batches(filter_query):
+        buffer.seek(0)
+        buffer.truncate()
+        for row in rows:
+            writer.writerow({
+                **row,
+                "assigned_to": ";".join(row["assigned_to"]),
+                "assigned_to_ids": ";".join(row["assigned_to_ids"]),
+            })
+        yield buffer.getvalue()
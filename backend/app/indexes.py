@@ -0,0 +1,116 @@
+import asyncio
+import logging
+import sys
+from pymongo import ASCENDING
+from pymongo.errors import OperationFailure
+from app.db import db
+
+# 📌 **Index definitions** (one entry per query pattern used by the routes)
+INDEXES = {
+    "tasks": [
+        # find({"board_id": ...}) in get_board_dashboard / remove_user_from_group_api
+        {"name": "board_status_priority", "keys": [("board_id", ASCENDING), ("status", ASCENDING), ("priority", ASCENDING)]},
+        # keyset pages of get_tasks: {"board_id": ..., "_id": {"$gt": cursor}} sorted by _id
+        {"name": "board_id_id", "keys": [("board_id", ASCENDING), ("_id", ASCENDING)]},
+        # per-assignee task lists of get_board_dashboard: {"board_id": ..., "assigned_to": {"$in": ...}}
+        {"name": "board_assigned_to", "keys": [("board_id", ASCENDING), ("assigned_to", ASCENDING), ("_id", ASCENDING)]},
+        # keyset pages of get_users_tasks: {"assigned_to": ..., "_id": {"$gt": cursor}}
+        {"name": "assigned_to_id", "keys": [("assigned_to", ASCENDING), ("_id", ASCENDING)]},
+    ],
+    "groups": [
+        # keyset pages of get_groups: {"members": user_id, "_id": {"$gt": cursor}}
+        {"name": "members_id", "keys": [("members", ASCENDING), ("_id", ASCENDING)]},
+    ],
+    "users": [
+        # find_one({"email": ...}) in get_current_user / login / signup
+        {"name": "email_unique", "keys": [("email", ASCENDING)], "unique": True},
+    ],
+    "revoked_tokens": [
+        # TTL: revoked jtis are dropped once the token would have expired anyway
+        {"name": "expires_at_ttl", "keys": [("expires_at", ASCENDING)], "expire_after_seconds": 0},
+    ],
+}
+
+def _normalize_keys(keys) -> list:
+    """Normalize an index key spec so specs and `index_information()` compare equal."""
+    return [(field, int(direction)) for field, direction in keys]
+
+def _matches(spec: dict, existing: dict) -> bool:
+    return (
+        _normalize_keys(existing["key"]) == _normalize_keys(spec["keys"])
+        and bool(existing.get("unique", False)) == bool(spec.get("unique", False))
+        and existing.get("expireAfterSeconds") == spec.get("expire_after_seconds")
+    )
+
+def _index_options(spec: dict) -> dict:
+    options = {"name": spec["name"], "unique": spec.get("unique", False)}
+    if "expire_after_seconds" in spec:
+        options["expireAfterSeconds"] = spec["expire_after_seconds"]
+    return options
+
+async def check_indexes(database=db) -> dict:
+    """
+    Compare the declared indexes against the database.
+    Returns `{"ok": [...], "missing": [...], "drifted": [...]}` with `collection.name` entries.
+    """
+    report = {"ok": [], "missing": [], "drifted": []}
+
+    for collection, specs in INDEXES.items():
+        existing = await database[collection].index_information()
+
+        for spec in specs:
+            label = f"{collection}.{spec['name']}"
+
+            if spec["name"] in existing:
+                key = "ok" if _matches(spec, existing[spec["name"]]) else "drifted"
+                report[key].append(label)
+                continue
+
+            # ✅ Same keys under another name still counts, as long as the options agree
+            same_keys = [
+                info for info in existing.values()
+                if _normalize_keys(info["key"]) == _normalize_keys(spec["keys"])
+            ]
+            if not same_keys:
+                report["missing"].append(label)
+            elif any(_matches(spec, info) for info in same_keys):
+                report["ok"].append(label)
+            else:
+                report["drifted"].append(label)
+
+    return report
+
+async def ensure_indexes(database=db) -> dict:
+    """
+    Idempotently create every missing index.
+    Drifted indexes are only reported, never dropped, so a bad deploy cannot wipe a production index.
+    """
+    report = await check_indexes(database)
+
+    for label in report["missing"]:
+        collection, name = label.split(".", 1)
+        spec = next(s for s in INDEXES[collection] if s["name"] == name)
+        try:
+            await database[collection].create_index(spec["keys"], background=True, **_index_options(spec))
+            logging.info(f"✅ Created index {label}")
+        except OperationFailure as e:
+            # e.g. duplicate emails blocking the unique index; keep serving, but make it loud
+            logging.error(f"❌ Failed to create index {label}: {e}")
+
+    for label in report["drifted"]:
+        logging.warning(f"⚠️ Index {label} exists with a different definition; drop and recreate it manually")
+
+    return report
+
+# 📌 **CLI**: `python -m app.indexes` reports, `python -m app.indexes --apply` creates missing indexes
+async def _main(apply: bool) -> dict:
+    if apply:
+        await ensure_indexes()
+    return await check_indexes()
+
+if __name__ == "__main__":
+    result = asyncio.run(_main("--apply" in sys.argv))
+    for status, labels in result.items():
+        for label in labels:
+            print(f"{status:8} {label}")
+    sys.exit(1 if result["missing"] or result["drifted"] else 0)
@@ -0,0 +1,135 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from app.config import settings
+
+# 📌 **Logging**
+# Request handlers only put LogRecords on a bounded queue; a background listener thread
+# formats them (JSON lines by default) and writes them to stdout, so neither message
+# formatting nor the stream write happens on the event loop. Before a record is queued,
+# per-logger sampling and rate limits may drop it (warnings and errors are always kept),
+# and records that find the queue full are dropped and counted instead of blocking.
+#
+#   LOG_LEVEL=INFO  LOG_FORMAT=json|text  LOG_QUEUE_SIZE=10000
+#   LOG_SAMPLING="app.routes.tasks=0.1"       keep 10% of that logger's (and its children's) records
+#   LOG_RATE_LIMITS="app.routes.users=50"     at most 50 records per second
+#
+# Hot paths log at DEBUG with %-style arguments, which are never formatted unless enabled.
+
+def parse_policy(spec: str) -> dict:
+    """`"logger=value,other=value"` -> `{"logger": value, ...}`."""
+    policy = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, value = item.partition("=")
+        policy[name.strip()] = float(value)
+    return policy
+
+def _lookup(policy: dict, logger_name: str):
+    """The value configured for `logger_name` or its nearest configured parent."""
+    name = logger_name
+    while name:
+        if name in policy:
+            return name, policy[name]
+        name = name.rpartition(".")[0]
+    return None, None
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record; `extra={...}` fields are included as keys."""
+    RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "taskName"}
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        entry.update({key: value for key, value in vars(record).items() if key not in self.RESERVED})
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+class PolicyFilter(logging.Filter):
+    """Per-logger sampling and token-bucket rate limits, applied before a record is queued."""
+    def __init__(self, sampling: dict, rate_limits: dict):
+        super().__init__()
+        self.sampling = sampling
+        self.rate_limits = rate_limits
+        self._buckets = {}  # configured logger name -> [tokens, last refill]
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        _, rate = _lookup(self.sampling, record.name)
+        if rate is not None and random.random() >= rate:
+            return False
+        name, per_second = _lookup(self.rate_limits, record.name)
+        if per_second is None:
+            return True
+        with self._lock:
+            now = time.monotonic()
+            tokens, last = self._buckets.get(name, (per_second, now))
+            tokens = min(per_second, tokens + (now - last) * per_second)
+            allowed = tokens >= 1
+            self._buckets[name] = (tokens - 1 if allowed else tokens, now)
+        return allowed
+
+MUTABLE_ARGS = (dict, list, set, bytearray)
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    Queues the record as is: message formatting is left to the listener thread.
+    Records with mutable arguments are formatted right away, since the caller may change
+    them before the listener gets to the record.
+    """
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        args = record.args
+        if isinstance(args, MUTABLE_ARGS) or any(isinstance(arg, MUTABLE_ARGS) for arg in args or ()):
+            record.msg, record.args = record.getMessage(), None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+_listener = None
+_handler = None
+
+def configure_logging():
+    """Route the root logger through the background queue (idempotent)."""
+    global _listener, _handler
+    if _listener is not None:
+        return
+
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(JsonFormatter() if settings.LOG_FORMAT == "json" else logging.Formatter(
+        "%(asctime)s %(levelname)s %(name)s: %(message)s"
+    ))
+    _handler = DeferredQueueHandler(queue.Queue(maxsize=settings.LOG_QUEUE_SIZE))
+    _handler.addFilter(PolicyFilter(parse_policy(settings.LOG_SAMPLING), parse_policy(settings.LOG_RATE_LIMITS)))
+
+    root = logging.getLogger()
+    root.handlers = [_handler]
+    root.setLevel(settings.LOG_LEVEL.upper())
+
+    _listener = logging.handlers.QueueListener(_handler.queue, output)
+    _listener.start()
+    atexit.register(_listener.stop)  # flushes what is still queued
+
+def dropped_records() -> int:
+    """Records lost to a full queue since startup."""
+    return _handler.dropped if _handler else 0
@@ -1,47 +1,51 @@
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 import os
-from motor.motor_asyncio import AsyncIOMotorClient
-from fastapi.staticfiles import StaticFiles
+from contextlib import asynccontextmanager
 
 # Import routers
 from app.routes.users import router as user_router
 from app.routes.groups import router as group_router
 from app.routes.tasks import router as task_router
+from app.config import settings
+from app.db import connect_db, close_db, db_health, pool_monitor
+from app.indexes import ensure_indexes
+from app.pagination import NEXT_CURSOR_HEADER
+from app import events, passwords, photos
+from app.revocation import refresh_revoked_forever
+from app.responses import FastJSONResponse
+from app.metrics import MetricsMiddleware, render_metrics
+from app.causal import CAUSAL_TOKEN_HEADER, CausalConsistencyMiddleware
+from app.user_directory import user_directory
+from app.logs import configure_logging, dropped_records
+import asyncio
 
 # Load environment variables
-from dotenv import load_dotenv
 load_dotenv()
-
-# Use a test database if running tests
-MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017")
-DB_NAME = "test_db" if os.getenv("PYTEST_RUNNING") else "production_db"
-
-# Connect to MongoDB
-client = AsyncIOMotorClient(MONGO_URI)
-db = client[DB_NAME]  # Switches database automatically
-
-# Initialize FastAPI app
-app = FastAPI(title="Task Management API", version="1.0")
-
-# Ensure the database is available in the app
-app.db = db
-
-@app.on_event("shutdown")
-async def shutdown_db_client():
-    client.close()
+configure_logging()  # JSON lines written from a background thread (app/logs.py)
 
 # Ensure the 'static' directory exists
 STATIC_FOLDER = "static/profile_pics"
 os.makedirs(STATIC_FOLDER, exist_ok=True)
 
-# Load environment variables
-load_dotenv()
-PORT = int(os.getenv("PORT", 8000))
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Startup/shutdown hooks: open the MongoDB pool, make sure every query in the routes is backed by an index."""
+    await connect_db()
+    await ensure_indexes()
+    revocation_task = asyncio.create_task(refresh_revoked_forever())
+    await events.start()
+    yield
+    events.stop()
+    revocation_task.cancel()
+    passwords.shutdown()
+    photos.shutdown()
+    close_db()
 
 # Initialize FastAPI app
-app = FastAPI(title="Task Management API", version="1.0")
+app = FastAPI(title="Task Management API", version="1.0", lifespan=lifespan, default_response_class=FastJSONResponse)
 
 # Enable CORS for frontend integration
 app.add_middleware(
@@ -50,10 +54,15 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag", "Server-Timing", CAUSAL_TOKEN_HEADER],  # Let the frontend read pagination cursors
 )
+# Tracks each request's writes and the caller's latest write for secondary reads (app/causal.py)
+app.add_middleware(CausalConsistencyMiddleware)
+# Outermost, so the timings cover CORS and every mounted app
+app.add_middleware(MetricsMiddleware)
 
 # Include routers
-app.mount("/static/profile_pics", StaticFiles(directory="static/profile_pics"), name="static")
+app.mount("/static/profile_pics", photos.AvatarStaticFiles(directory="static/profile_pics"), name="static")
 app.include_router(user_router, prefix="/api/users", tags=["Users"])
 app.include_router(group_router, prefix="/api/groups", tags=["Groups"])
 app.include_router(task_router, prefix="/api/tasks", tags=["Tasks"])
@@ -62,7 +71,22 @@ app.include_router(task_router, prefix="/api/tasks", tags=["Tasks"])
 async def root():
     return {"message": "Welcome to the Task Management API 🚀"}
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint: request/DB latency plus the Mongo pool, hashing pool and user cache."""
+    gauges = {f"password_hash_pool_{key}": value for key, value in passwords.pool_stats().items()}
+    gauges.update({f"user_directory_{key}": value for key, value in user_directory.stats().items()})
+    gauges.update({f"mongo_pool_{key}": value for key, value in pool_monitor.stats().items() if key != "servers"})
+    gauges["log_records_dropped"] = dropped_records()
+    return PlainTextResponse(render_metrics(gauges), media_type="text/plain; version=0.0.4")
+
+@app.get("/health", include_in_schema=False)
+async def health():
+    """MongoDB round-trip latency and connection pool saturation; 503 when the database is unreachable."""
+    report = await db_health()
+    return FastJSONResponse(report, status_code=503 if report["status"] == "down" else 200)
+
 # Run the application
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=PORT)
+    uvicorn.run(app, host="0.0.0.0", port=settings.PORT)
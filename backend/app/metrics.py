@@ -0,0 +1,193 @@
+import threading
+import time
+from contextvars import ContextVar
+from typing import Optional
+from pymongo import monitoring
+from starlette.datastructures import MutableHeaders
+
+# 📌 **Request metrics**
+# `MetricsMiddleware` times every HTTP request; `command_listener` (registered on the Motor
+# client in `app.db`) attributes each MongoDB command to the request that issued it through a
+# context variable (Motor copies the context into its executor threads). Everything is
+# rendered in Prometheus text format by `render_metrics()` for `GET /metrics`, and each
+# response gets a `Server-Timing` header splitting its time into app, db and serialize.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BACKGROUND_ROUTE = "<background>"  # commands issued outside a request (lifespan, change streams)
+BACKGROUND_METHOD = "<none>"
+UNMATCHED_ROUTE = "<unmatched>"
+
+_lock = threading.Lock()  # listener callbacks run on Motor's executor threads
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self.series = {}  # labels tuple -> [bucket counts..., sum, count]
+
+    def observe(self, labels: tuple, value: float):
+        with _lock:
+            series = self.series.setdefault(labels, [0] * len(self.buckets) + [0.0, 0])
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self, label_names: tuple) -> list:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for labels, series in sorted(self.series.items()):
+            base = _labels(label_names, labels)
+            for bound, count in zip(self.buckets, series):
+                lines.append(f'{self.name}_bucket{{{base},le="{bound}"}} {count}')
+            lines.append(f'{self.name}_bucket{{{base},le="+Inf"}} {series[-1]}')
+            lines.append(f"{self.name}_sum{{{base}}} {series[-2]:.6f}")
+            lines.append(f"{self.name}_count{{{base}}} {series[-1]}")
+        return lines
+
+class Counter:
+    def __init__(self, name: str, help_text: str, kind: str = "counter"):
+        self.name = name
+        self.help_text = help_text
+        self.kind = kind
+        self.series = {}  # labels tuple -> value
+
+    def inc(self, labels: tuple, amount: float = 1):
+        with _lock:
+            self.series[labels] = self.series.get(labels, 0) + amount
+
+    def render(self, label_names: tuple) -> list:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+        for labels, value in sorted(self.series.items()):
+            rendered = f"{value:.6f}" if isinstance(value, float) else value
+            lines.append(f"{self.name}{{{_labels(label_names, labels)}}} {rendered}")
+        return lines
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _labels(names: tuple, values: tuple) -> str:
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+
+request_duration = Histogram("http_request_duration_seconds", "HTTP request latency by route.")
+requests_total = Counter("http_requests_total", "HTTP requests by route and status code.")
+requests_in_flight = Counter("http_requests_in_flight", "HTTP requests currently being served.", kind="gauge")
+mongo_commands = Counter("mongodb_commands_total", "MongoDB commands by issuing method, route and command.")
+mongo_seconds = Counter("mongodb_command_seconds_total", "Time spent in MongoDB commands by issuing method, route and command.")
+mongo_duration = Histogram("mongodb_command_duration_seconds", "MongoDB command latency by command.")
+
+### 📌 **Per-request timings**
+class RequestTimings:
+    def __init__(self, scope: dict):
+        self.scope = scope
+        self.started = time.perf_counter()
+        self.db_seconds = 0.0
+        self.serialize_seconds = 0.0
+        self.commands = {}  # command name -> [count, seconds]
+
+    @property
+    def route(self) -> str:
+        route = self.scope.get("route")  # set by FastAPI once the request is routed
+        if route is not None:
+            return route.path
+        return self.scope.get("root_path") or UNMATCHED_ROUTE  # mounts (static files)
+
+    def add_command(self, command_name: str, seconds: float):
+        with _lock:
+            self.db_seconds += seconds
+            entry = self.commands.setdefault(command_name, [0, 0.0])
+            entry[0] += 1
+            entry[1] += seconds
+
+    def server_timing(self) -> str:
+        total = time.perf_counter() - self.started
+        command_count = sum(count for count, _ in self.commands.values())
+        app_seconds = max(total - self.db_seconds - self.serialize_seconds, 0.0)
+        return (
+            f"app;dur={app_seconds * 1000:.1f}, "
+            f'db;dur={self.db_seconds * 1000:.1f};desc="{command_count} commands", '
+            f"serialize;dur={self.serialize_seconds * 1000:.1f}"
+        )
+
+_current_request: ContextVar[Optional[RequestTimings]] = ContextVar("current_request", default=None)
+
+def current_request() -> Optional[RequestTimings]:
+    return _current_request.get()
+
+def record_serialization(seconds: float):
+    """Called by the JSON response renderers."""
+    timings = _current_request.get()
+    if timings is not None:
+        timings.serialize_seconds += seconds
+
+### 📌 **MongoDB command listener**
+class CommandMetrics(monitoring.CommandListener):
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        self._record(event)
+
+    def failed(self, event):
+        self._record(event)
+
+    @staticmethod
+    def _record(event):
+        seconds = event.duration_micros / 1e6
+        mongo_duration.observe((event.command_name,), seconds)
+        timings = _current_request.get()
+        if timings is not None:
+            timings.add_command(event.command_name, seconds)
+        else:
+            mongo_commands.inc((BACKGROUND_METHOD, BACKGROUND_ROUTE, event.command_name))
+            mongo_seconds.inc((BACKGROUND_METHOD, BACKGROUND_ROUTE, event.command_name), seconds)
+
+command_listener = CommandMetrics()
+
+### 📌 **ASGI middleware**
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] == "/metrics":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings(scope)
+        token = _current_request.set(timings)
+        status_code = 500
+
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                MutableHeaders(scope=message).append("Server-Timing", timings.server_timing())
+            await send(message)
+
+        requests_in_flight.inc((scope["method"],))
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            requests_in_flight.inc((scope["method"],), -1)
+            _current_request.reset(token)
+            route = timings.route
+            request_duration.observe((scope["method"], route), time.perf_counter() - timings.started)
+            requests_total.inc((scope["method"], route, str(status_code)))
+            for command_name, (count, seconds) in timings.commands.items():
+                mongo_commands.inc((scope["method"], route, command_name), count)
+                mongo_seconds.inc((scope["method"], route, command_name), seconds)
+
+### 📌 **Prometheus text format**
+def render_metrics(extra_gauges: dict = None) -> str:
+    """All metrics as a Prometheus text exposition; `extra_gauges` maps names to plain values."""
+    lines = []
+    lines += request_duration.render(("method", "route"))
+    lines += requests_total.render(("method", "route", "status"))
+    lines += requests_in_flight.render(("method",))
+    lines += mongo_commands.render(("method", "route", "command"))
+    lines += mongo_seconds.render(("method", "route", "command"))
+    lines += mongo_duration.render(("command",))
+    for name, value in (extra_gauges or {}).items():
+        lines += [f"# TYPE {name} gauge", f"{name} {value}"]
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,77 @@
+import argparse
+import asyncio
+import logging
+import sys
+from app.db import db
+
+# 📌 **Strip the embedded reference arrays**
+# Task and membership references used to be duplicated into `groups.tasks`, `users.tasks` and
+# `users.groups`, which grew without bound. They are now answered by indexed reverse queries
+# (`tasks.board_id`, `tasks.assigned_to`, `groups.members`) and no longer written; this
+# migration removes the arrays from existing documents.
+#
+#   python -m app.migrations [--batch-size 1000] [--pause-ms 50] [--restart]
+#
+# It runs online: documents are visited in `_id` order in small batches, each batch is one
+# `update_many` with `$unset`, and an optional pause between batches leaves room for traffic.
+# The last `_id` of every finished batch is checkpointed in `migrations`, so an interrupted run
+# continues where it stopped. Deploy the code first: once nothing writes the arrays, one pass
+# leaves no document behind.
+MIGRATIONS_COLLECTION = "migrations"
+EMBEDDED_ARRAYS = {
+    "groups": ["tasks"],
+    "users": ["tasks", "groups"],
+}
+
+def _checkpoint_id(collection: str) -> str:
+    return f"strip_embedded_arrays:{collection}"
+
+async def strip_collection(collection: str, fields: list, batch_size: int = 1000, pause: float = 0.0) -> dict:
+    """Unset `fields` on every document of `collection`, resuming after the last checkpoint."""
+    checkpoint = await db[MIGRATIONS_COLLECTION].find_one({"_id": _checkpoint_id(collection)}) or {}
+    if checkpoint.get("done"):
+        return {"collection": collection, "scanned": 0, "modified": 0, "done": True}
+
+    last_id = checkpoint.get("last_id")
+    scanned = modified = 0
+    has_arrays = {"$or": [{field: {"$exists": True}} for field in fields]}
+    while True:
+        page = {"_id": {"$gt": last_id}} if last_id is not None else {}
+        batch = await db[collection].find(page, {"_id": 1}).sort("_id", 1).limit(batch_size).to_list(length=batch_size)
+        if not batch:
+            break
+        ids = [doc["_id"] for doc in batch]
+        result = await db[collection].update_many(
+            {"_id": {"$in": ids}, **has_arrays},
+            {"$unset": {field: "" for field in fields}},
+        )
+        last_id = ids[-1]
+        scanned += len(ids)
+        modified += result.modified_count
+        await db[MIGRATIONS_COLLECTION].update_one(
+            {"_id": _checkpoint_id(collection)}, {"$set": {"last_id": last_id}}, upsert=True
+        )
+        if pause:
+            await asyncio.sleep(pause)
+
+    await db[MIGRATIONS_COLLECTION].update_one({"_id": _checkpoint_id(collection)}, {"$set": {"done": True}}, upsert=True)
+    return {"collection": collection, "scanned": scanned, "modified": modified, "done": True}
+
+async def strip_embedded_arrays(batch_size: int = 1000, pause: float = 0.0, restart: bool = False) -> list:
+    if restart:
+        await db[MIGRATIONS_COLLECTION].delete_many({"_id": {"$in": [_checkpoint_id(c) for c in EMBEDDED_ARRAYS]}})
+    reports = []
+    for collection, fields in EMBEDDED_ARRAYS.items():
+        report = await strip_collection(collection, fields, batch_size, pause)
+        logging.info(f"✅ {collection}: scanned {report['scanned']}, stripped {report['modified']}")
+        reports.append(report)
+    return reports
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    parser = argparse.ArgumentParser(description="Remove the embedded groups.tasks / users.tasks / users.groups arrays")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--pause-ms", type=int, default=50, help="Sleep between batches to limit the load on the primary")
+    parser.add_argument("--restart", action="store_true", help="Forget the checkpoints and scan everything again")
+    args = parser.parse_args(sys.argv[1:])
+    asyncio.run(strip_embedded_arrays(args.batch_size, args.pause_ms / 1000, args.restart))
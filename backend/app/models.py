@@ -21,8 +21,6 @@ class User(BaseModel):
     username: str
     email: EmailStr
     hashed_password: str
-    groups: List[PyObjectId] = []  # Store references as ObjectId
-    tasks: List[PyObjectId] = []
     photo: Optional[str] = None
 
     class Config:
@@ -33,7 +31,6 @@ class Group(BaseModel):
     name: str
     created_by: PyObjectId  # Reference to User ID
     members: List[PyObjectId] = []  # Store user references
-    tasks: List[PyObjectId] = []
     
 
     class Config:
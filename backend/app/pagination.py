@@ -0,0 +1,50 @@
+import base64
+import binascii
+from typing import Optional
+from bson import ObjectId
+from bson.errors import InvalidId
+from fastapi import HTTPException, Query, Response
+
+# 📌 **Keyset pagination**
+# Pages are range scans on `_id` (`{"_id": {"$gt": <last id>}}` sorted by `_id`), never `skip`,
+# so page 10,000 costs the same as page 1. Bodies stay plain lists; the cursor for the
+# next page is returned in the `X-Next-Cursor` header and is absent on the last page.
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def encode_cursor(last_id: ObjectId) -> str:
+    """Opaque cursor pointing just after `last_id`."""
+    return base64.urlsafe_b64encode(ObjectId(last_id).binary).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> ObjectId:
+    try:
+        return ObjectId(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (binascii.Error, InvalidId, TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+class PageParams:
+    """Query parameters shared by every paginated list endpoint."""
+    def __init__(
+        self,
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        cursor: Optional[str] = Query(None),
+    ):
+        self.limit = limit
+        self.after = decode_cursor(cursor) if cursor else None
+
+async def paginate(collection, filter_query: dict, page: PageParams, response: Response, projection=None, session=None) -> list:
+    """
+    Fetch one page of `collection` matching `filter_query` in `_id` order.
+    Sets the next-page cursor header on `response` when more documents exist.
+    """
+    query = dict(filter_query)
+    if page.after:
+        query["_id"] = {"$gt": page.after}
+
+    # ✅ Read one extra document to know whether another page exists
+    docs = await collection.find(query, projection, session=session).sort("_id", 1).limit(page.limit + 1).to_list(length=page.limit + 1)
+    if len(docs) > page.limit:
+        docs = docs[:page.limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(docs[-1]["_id"])
+    return docs
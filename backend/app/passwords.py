@@ -0,0 +1,81 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import HTTPException
+from passlib.context import CryptContext
+from app.config import settings
+
+# 📌 **Password hashing off the event loop**
+# bcrypt takes ~100-300 ms per call and releases the GIL, so it runs in its own small
+# thread pool. The event loop only awaits the result and keeps serving other requests.
+# min/max rounds pinned to the configured cost so `needs_update` flags hashes made with any other cost
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS,
+)
+
+_executor = ThreadPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
+_stats = {"queued": 0, "running": 0, "completed": 0, "rejected": 0}
+_stats_lock = threading.Lock()  # updated from both the event loop and the worker threads
+
+def pool_stats() -> dict:
+    """Snapshot of the hashing pool: waiting/running jobs, totals and configured limits."""
+    with _stats_lock:
+        snapshot = dict(_stats)
+    return {
+        **snapshot,
+        "workers": settings.PASSWORD_HASH_WORKERS,
+        "max_queue": settings.PASSWORD_HASH_MAX_QUEUE,
+        "rounds": settings.BCRYPT_ROUNDS,
+    }
+
+async def _run(func, *args):
+    with _stats_lock:
+        # ✅ Shed load instead of letting a login storm queue up without bound
+        if settings.PASSWORD_HASH_MAX_QUEUE and _stats["queued"] >= settings.PASSWORD_HASH_MAX_QUEUE:
+            _stats["rejected"] += 1
+            raise HTTPException(status_code=503, detail="Too many concurrent logins, please retry")
+        _stats["queued"] += 1
+
+    job = {"started": False}
+
+    def work():
+        with _stats_lock:
+            if job["started"]:
+                return None  # abandoned by a cancelled request, already accounted for
+            job["started"] = True
+            _stats["queued"] -= 1
+            _stats["running"] += 1
+        try:
+            return func(*args)
+        finally:
+            with _stats_lock:
+                _stats["running"] -= 1
+                _stats["completed"] += 1
+
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_executor, work)
+    finally:
+        # A request cancelled before its job started never reaches `work`
+        with _stats_lock:
+            if not job["started"]:
+                job["started"] = True
+                _stats["queued"] -= 1
+
+async def hash_password(password: str) -> str:
+    """ Hashes a password before storing it. """
+    return await _run(pwd_context.hash, password)
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """ Verifies a password against its hash. """
+    return await _run(pwd_context.verify, plain_password, hashed_password)
+
+def needs_rehash(hashed_password: str) -> bool:
+    """True when the stored hash was made with a different cost factor (cheap, no hashing)."""
+    return pwd_context.needs_update(hashed_password)
+
+def shutdown():
+    _executor.shutdown(wait=False)
@@ -0,0 +1,203 @@
+import asyncio
+import hashlib
+import logging
+import mimetypes
+import multiprocessing
+import os
+import re
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+from fastapi import HTTPException, UploadFile
+from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse
+from starlette.staticfiles import NotModifiedResponse
+from PIL import Image, ImageOps, UnidentifiedImageError
+from PIL.Image import DecompressionBombError
+from app.config import settings
+from app.db import db
+from app.user_directory import user_directory
+
+# 📌 **Profile photos**
+# Uploads are streamed to disk in chunks without blocking the event loop and stored under
+# their SHA-256 (`<digest><ext>`), so the same image uploaded by many users is kept once.
+# Fixed-size thumbnails are rendered by Pillow in a process pool.
+UPLOAD_FOLDER = "static/profile_pics"
+PHOTO_EXTENSIONS = {".jpg", ".jpeg", ".png"}
+CHUNK_SIZE = 256 * 1024
+THUMBNAIL_SIZE = (128, 128)
+THUMBNAIL_FORMATS = {"webp": "WEBP", "jpg": "JPEG"}
+
+os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        # ✅ spawn, not fork: the process already runs threads (Motor, bcrypt, logging) by now
+        _executor = ProcessPoolExecutor(
+            max_workers=settings.PHOTO_THUMBNAIL_WORKERS, mp_context=multiprocessing.get_context("spawn")
+        )
+    return _executor
+
+def shutdown():
+    if _executor is not None:
+        _executor.shutdown(wait=False)
+
+def photo_url(filename: str) -> str:
+    return f"/static/profile_pics/{filename}"
+
+def thumbnail_filename(digest: str, ext: str = "webp") -> str:
+    return f"{digest}_thumb.{ext}"
+
+def make_thumbnails(source_path: str, digest: str):
+    """Render every thumbnail format of an image (runs in a worker process)."""
+    with Image.open(source_path) as image:
+        image = ImageOps.exif_transpose(image)
+        thumbnail = ImageOps.fit(image.convert("RGB"), THUMBNAIL_SIZE, Image.LANCZOS)
+
+    for ext, image_format in THUMBNAIL_FORMATS.items():
+        path = os.path.join(UPLOAD_FOLDER, thumbnail_filename(digest, ext))
+        if os.path.exists(path):
+            continue
+        partial = f"{path}.{os.getpid()}.part"
+        thumbnail.save(partial, image_format, quality=85)
+        os.replace(partial, path)  # atomic, so readers never see a half-written thumbnail
+
+async def _stream_to_temp(upload: UploadFile):
+    """Copy an upload to a temporary file chunk by chunk, hashing it and enforcing the size cap."""
+    digest = hashlib.sha256()
+    size = 0
+    temp = await asyncio.to_thread(tempfile.NamedTemporaryFile, dir=UPLOAD_FOLDER, suffix=".part", delete=False)
+    try:
+        while chunk := await upload.read(CHUNK_SIZE):
+            size += len(chunk)
+            if size > settings.PHOTO_MAX_BYTES:
+                raise HTTPException(
+                    status_code=413, detail=f"Photo is larger than {settings.PHOTO_MAX_BYTES // (1024 * 1024)} MB"
+                )
+            digest.update(chunk)
+            await asyncio.to_thread(temp.write, chunk)
+        await asyncio.to_thread(temp.close)
+    except BaseException:
+        await asyncio.to_thread(temp.close)
+        await asyncio.to_thread(os.remove, temp.name)
+        raise
+    return temp.name, digest.hexdigest()
+
+async def save_photo(upload: UploadFile) -> dict:
+    """
+    Store an uploaded profile photo and its thumbnails.
+    Returns `{"photo": <full image URL>, "photo_thumb": <WebP thumbnail URL>}`.
+    """
+    ext = os.path.splitext(upload.filename or "")[1].lower()
+    if ext not in PHOTO_EXTENSIONS:
+        raise HTTPException(status_code=400, detail="Only JPG, JPEG, PNG allowed")
+    ext = ".jpg" if ext == ".jpeg" else ext
+
+    temp_path, digest = await _stream_to_temp(upload)
+    filename = f"{digest}{ext}"
+    final_path = os.path.join(UPLOAD_FOLDER, filename)
+    try:
+        # ✅ Thumbnails double as validation that the upload really is an image
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(_get_executor(), make_thumbnails, temp_path, digest)
+    except (UnidentifiedImageError, DecompressionBombError, OSError):
+        await asyncio.to_thread(os.remove, temp_path)
+        raise HTTPException(status_code=400, detail="Uploaded file is not a valid image")
+
+    # ✅ Identical content is already stored under the same name: keep a single copy
+    if await asyncio.to_thread(os.path.exists, final_path):
+        await asyncio.to_thread(os.remove, temp_path)
+    else:
+        await asyncio.to_thread(os.replace, temp_path, final_path)
+
+    return {"photo": photo_url(filename), "photo_thumb": photo_url(thumbnail_filename(digest))}
+
+# 📌 **Serving avatars**
+# Content-addressed files never change, so they are cached forever (`immutable`) with the
+# file name as strong ETag; a new upload means a new URL. Legacy `<username>_<file>` avatars
+# are revalidated on every use. `.br`/`.gz` siblings, when present, are served to clients
+# that accept them.
+CONTENT_ADDRESSED = re.compile(r"^[0-9a-f]{64}(_thumb)?\.(png|jpg|webp)$")
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+PRECOMPRESSED = (("br", ".br"), ("gzip", ".gz"))
+
+class AvatarStaticFiles(StaticFiles):
+    def file_response(self, full_path, stat_result, scope, status_code=200):
+        request_headers = Headers(scope=scope)
+        filename = os.path.basename(full_path)
+        media_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+        accept_encoding = request_headers.get("accept-encoding", "")
+
+        path, headers, etag = full_path, {"vary": "Accept-Encoding"}, f'"{filename}"'
+        for encoding, suffix in PRECOMPRESSED:
+            if encoding in accept_encoding and os.path.exists(f"{full_path}{suffix}"):
+                path = f"{full_path}{suffix}"
+                stat_result = os.stat(path)
+                headers["content-encoding"] = encoding
+                etag = f'"{filename}{suffix}"'
+                break
+
+        response = FileResponse(path, status_code=status_code, stat_result=stat_result, media_type=media_type, headers=headers)
+        if CONTENT_ADDRESSED.match(filename):
+            response.headers["etag"] = etag
+            response.headers["cache-control"] = IMMUTABLE_CACHE_CONTROL
+        else:
+            response.headers["cache-control"] = "no-cache"
+
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
+
+# 📌 **Migration of legacy avatars**: `python -m app.photos migrate`
+async def migrate_legacy_photos() -> int:
+    """Move `<username>_<file>` avatars to content-addressed storage and point users at the new URLs."""
+    migrated = 0
+    async for user in db.users.find({"photo": {"$type": "string"}}, {"photo": 1}):
+        filename = os.path.basename(user["photo"])
+        source = os.path.join(UPLOAD_FOLDER, filename)
+        if CONTENT_ADDRESSED.match(filename) or not await asyncio.to_thread(os.path.exists, source):
+            continue
+
+        digest = await asyncio.to_thread(_file_digest, source)
+        ext = os.path.splitext(filename)[1].lower().replace(".jpeg", ".jpg")
+        target = os.path.join(UPLOAD_FOLDER, f"{digest}{ext}")
+        try:
+            await asyncio.get_running_loop().run_in_executor(_get_executor(), make_thumbnails, source, digest)
+        except (UnidentifiedImageError, OSError) as e:
+            logging.warning(f"⚠️ Skipping unreadable avatar {source}: {e}")
+            continue
+        if not await asyncio.to_thread(os.path.exists, target):
+            await asyncio.to_thread(_copy_file, source, target)
+
+        await db.users.update_one(
+            {"_id": user["_id"]},
+            {"$set": {"photo": photo_url(f"{digest}{ext}"), "photo_thumb": photo_url(thumbnail_filename(digest))}},
+        )
+        user_directory.invalidate(user["_id"])
+        migrated += 1
+    return migrated
+
+def _file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as source:
+        while chunk := source.read(CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _copy_file(source: str, target: str):
+    partial = f"{target}.part"
+    with open(source, "rb") as src, open(partial, "wb") as dst:
+        while chunk := src.read(CHUNK_SIZE):
+            dst.write(chunk)
+    os.replace(partial, target)
+
+if __name__ == "__main__" and sys.argv[1:] == ["migrate"]:
+    logging.basicConfig(level=logging.INFO)
+    count = asyncio.run(migrate_legacy_photos())
+    shutdown()
+    logging.info(f"✅ Migrated {count} legacy avatars")
@@ -0,0 +1,28 @@
+# 📌 **Named projections**
+# Every `find`/`find_one`/`find_one_and_*` in `routes/` and `crud.py` asks for one of these
+# instead of whole documents, so password hashes and the unbounded `groups`/`tasks`
+# arrays never leave MongoDB unless a query really needs them.
+# `tests/test_projections.py` fails on any unprojected read.
+
+# ✅ Existence checks
+ID_ONLY = {"_id": 1}
+
+# ✅ Users
+USER_PUBLIC = {"username": 1, "email": 1, "photo": 1, "photo_thumb": 1}  # token claims, lists, avatars
+USER_PROFILE = {**USER_PUBLIC, "first_name": 1, "last_name": 1}
+USER_LOGIN = {**USER_PUBLIC, "hashed_password": 1}  # the only projection that carries the hash
+
+# ✅ Groups
+GROUP_NAME = {"name": 1}
+GROUP_MEMBERS = {"name": 1, "created_by": 1, "members": 1}
+
+# ✅ Tasks: every field the API reads or returns (leaves out `created_at`/`owner_id`)
+TASK_FIELDS = {
+    "title": 1, "description": 1, "status": 1, "priority": 1, "board_id": 1,
+    "deadline": 1, "assigned_to": 1, "created_by": 1,
+}
+TASK_EXPORT = {**TASK_FIELDS, "created_at": 1}
+TASK_OWNER = {**TASK_FIELDS, "owner_id": 1}  # `assign_task_to_user` compares the previous owner
+
+# ✅ Board stats
+BOARD_STATS = {"total": 1, "status": 1, "priority": 1, "breakdown": 1, "assignees": 1}
@@ -0,0 +1,63 @@
+from typing import Optional
+from fastapi import Request
+from pymongo.read_preferences import Nearest, Primary, PrimaryPreferred, Secondary, SecondaryPreferred
+from app.causal import read_after
+from app.config import settings
+from app.db import db, get_client
+
+# 📌 **Read preference per route**
+# `READ_POLICY` maps route (endpoint function) names to a read preference, e.g.
+# `get_tasks=secondaryPreferred,get_all_users=nearest`; routes not listed read from the primary.
+# Routes opt in with `reads: RoutedReads = Depends(routed_reads)` and issue their queries on
+# `reads.db` with `session=reads.session`. The session is causally consistent, so every read of
+# the request sees the previous ones (the board version and the tasks it versions come from the
+# same point in time) and, through app/causal.py, the caller's own latest write.
+READ_PREFERENCES = {
+    "primary": lambda staleness: Primary(),
+    "primaryPreferred": lambda staleness: PrimaryPreferred(max_staleness=staleness),
+    "secondary": lambda staleness: Secondary(max_staleness=staleness),
+    "secondaryPreferred": lambda staleness: SecondaryPreferred(max_staleness=staleness),
+    "nearest": lambda staleness: Nearest(max_staleness=staleness),
+}
+
+def parse_read_policy(spec: str) -> dict:
+    """`"route=mode,other=mode"` -> `{"route": ReadPreference, ...}`."""
+    policy = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        route, _, mode = item.partition("=")
+        if mode.strip() not in READ_PREFERENCES:
+            raise ValueError(f"Unknown read preference {mode.strip()!r} for route {route.strip()!r}")
+        policy[route.strip()] = READ_PREFERENCES[mode.strip()](settings.READ_MAX_STALENESS_SECONDS)
+    return policy
+
+read_policy = parse_read_policy(settings.READ_POLICY)
+
+class RoutedReads:
+    """Where a request's reads go: `db` carries the read preference, `session` the causal ordering."""
+    def __init__(self, read_preference=None, session=None):
+        self.read_preference = read_preference
+        self.session = session
+
+    @property
+    def db(self):
+        if self.read_preference is None:
+            return db
+        return get_client().get_database(settings.DB_NAME, read_preference=self.read_preference)
+
+PRIMARY_READS = RoutedReads()  # default for helpers shared with write paths
+
+async def routed_reads(request: Request):
+    """Dependency: a causally consistent session on the read preference configured for the route."""
+    read_preference = read_policy.get(request.scope["route"].name)
+    if read_preference is None:
+        yield PRIMARY_READS
+        return
+
+    async with await get_client().start_session(causal_consistency=True) as session:
+        point = read_after()
+        if point is not None:
+            # ✅ The secondary waits until it has applied the caller's latest write
+            if point.cluster_time is not None:
+                session.advance_cluster_time(point.cluster_time)
+            session.advance_operation_time(point.operation_time)
+        yield RoutedReads(read_preference, session)
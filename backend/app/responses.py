@@ -0,0 +1,34 @@
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from pydantic_core import to_json
+from app.metrics import record_serialization
+import time
+
+# 📌 **Fast JSON responses**
+# `FastJSONResponse` is the app's default response class: it renders with pydantic-core's
+# Rust encoder instead of `json.dumps` (ObjectIds fall back to `str`, datetimes to ISO 8601).
+class FastJSONResponse(JSONResponse):
+    def render(self, content) -> bytes:
+        started = time.perf_counter()
+        body = to_json(content, fallback=str)
+        record_serialization(time.perf_counter() - started)
+        return body
+
+def carried_headers(response: Response = None) -> dict:
+    """Headers already set on a route's injected `response` (cursor, ETag), which FastAPI
+    drops when the route returns its own Response."""
+    if response is None:
+        return {}
+    return {key: value for key, value in response.headers.items() if key != "content-length"}
+
+def model_response(adapter: TypeAdapter, content, response: Response = None) -> Response:
+    """
+    Serialize models built with `model_construct` from trusted DB rows in a single pass,
+    bypassing FastAPI's re-validation and `jsonable_encoder` walk of the route result.
+    The route keeps its `response_model` for the OpenAPI schema.
+    """
+    started = time.perf_counter()
+    body = adapter.dump_json(content)
+    record_serialization(time.perf_counter() - started)
+    return Response(body, media_type="application/json", headers=carried_headers(response))
@@ -0,0 +1,45 @@
+import asyncio
+import logging
+from datetime import datetime
+from typing import Optional
+from app.config import settings
+from app.db import db
+
+# 📌 **Revoked access tokens**
+# `revoked_tokens` holds `{"_id": <jti>, "expires_at": <token exp>}` (TTL-indexed, see app/indexes.py).
+# Every process keeps the unexpired jtis in memory and re-reads them periodically,
+# so checking a token costs a dict lookup instead of a database round trip.
+_revoked: dict = {}  # jti -> expires_at
+
+def is_revoked(jti: Optional[str]) -> bool:
+    return bool(jti) and jti in _revoked
+
+async def revoke(jti: str, expires_at: datetime):
+    """Revoke a token everywhere: this process right away, the others on their next refresh."""
+    _revoked[jti] = expires_at
+    await db.revoked_tokens.update_one(
+        {"_id": jti}, {"$set": {"expires_at": expires_at}}, upsert=True
+    )
+
+async def refresh_revoked():
+    """
+    Merge the revocations of other processes into `_revoked` and forget expired ones.
+    Merging (not replacing) keeps a jti that `revoke()` added while the query was running.
+    """
+    docs = await db.revoked_tokens.find(
+        {"expires_at": {"$gt": datetime.utcnow()}}, {"expires_at": 1}
+    ).to_list(length=None)
+    _revoked.update({doc["_id"]: doc["expires_at"] for doc in docs})
+
+    now = datetime.utcnow()
+    for jti in [jti for jti, expires_at in _revoked.items() if expires_at <= now]:
+        del _revoked[jti]
+
+async def refresh_revoked_forever():
+    """Background task started by the app lifespan."""
+    while True:
+        try:
+            await refresh_revoked()
+        except Exception as e:
+            logging.error(f"❌ Failed to refresh revoked tokens: {e}")
+        await asyncio.sleep(settings.REVOCATION_REFRESH_SECONDS)
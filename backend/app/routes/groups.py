@@ -1,34 +1,59 @@
-from fastapi import APIRouter, HTTPException, Depends, Path, logger,  Query
-from pydantic import BaseModel
+from fastapi import APIRouter, HTTPException, Depends, Path, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
 from bson import ObjectId
 from app.routes.users import get_current_user
 from app.db import db  # MongoDB connection
+from app.projections import BOARD_STATS, GROUP_MEMBERS, GROUP_NAME, ID_ONLY, USER_PUBLIC
 import logging
 from typing import Dict,List
 from app.schemas import GroupUpdate
 from app.routes import tasks
+from app.pagination import PageParams, paginate
+from app.user_directory import user_directory
+from app.events import members_payload, publish_board_event, sse_stream
+from app.board_stats import active_assignees, assignee_tasks_pipeline, empty_stats, format_dashboard, rebuild_board_stats, remove_assignee, remove_assignees
+from app.schemas import DashboardOut, GroupOut, GroupSummaryOut, UserSummaryOut
+from app.responses import FastJSONResponse, carried_headers, model_response
+from pydantic import TypeAdapter
+from app.board_version import BOARD_VERSION_INC, board_etag, board_version, not_modified, set_etag
+from app.read_routing import RoutedReads, routed_reads
+from app.transactions import write_all
+from app.config import settings
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
+
+group_summaries_adapter = TypeAdapter(List[GroupSummaryOut])
+group_adapter = TypeAdapter(GroupOut)
+group_users_adapter = TypeAdapter(List[UserSummaryOut])
 
 # 📌 **Group Schema**
 class GroupCreate(BaseModel):
     name: str
 
+# ✅ **Batch membership Schema**
+MAX_MEMBERS_BATCH = 1000
+
+class MembersBatchRequest(BaseModel):
+    add: List[str] = Field(default_factory=list, max_length=MAX_MEMBERS_BATCH)
+    remove: List[str] = Field(default_factory=list, max_length=MAX_MEMBERS_BATCH)
+
 #Retrieve all groups for a user
-@router.get("/")
-async def get_groups(user: dict = Depends(get_current_user)):
-    """Retrieve all groups the user is part of."""
-    logging.info(f"📌 Fetching groups for user: {user}")  # ✅ Debugging
+@router.get("/", response_model=List[GroupSummaryOut])
+async def get_groups(response: Response, user: dict = Depends(get_current_user), page: PageParams = Depends()):
+    """Retrieve all groups the user is part of (paginated, next cursor in `X-Next-Cursor`)."""
+    logger.debug("📌 Fetching groups for user: %s", user and user.get("id"))
 
     if not user or "id" not in user:
-        logging.error(f"❌ User authentication failed, received: {user}")  # ✅ Debugging
+        logger.error("❌ User authentication failed, received: %s", user)
         raise HTTPException(status_code=401, detail="User authentication failed")
     # Convert user ID to ObjectId
     user_id=ObjectId(user["id"])
     # ✅ Query MongoDB using `_id`
-    groups = await db.groups.find({"members": user_id}).to_list(length=100)
-    logging.info(f"📌 Found {len(groups)} groups for user {user['username']}")
-    return [{"id": str(group["_id"]), "name": group["name"]} for group in groups]
+    groups = await paginate(db.groups, {"members": user_id}, page, response, GROUP_NAME)
+    logger.debug("📌 Found %d groups for user %s", len(groups), user["username"])
+    return model_response(group_summaries_adapter, [GroupSummaryOut.model_construct(id=group["_id"], name=group["name"]) for group in groups], response)
 
 # 📌 **Create New Group
 @router.post("/", response_model=dict)
@@ -44,119 +69,91 @@ async def create_new_group(group: GroupCreate, user: dict = Depends(get_current_
     }
 
     result = await db.groups.insert_one(new_group)
+    await db.board_stats.insert_one(empty_stats(result.inserted_id))
     return {"message": "Group created successfully", "group_id": str(result.inserted_id)}
 
 # 📌 **Retrieve a Single Group by ID**
-@router.get("/{group_id}")
+@router.get("/{group_id}", response_model=GroupOut)
 async def get_group(group_id: str):
     """Fetch a specific group by its ID."""
-    group = await db.groups.find_one({"_id": ObjectId(group_id)})
+    group = await db.groups.find_one({"_id": ObjectId(group_id)}, GROUP_MEMBERS)
     if not group:
         raise HTTPException(status_code=404, detail="Group not found")
 
-    return {"id": str(group["_id"]), "name": group["name"],"created_by":str(group["created_by"]), "members": [str(m) for m in group["members"]]}
+    return model_response(group_adapter, GroupOut.model_construct(id=group["_id"], name=group["name"], created_by=group["created_by"], members=group["members"]))
 
 # 📌 **Retrieve Board Dashboard Data**
-@router.get("/{group_id}/dashboard", response_model=Dict)
-async def get_board_dashboard(group_id: str = Path(...)):
+@router.get("/{group_id}/dashboard", response_model=DashboardOut)
+async def get_board_dashboard(
+    request: Request, response: Response, group_id: str = Path(...), reads: RoutedReads = Depends(routed_reads)
+):
     """
     Retrieve comprehensive task statistics for a board.
+    Counts cover every task; each assignee's `tasks` list holds at most
+    `DASHBOARD_TASKS_PER_ASSIGNEE` tasks (default 100), the first ones by creation.
+    Carries an `ETag` from the board version; `If-None-Match` is answered with 304.
+    Reads follow the route's read preference (secondaries by default, see app/read_routing.py).
     """
     if not group_id or not ObjectId.is_valid(group_id):
         raise HTTPException(status_code=400, detail="Invalid board ID format")
 
-    board = await db.groups.find_one({"_id": ObjectId(group_id)})
-    if not board:
+    version = await board_version(ObjectId(group_id), reads)
+    if version is None:
         raise HTTPException(status_code=404, detail="Board not found")
+    etag = board_etag("dashboard", group_id, version)
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+    set_etag(response, etag)
+
+    # ✅ Counters are kept up to date by every task write, so this is a single lookup
+    stats = await reads.db.board_stats.find_one({"_id": ObjectId(group_id)}, BOARD_STATS, session=reads.session)
+
+    # ✅ Boards created before the counters existed get them built on first read
+    if not stats:
+        stats = await rebuild_board_stats(ObjectId(group_id))
+
+    # ✅ Task lists of the assignees: one indexed query, capped per assignee
+    assignee_ids = active_assignees(stats)
+    rows = await reads.db.tasks.aggregate(
+        assignee_tasks_pipeline(ObjectId(group_id), assignee_ids, settings.DASHBOARD_TASKS_PER_ASSIGNEE), session=reads.session
+    ).to_list(length=None) if assignee_ids else []
+    tasks_by_assignee = {row["_id"]: row["tasks"] for row in rows}
 
-    # ✅ Fetch all tasks for this board
-    tasks = await db.tasks.find({"board_id": ObjectId(group_id)}).to_list(length=500)
-
-    # ✅ Task Count by Status
-    status_counts = {
-        "not_started": sum(1 for task in tasks if task["status"] == "Not Started"),
-        "working_on_it": sum(1 for task in tasks if task["status"] == "Working on It"),
-        "done": sum(1 for task in tasks if task["status"] == "Done"),
-    }
-
-    # ✅ Task Count by Priority
-    priority_counts = {
-        "high": sum(1 for task in tasks if task["priority"] == "High"),
-        "medium": sum(1 for task in tasks if task["priority"] == "Medium"),
-        "low": sum(1 for task in tasks if task["priority"] == "Low"),
-    }
+    # ✅ Fetch Usernames for Assigned Tasks
+    directory = await user_directory.get_many(assignee_ids)
+    users = [{"_id": user_id, **entry} for user_id, entry in directory.items()]
 
-    # ✅ Tasks Assigned to Users with Task Details
-    user_task_counts = {}
-    for task in tasks:
-        for user_id in task.get("assigned_to", []):
-            if user_id not in user_task_counts:
-                user_task_counts[user_id] = {
-                    "tasks": [],
-                    "high": 0,
-                    "medium": 0,
-                    "low": 0
-                }
-            user_task_counts[user_id][task["priority"].lower()] += 1
-            user_task_counts[user_id]["tasks"].append({
-                "task_id": str(task["_id"]),
-                "title": task["title"],
-                "status": task["status"],
-                "priority": task["priority"]
-            })
+    # ✅ Counters from our own stats document need no re-validation
+    return FastJSONResponse(format_dashboard(stats, users, tasks_by_assignee), headers=carried_headers(response))
 
-    # ✅ Fetch Usernames for Assigned Tasks
-    user_ids = list(user_task_counts.keys())
-    users = await db.users.find({"_id": {"$in": [ObjectId(uid) for uid in user_ids]}}).to_list(length=100)
-
-    # ✅ Format Assigned Tasks by Username
-    assigned_tasks = [
-        {
-            "name": user["username"],
-            "tasks": user_task_counts.get(str(user["_id"]), {}).get("tasks", []),
-            "high": user_task_counts.get(str(user["_id"]), {}).get("high", 0),
-            "medium": user_task_counts.get(str(user["_id"]), {}).get("medium", 0),
-            "low": user_task_counts.get(str(user["_id"]), {}).get("low", 0),
-        }
-        for user in users
-    ]
-
-    # ✅ Priority Breakdown Per Status
-    priority_breakdown = {
-        "high": {
-            "not_started": sum(1 for task in tasks if task["priority"] == "High" and task["status"] == "Not Started"),
-            "working_on_it": sum(1 for task in tasks if task["priority"] == "High" and task["status"] == "Working on It"),
-            "done": sum(1 for task in tasks if task["priority"] == "High" and task["status"] == "Done"),
-        },
-        "medium": {
-            "not_started": sum(1 for task in tasks if task["priority"] == "Medium" and task["status"] == "Not Started"),
-            "working_on_it": sum(1 for task in tasks if task["priority"] == "Medium" and task["status"] == "Working on It"),
-            "done": sum(1 for task in tasks if task["priority"] == "Medium" and task["status"] == "Done"),
-        },
-        "low": {
-            "not_started": sum(1 for task in tasks if task["priority"] == "Low" and task["status"] == "Not Started"),
-            "working_on_it": sum(1 for task in tasks if task["priority"] == "Low" and task["status"] == "Working on It"),
-            "done": sum(1 for task in tasks if task["priority"] == "Low" and task["status"] == "Done"),
-        },
-    }
+# 📌 **Live Board Events (Server-Sent Events)**
+@router.get("/{group_id}/events")
+async def board_events(group_id: str, request: Request):
+    """
+    Stream task and membership changes of a board as Server-Sent Events.
+    Clients fetch the board once, then apply the pushed diffs instead of polling.
+    """
+    if not ObjectId.is_valid(group_id):
+        raise HTTPException(status_code=400, detail="Invalid board ID format")
+    if not await db.groups.find_one({"_id": ObjectId(group_id)}, ID_ONLY):
+        raise HTTPException(status_code=404, detail="Board not found")
 
-    return {
-        "total": len(tasks),
-        "status_counts": status_counts,
-        "priority_counts": priority_counts,
-        "assigned_tasks":list(assigned_tasks),
-        "priority_breakdown": priority_breakdown,
-    }
+    return StreamingResponse(
+        sse_stream(group_id, request),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 # 📌 **Add User to Group**
 @router.patch("/{group_id}/add_user/{user_id}")
 async def add_user(group_id: str, user_id: str):
     """Adds a user to a group."""
-    group = await db.groups.find_one({"_id": ObjectId(group_id)})
+    group = await db.groups.find_one({"_id": ObjectId(group_id)}, GROUP_MEMBERS)
     if not group:
         raise HTTPException(status_code=404, detail="Group not found")
 
-    user = await db.users.find_one({"_id": ObjectId(user_id)})
+    user = await db.users.find_one({"_id": ObjectId(user_id)}, USER_PUBLIC)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
@@ -165,21 +162,119 @@ async def add_user(group_id: str, user_id: str):
 
     await db.groups.update_one(
         {"_id": ObjectId(group_id)},
-        {"$push": {"members": ObjectId(user_id)}}
+        {"$push": {"members": ObjectId(user_id)}, **BOARD_VERSION_INC}
     )
+    publish_board_event(group_id, "members.changed", members=members_payload(group["members"] + [ObjectId(user_id)]))
     return {"message": f"User {user['username']} added to group {group['name']}"}
 
+# 📌 **Add and remove many members at once**
+@router.post("/{group_id}/members:batch", response_model=dict)
+async def batch_members(group_id: str, request: MembersBatchRequest, user: dict = Depends(get_current_user)):
+    """
+    Add the users in `add` and remove the users in `remove` from a group (members of the group only).
+    All users are checked with one `$in` query; `members` is updated with `$addToSet` / `$pullAll`,
+    and removed users are unassigned from every task of the board with one `update_many`.
+    Returns one result per user, in request order (`add` first, then `remove`).
+    """
+    if not ObjectId.is_valid(group_id):
+        raise HTTPException(status_code=400, detail="Invalid board ID format")
+    if not request.add and not request.remove:
+        raise HTTPException(status_code=400, detail="Nothing to add or remove")
+    if set(request.add) & set(request.remove):
+        raise HTTPException(status_code=400, detail="A user cannot be both added and removed")
+
+    group_oid = ObjectId(group_id)
+    group = await db.groups.find_one({"_id": group_oid}, GROUP_MEMBERS)
+    if not group:
+        raise HTTPException(status_code=404, detail="Group not found")
+    if ObjectId(user["id"]) not in group["members"]:
+        raise HTTPException(status_code=403, detail="You are not a member of this board")
+
+    # ✅ Every referenced user in one query
+    user_oids = {ObjectId(user_id) for user_id in request.add + request.remove if ObjectId.is_valid(user_id)}
+    found = await db.users.find({"_id": {"$in": list(user_oids)}}, ID_ONLY).to_list(length=len(user_oids))
+    existing = {user["_id"] for user in found}
+    members = set(group["members"])
+
+    results, to_add, to_remove, seen = [], [], [], set()
+    for op, user_ids in (("add", request.add), ("remove", request.remove)):
+        for user_id in user_ids:
+            result = {"index": len(results), "op": op, "user_id": user_id, "status": "ok"}
+            results.append(result)
+            if not ObjectId.is_valid(user_id):
+                error = "Invalid user ID format"
+            elif ObjectId(user_id) not in existing:
+                error = "User not found"
+            elif ObjectId(user_id) in seen:
+                error = "Duplicate user in request"
+            elif op == "add" and ObjectId(user_id) in members:
+                error = "User is already in this group"
+            elif op == "remove" and ObjectId(user_id) not in members:
+                error = "User is not a member of this group"
+            elif op == "remove" and ObjectId(user_id) == group.get("created_by"):
+                error = "Cannot remove the group creator"
+            else:
+                (to_add if op == "add" else to_remove).append(ObjectId(user_id))
+                seen.add(ObjectId(user_id))
+                continue
+            result["status"] = "error"
+            result["error"] = error
+
+    # ✅ `$addToSet` and `$pullAll` can't share an update on the same field: one write each,
+    # after one `update_many` for the task unassignments and the counters it clears. `write_all`
+    # applies them in this order and stops at a failure, so the member update carrying the version
+    # bump lands last: a failed unassignment changes nothing and no 304 hides tasks still assigned.
+    removed_ids = [str(user_oid) for user_oid in to_remove]
+    writes, unassigned = [], 0
+
+    async def unassign_removed(session):
+        nonlocal unassigned
+        result = await db.tasks.update_many(
+            {"board_id": group_oid, "assigned_to": {"$in": removed_ids + to_remove}},
+            {"$pull": {"assigned_to": {"$in": removed_ids + to_remove}}},  # IDs are stored as str or ObjectId
+            session=session,
+        )
+        unassigned = result.modified_count
+
+    if to_remove:
+        writes.append(unassign_removed)
+        writes.append(lambda s: remove_assignees(group_oid, removed_ids, session=s))
+        writes.append(lambda s: db.groups.update_one(
+            {"_id": group_oid}, {"$pullAll": {"members": to_remove}, **({} if to_add else BOARD_VERSION_INC)}, session=s
+        ))
+    if to_add:
+        writes.append(lambda s: db.groups.update_one(
+            {"_id": group_oid}, {"$addToSet": {"members": {"$each": to_add}}, **BOARD_VERSION_INC}, session=s
+        ))
+
+    if writes:
+        await write_all(*writes)
+        new_members = [member for member in group["members"] if member not in seen] + to_add
+        publish_board_event(group_id, "members.changed", members=members_payload(new_members))
+    logger.info("📌 Group %s: %d members added, %d removed, %d tasks unassigned", group_id, len(to_add), len(to_remove), unassigned)
+
+    return {"added": len(to_add), "removed": len(to_remove), "unassigned_tasks": unassigned, "results": results}
+
 # 📌 **Get Users in a Group**
-@router.get("/{group_id}/users")
+@router.get("/{group_id}/users", response_model=List[UserSummaryOut])
 async def get_group_users(group_id: str):
     """Fetches all users in a given group."""
-    group = await db.groups.find_one({"_id": ObjectId(group_id)})
+    group = await db.groups.find_one({"_id": ObjectId(group_id)}, GROUP_MEMBERS)
     if not group:
         raise HTTPException(status_code=404, detail="Group not found")
 
-    users = await db.users.find({"_id": {"$in": group["members"]}}).to_list(length=100)
+    directory = await user_directory.get_many(group["members"])
+    members = [str(member) for member in group["members"] if str(member) in directory]
 
-    return [{"id": str(user["_id"]), "username": user["username"], "email": user["email"]} for user in users]
+    return model_response(group_users_adapter, [
+        UserSummaryOut.model_construct(
+            id=user_id,
+            username=directory[user_id]["username"],
+            email=directory[user_id]["email"],
+            photo=directory[user_id].get("photo_thumb"),  # ✅ Thumbnail for list views
+        )
+        for user_id in members
+    ])
 
 # 📌 **Remove User from Group & Unassign from Tasks**
 @router.delete("/{group_id}/remove_user/{user_id}")
@@ -194,12 +289,12 @@ async def remove_user_from_group_api(group_id: str, user_id: str):
         raise HTTPException(status_code=400, detail="Invalid ObjectId format")
 
     # ✅ Find the group
-    group = await db.groups.find_one({"_id": group_oid})
+    group = await db.groups.find_one({"_id": group_oid}, GROUP_MEMBERS)
     if not group:
         raise HTTPException(status_code=404, detail="Group not found")
 
     # ✅ Find the user
-    user = await db.users.find_one({"_id": user_oid})
+    user = await db.users.find_one({"_id": user_oid}, USER_PUBLIC)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
@@ -214,31 +309,34 @@ async def remove_user_from_group_api(group_id: str, user_id: str):
     # ✅ **Unassign user from ALL TASKS (convert IDs to match stored format)**
     task_update_result = await db.tasks.update_many(
         {"board_id": group_oid},  # Filter for tasks in the correct board
-        {"$pull": {"assigned_to": str(user_id)}}  # Ensure user ID format matches the database
+        {"$pull": {"assigned_to": {"$in": [str(user_id), user_oid]}}}  # IDs are stored as str or ObjectId
     )
+    await remove_assignee(group_oid, str(user_oid))
 
     if task_update_result.modified_count > 0:
-        logging.info(f"✅ User {user_id} unassigned from {task_update_result.modified_count} tasks in group {group_id}.")
+        logger.info("✅ User %s unassigned from %d tasks in group %s.", user_id, task_update_result.modified_count, group_id)
     else:
-        logging.warning(f"⚠️ No tasks updated. User may not have been assigned.")
+        logger.warning("⚠️ No tasks updated. User may not have been assigned.")
 
     # ✅ **Remove user from the group**
     group_update_result = await db.groups.update_one(
         {"_id": group_oid},
-        {"$pull": {"members": user_oid}}
+        {"$pull": {"members": user_oid}, **BOARD_VERSION_INC}  # ✅ Also covers the unassignments above
     )
 
     if group_update_result.modified_count == 0:
         raise HTTPException(status_code=500, detail="Failed to remove user from group.")
 
+    publish_board_event(group_id, "members.changed", members=members_payload(m for m in group["members"] if m != user_oid))
+
     return {"message": f"User {user['username']} removed from group {group['name']} and all assigned tasks."}
 
 # 📌 **Delete Group**
 @router.delete("/{group_id}")
 async def delete_group(group_id: str,user: dict = Depends(get_current_user)):
     """Deletes a group."""
-    group = await db.groups.find_one({"_id": ObjectId(group_id)})
-    logging.info(f"📌 Deleting group {group_id} by user: {user} and group {group}")  # ✅ Debugging
+    group = await db.groups.find_one({"_id": ObjectId(group_id)}, GROUP_MEMBERS)
+    logger.info("📌 Deleting group %s by user %s", group_id, user["id"])
 
     if not group:
         raise HTTPException(status_code=404, detail="Group not found")
@@ -247,12 +345,14 @@ async def delete_group(group_id: str,user: dict = Depends(get_current_user)):
         raise HTTPException(status_code=403, detail="You are not the creator of this group")
         
     await db.groups.delete_one({"_id": ObjectId(group_id)})
+    await db.board_stats.delete_one({"_id": ObjectId(group_id)})
+    publish_board_event(group_id, "board.deleted")
     return {"message": f"Group {group['name']} deleted successfully"}
 
 @router.patch("/{group_id}")
 async def update_group_name(group_id: str, group: GroupUpdate):
     """Update group name."""
-    existing_group = await db.groups.find_one({"_id": ObjectId(group_id)})
+    existing_group = await db.groups.find_one({"_id": ObjectId(group_id)}, ID_ONLY)
     if not existing_group:
         raise HTTPException(status_code=404, detail="Group not found")
 
@@ -260,4 +360,5 @@ async def update_group_name(group_id: str, group: GroupUpdate):
         {"_id": ObjectId(group_id)},
         {"$set": {"name": group.name}}
     )
+    publish_board_event(group_id, "board.updated", name=group.name)
     return {"message": f"Group {group_id} updated successfully"}
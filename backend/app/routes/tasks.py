@@ -1,13 +1,29 @@
+import asyncio
 import logging
-from fastapi import APIRouter, HTTPException, Query, Depends
+from fastapi import APIRouter, HTTPException, Query, Depends, Request, Response
+from fastapi.responses import StreamingResponse
 from datetime import datetime
 from bson import ObjectId
-from pydantic import BaseModel
-from typing import Optional, List
+from pymongo import DeleteOne, ReturnDocument, UpdateOne
+from pydantic import BaseModel, Field
+from pymongo.errors import BulkWriteError
+from typing import Optional, List, Literal
 from app.db import db
+from app.projections import GROUP_MEMBERS, GROUP_NAME, TASK_FIELDS
 from app.routes.users import get_current_user
+from app.board_stats import COUNTED_FIELDS, rebuild_board_stats, record_task_change, record_task_changes
+from app.board_version import board_etag, board_version, bump_board_versions, not_modified, set_etag
+from app.read_routing import RoutedReads, routed_reads
+from app.pagination import PageParams, paginate
+from app.user_directory import user_directory
+from app.serializers import board_task_response
+from app.schemas import BoardTaskOut, UserTaskOut
+from app.responses import model_response
+from pydantic import TypeAdapter
+from app.events import publish_task_event
+from app.export import EXPORT_FORMATS, stream_csv, stream_ndjson
+from app.transactions import write_all
 from app.crud import (
-    create_task,
     get_task_by_id,
     delete_task,
     assign_task_to_user,
@@ -15,6 +31,10 @@ from app.crud import (
 )
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
+
+board_tasks_adapter = TypeAdapter(List[BoardTaskOut])
+user_tasks_adapter = TypeAdapter(List[UserTaskOut])
 
 # ✅ **Task Schema** (Pydantic)
 class TaskCreate(BaseModel):
@@ -25,85 +45,154 @@ class TaskCreate(BaseModel):
     board_id: str  # ✅ This is a MongoDB ID (we will convert it)
     deadline: Optional[datetime] # ✅ Accept deadline as a string
 
+### 📌 **Helpers shared by the single and bulk write endpoints**
+def parse_deadline(deadline):
+    """Convert a `YYYY-MM-DD` deadline into a `datetime` (None and datetimes pass through)."""
+    if not deadline or isinstance(deadline, datetime):
+        return deadline or None
+    try:
+        return datetime.strptime(deadline, "%Y-%m-%d")
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid deadline format. Use YYYY-MM-DD")
+
+def check_assignees(assigned_to: list, board: dict):
+    """Raise unless every assigned user ID is a member of `board`."""
+    if not all(ObjectId.is_valid(user_id) for user_id in assigned_to):
+        raise HTTPException(status_code=400, detail="Invalid user ID format")
+    if not all(ObjectId(user_id) in board["members"] for user_id in assigned_to):
+        raise HTTPException(status_code=400, detail="One or more users are not members of this board")
+
+def build_task_document(task: TaskCreate, user: dict) -> dict:
+    """The document stored for a newly created task."""
+    return {
+        "_id": ObjectId(),
+        "title": task.title,
+        "description": task.description or "",
+        "status": task.status,
+        "priority": task.priority,
+        "board_id": ObjectId(task.board_id),
+        "created_by": ObjectId(user["id"]),
+        "created_at": datetime.utcnow(),
+        "deadline": parse_deadline(task.deadline)  # ✅ Store as a `datetime` object for MongoDB
+    }
+
+# ✅ **Bulk Schema**
+MAX_BULK_OPERATIONS = 1000
+
+# Fields `PATCH /{task_id}` and bulk updates may change; moving a task between boards isn't an update
+UPDATABLE_TASK_FIELDS = {"title", "description", "status", "priority", "deadline", "assigned_to"}
+
+class BulkTaskOperation(BaseModel):
+    op: Literal["create", "update", "delete"]
+    task: Optional[TaskCreate] = None  # create
+    task_id: Optional[str] = None  # update / delete
+    changes: Optional[dict] = None  # update, only `UPDATABLE_TASK_FIELDS`
+
+class BulkTaskRequest(BaseModel):
+    operations: List[BulkTaskOperation] = Field(..., min_length=1, max_length=MAX_BULK_OPERATIONS)
+
 # 📌 **Retrieve all tasks (filter by `board_id`)**
-@router.get("/", response_model=List[dict])
-async def get_tasks(board_id: str = Query(None)):
+@router.get("/", response_model=List[BoardTaskOut])
+async def get_tasks(
+    request: Request,
+    response: Response,
+    board_id: str = Query(None),
+    page: PageParams = Depends(),
+    reads: RoutedReads = Depends(routed_reads),
+):
     """
     Retrieve all tasks with an optional filter by `board_id`
+    Paginated by `limit`/`cursor`; the next page's cursor is in the `X-Next-Cursor` header.
+    Board lists carry an `ETag` from the board version and answer `If-None-Match` with 304.
     """
     if board_id and not ObjectId.is_valid(board_id):
         raise HTTPException(status_code=400, detail="Invalid board ID format")
 
+    # ✅ Read the version before the tasks, so a concurrent write can only make the ETag older
+    version = await board_version(ObjectId(board_id), reads) if board_id else None
+    if version is not None:
+        etag = board_etag("tasks", board_id, version, page)
+        cached = not_modified(request, etag)
+        if cached:
+            return cached
+        set_etag(response, etag)
+
     filter_query = {"board_id": ObjectId(board_id)} if board_id else {}
-    tasks = await db.tasks.find(filter_query).to_list(length=100)
+    tasks = await paginate(reads.db.tasks, filter_query, page, response, TASK_FIELDS, reads.session)
 
     # ✅ Fetch all unique user IDs from assigned_to field
-    user_ids = set()
-    for task in tasks:
-        for user_id in task.get("assigned_to", []):
-            if ObjectId.is_valid(user_id):
-                user_ids.add(ObjectId(user_id))
-
-    logging.info(f"📌 Extracted User IDs: {user_ids}")  # ✅ Debug user IDs
-
-    # ✅ Fetch user details for mapping
-    users = await db.users.find({"_id": {"$in": list(user_ids)}}).to_list(length=len(user_ids))
-    user_map = {str(user["_id"]): user["username"] for user in users}  # ✅ Ensure keys are strings
-
-    logging.info(f"📌 User Map: {user_map}")  # ✅ Debug user mapping
-
-    response = []
-    for task in tasks:
-        assigned_users = []
-        for user_id in task.get("assigned_to", []):
-            assigned_users.append(user_map.get(str(user_id), "Unknown User"))  # ✅ Ensure string lookup
-
-        logging.info(f"📌 Task {task['_id']} Assigned To: {assigned_users}")  # ✅ Log assigned users
-
-        response.append({
-            "id": str(task["_id"]),
-            "title": task["title"],
-            "description": task.get("description", ""),
-            "status": task["status"],
-            "priority": task["priority"],
-            "board_id": str(task["board_id"]),
-            "deadline": task.get("deadline", None),
-            "assigned_to": assigned_users,  # ✅ Should now show usernames
-            "assigned_to_ids": [str(user_id) for user_id in task.get("assigned_to", [])],  # ✅ Show IDs as well
-            "created_by": str(task["created_by"]),
-        })
-
-    return response
+    user_ids = {str(user_id) for task in tasks for user_id in task.get("assigned_to", [])}
+
+    logger.debug("📌 Extracted User IDs: %s", user_ids)
+
+    # ✅ Resolve usernames through the shared user directory cache
+    user_map = await user_directory.usernames(user_ids)  # ✅ Keys are strings
+
+    logger.debug("📌 User Map: %s", user_map)
+
+    return model_response(board_tasks_adapter, [board_task_response(task, user_map) for task in tasks], response)
 
 # 📌 **Retrive all user tasks
-@router.get("/user/{user_id}", response_model=List[dict])
-async def get_users_tasks(user_id: str):
-    logging.info(f"📌 Fetching tasks for User ID: {user_id}")
+@router.get("/user/{user_id}", response_model=List[UserTaskOut])
+async def get_users_tasks(
+    user_id: str, response: Response, page: PageParams = Depends(), reads: RoutedReads = Depends(routed_reads)
+):
+    logger.debug("📌 Fetching tasks for User ID: %s", user_id)
 
     if not ObjectId.is_valid(user_id):
         raise HTTPException(status_code=400, detail="Invalid user ID format")
 
-    tasks = await db.tasks.find({"assigned_to": user_id}).to_list(length=100)
+    tasks = await paginate(reads.db.tasks, {"assigned_to": user_id}, page, response, TASK_FIELDS, reads.session)
 
     # Fetch board names
     board_ids = {task["board_id"] for task in tasks}  # Get unique board IDs
-    boards = await db.groups.find({"_id": {"$in": list(board_ids)}}).to_list(length=len(board_ids))
+    boards = await reads.db.groups.find(
+        {"_id": {"$in": list(board_ids)}}, GROUP_NAME, session=reads.session
+    ).to_list(length=len(board_ids))
     board_map = {str(board["_id"]): board["name"] for board in boards}  # Map {board_id: board_name}
 
-    return [
-        {
-            "id": str(task["_id"]),
-            "title": task["title"],
-            "description": task.get("description", ""),
-            "status": task["status"],
-            "priority": task["priority"],
-            "board_Name": board_map.get(str(task["board_id"]), "Unknown Board"),  # ✅ Get board name
-            "deadline": task.get("deadline", None),
-            "assigned_to": [str(user) for user in task.get("assigned_to", [])],
-            "created_by": str(task["created_by"]),
-        }
+    return model_response(user_tasks_adapter, [
+        UserTaskOut.model_construct(
+            id=task["_id"],
+            title=task["title"],
+            description=task.get("description", ""),
+            status=task["status"],
+            priority=task["priority"],
+            board_Name=board_map.get(str(task["board_id"]), "Unknown Board"),  # ✅ Get board name
+            deadline=task.get("deadline", None),
+            assigned_to=task.get("assigned_to", []),
+            created_by=task["created_by"],
+        )
         for task in tasks
-    ]
+    ], response)
+
+# 📌 **Export tasks of a board or a user as NDJSON/CSV**
+@router.get("/export")
+async def export_tasks(
+    board_id: Optional[str] = Query(None),
+    user_id: Optional[str] = Query(None),
+    format: str = Query("ndjson"),
+):
+    """
+    Stream every task of a board (`board_id`) or assigned to a user (`user_id`).
+    Unlike `GET /api/tasks` there is no page size; rows are streamed as the cursor advances.
+    """
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported format. Use one of: {', '.join(EXPORT_FORMATS)}")
+    if bool(board_id) == bool(user_id):
+        raise HTTPException(status_code=400, detail="Provide exactly one of board_id or user_id")
+
+    export_id = board_id or user_id
+    if not ObjectId.is_valid(export_id):
+        raise HTTPException(status_code=400, detail="Invalid ID format")
+
+    filter_query = {"board_id": ObjectId(board_id)} if board_id else {"assigned_to": user_id}
+    stream = stream_csv if format == "csv" else stream_ndjson
+    return StreamingResponse(
+        stream(filter_query),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="tasks_{export_id}.{format}"'},
+    )
 
 # 📌 **Create a new task**
 @router.post("/", response_model=dict)
@@ -119,30 +208,182 @@ async def create_new_task(task: TaskCreate, user: dict = Depends(get_current_use
     if not board:
         raise HTTPException(status_code=404, detail=f"Board with ID {task.board_id} not found")
 
-    # ✅ Convert deadline only if provided
-    deadline_dt = None
-    if task.deadline:
-        try:
-            deadline_dt = datetime.strptime(task.deadline, "%Y-%m-%d")
-        except ValueError:
-            raise HTTPException(status_code=400, detail="Invalid deadline format. Use YYYY-MM-DD")
-
     # ✅ Prepare new task object
-    new_task = {
-        "title": task.title,
-        "description": task.description or "",
-        "status": task.status,
-        "priority": task.priority,
-        "board_id": ObjectId(task.board_id),
-        "created_by": ObjectId(user["id"]),
-        "created_at": datetime.utcnow(),
-        "deadline": deadline_dt  # ✅ Store as a `datetime` object for MongoDB
-    }
+    new_task = build_task_document(task, user)
 
-    # ✅ Insert into MongoDB
-    result = await db.tasks.insert_one(new_task)
+    # ✅ The task and its board counters are written together (one transaction on a replica set)
+    await write_all(
+        lambda s: db.tasks.insert_one(new_task, session=s),
+        lambda s: record_task_change(None, new_task, session=s),
+    )
+    await publish_task_event("task.created", new_task)
 
-    return {"message": "Task created successfully", "task_id": str(result.inserted_id)}
+    return {"message": "Task created successfully", "task_id": str(new_task["_id"])}
+
+async def settle_task_writes(planned: list, stats_changes: list, fail) -> set:
+    """
+    After a bulk write that matched fewer tasks than planned, reload the tasks: operations on a task
+    that ended up in its planned state count as applied, the others fail. Returns their boards.
+    """
+    final = {task_id: after for _, task_id, _, after in planned}
+    found = await db.tasks.find({"_id": {"$in": list(final)}}, TASK_FIELDS).to_list(length=len(final))
+    current = {task["_id"]: task for task in found}
+
+    def as_planned(task_id) -> bool:
+        expected, task = final[task_id], current.get(task_id)
+        if expected is None or task is None:
+            return expected is None and task is None
+        return all(expected.get(field) == task.get(field) for field in ("board_id",) + COUNTED_FIELDS)
+
+    stale_boards = set()
+    for i, task_id, before, after in planned:
+        if as_planned(task_id):
+            stats_changes.append((before, after))
+        else:
+            fail(i, "Task was changed by another request, retry")
+            stale_boards.add(before["board_id"])
+    return stale_boards
+
+# 📌 **Create / update / delete many tasks in one request**
+@router.post("/bulk", response_model=dict)
+async def bulk_tasks(request: BulkTaskRequest, user: dict = Depends(get_current_user)):
+    """
+    Run a list of create/update/delete operations.
+    Tasks and boards are loaded with one `$in` query each, board membership is checked once per board,
+    creates go through one `insert_many`, updates/deletes through one ordered `bulk_write` and
+    the board counters are updated with one `bulk_write`.
+    Returns one result per operation, in request order; operations that matched nothing are errors.
+    """
+    operations = request.operations
+    results = [{"index": i, "op": op.op, "status": "ok"} for i, op in enumerate(operations)]
+
+    def fail(i: int, detail: str):
+        results[i]["status"] = "error"
+        results[i]["error"] = detail
+
+    # ✅ Load every referenced task, then every referenced board, in one query each
+    task_ids = {ObjectId(op.task_id) for op in operations if op.task_id and ObjectId.is_valid(op.task_id)}
+    tasks = await db.tasks.find({"_id": {"$in": list(task_ids)}}, TASK_FIELDS).to_list(length=len(task_ids))
+    task_map = {task["_id"]: task for task in tasks}
+
+    board_ids = {task["board_id"] for task in tasks}
+    board_ids |= {ObjectId(op.task.board_id) for op in operations if op.task and ObjectId.is_valid(op.task.board_id)}
+    boards = await db.groups.find({"_id": {"$in": list(board_ids)}}, GROUP_MEMBERS).to_list(length=len(board_ids))
+    board_map = {board["_id"]: board for board in boards}
+    user_oid = ObjectId(user["id"])
+    allowed_boards = {board_id for board_id, board in board_map.items() if user_oid in board["members"]}
+
+    def board_for(i: int, board_id) -> Optional[dict]:
+        if board_id not in board_map:
+            fail(i, "Board not found")
+        elif board_id not in allowed_boards:
+            fail(i, "You are not a member of this board")
+        else:
+            return board_map[board_id]
+
+    # ✅ Validate every operation and build the write requests
+    new_tasks, new_task_indexes = [], []
+    writes = {}  # task _id -> [(index, board_id, changes or None for a delete)]
+    for i, op in enumerate(operations):
+        try:
+            if op.op == "create":
+                if not op.task or not ObjectId.is_valid(op.task.board_id):
+                    fail(i, "A valid task with board_id is required")
+                elif board_for(i, ObjectId(op.task.board_id)):
+                    new_tasks.append(build_task_document(op.task, user))
+                    new_task_indexes.append(i)
+                continue
+
+            if not op.task_id or not ObjectId.is_valid(op.task_id):
+                fail(i, "Invalid task ID format")
+                continue
+            task = task_map.get(ObjectId(op.task_id))
+            if not task:
+                fail(i, "Task not found")
+                continue
+            board = board_for(i, task["board_id"])
+            if not board:
+                continue
+
+            results[i]["task_id"] = op.task_id
+            changes = None
+            if op.op == "update":
+                changes = dict(op.changes or {})
+                if not changes:
+                    fail(i, "No changes given")
+                    continue
+                unknown = sorted(set(changes) - UPDATABLE_TASK_FIELDS)
+                if unknown:
+                    fail(i, f"Fields cannot be updated: {', '.join(unknown)}")
+                    continue
+                if "deadline" in changes:
+                    changes["deadline"] = parse_deadline(changes["deadline"])
+                if changes.get("assigned_to"):
+                    check_assignees(changes["assigned_to"], board)
+            writes.setdefault(task["_id"], []).append((i, task["board_id"], changes))
+        except HTTPException as e:
+            fail(i, e.detail)
+
+    # ✅ One insert_many for all creates
+    stats_changes = []
+    if new_tasks:
+        failed_inserts = set()
+        try:
+            await db.tasks.insert_many(new_tasks, ordered=False)
+        except BulkWriteError as e:
+            failed_inserts = {error["index"] for error in e.details.get("writeErrors", [])}
+        for position, (i, doc) in enumerate(zip(new_task_indexes, new_tasks)):
+            if position in failed_inserts:
+                fail(i, "Insert failed")
+            else:
+                results[i]["task_id"] = str(doc["_id"])
+                stats_changes.append((None, doc))
+
+    # ✅ Updates and deletes in one ordered bulk_write, the counters moved from the tasks loaded
+    # above. Each write also matches the fields the counters were computed from, so a task
+    # another request changed in between is left alone instead of skewing them; the operations
+    # of one task chain in request order. The board_id filter keeps each write on the board
+    # whose membership was checked.
+    requests, planned = [], []  # planned: (index, task _id, before, after)
+    for task_id, task_writes in writes.items():
+        state = task_map[task_id]
+        for i, board_id, changes in task_writes:
+            if state is None:  # deleted earlier in this request
+                fail(i, "Task not found")
+                continue
+            query = {"_id": task_id, "board_id": board_id, **{field: state.get(field) for field in COUNTED_FIELDS}}
+            after = {**state, **changes} if changes is not None else None
+            requests.append(DeleteOne(query) if changes is None else UpdateOne(query, {"$set": changes}))
+            planned.append((i, task_id, state, after))
+            state = after
+
+    stale_boards = set()
+    if requests:
+        try:
+            result = await db.tasks.bulk_write(requests, ordered=True)
+            applied = result.matched_count + result.deleted_count
+        except BulkWriteError:
+            applied = None
+        if applied == len(requests):
+            stats_changes.extend((before, after) for _, _, before, after in planned)
+        else:
+            # Some writes matched nothing: keep the operations whose task ended up as planned,
+            # recount the other tasks' boards from scratch
+            stale_boards = await settle_task_writes(planned, stats_changes, fail)
+
+    # ✅ All counter changes in one bulk_write
+    await record_task_changes(stats_changes)
+    if stale_boards:
+        await asyncio.gather(*(rebuild_board_stats(board_oid) for board_oid in stale_boards))
+        await bump_board_versions(stale_boards)
+    for before, after in stats_changes:
+        if after:
+            await publish_task_event("task.created" if before is None else "task.updated", after)
+        else:
+            await publish_task_event("task.deleted", before)
+
+    failed = sum(1 for result in results if result["status"] == "error")
+    return {"succeeded": len(results) - failed, "failed": failed, "results": results}
 
 # 📌 Update a task
 @router.patch("/{task_id}", response_model=dict)
@@ -150,37 +391,36 @@ async def update_task(task_id: str, task_update: dict):
     if not ObjectId.is_valid(task_id):
         raise HTTPException(status_code=400, detail="Invalid task ID format")
 
+    unknown = sorted(set(task_update) - UPDATABLE_TASK_FIELDS)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Fields cannot be updated: {', '.join(unknown)}")
+
     task = await get_task_by_id(task_id)
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
 
     # ✅ Validate deadline format before updating
-    if "deadline" in task_update and task_update["deadline"]:
-        try:
-            task_update["deadline"] = datetime.strptime(task_update["deadline"], "%Y-%m-%d")
-        except ValueError:
-            raise HTTPException(status_code=400, detail="Invalid deadline format. Use YYYY-MM-DD")
+    if "deadline" in task_update:
+        task_update["deadline"] = parse_deadline(task_update["deadline"])
 
     # ✅ Ensure assigned users are in the board
     if "assigned_to" in task_update and task_update["assigned_to"]:
-        board = await db.groups.find_one({"_id": ObjectId(task["board_id"])})
+        board = await db.groups.find_one({"_id": ObjectId(task["board_id"])}, GROUP_MEMBERS)
         if not board:
             raise HTTPException(status_code=404, detail="Board not found")
+        check_assignees(task_update["assigned_to"], board)
 
-        # Convert string IDs to ObjectIds and validate membership
-        assigned_user_ids = [ObjectId(user_id) for user_id in task_update["assigned_to"]]
-        board_member_ids = board["members"]
-
-        # Check if all assigned users are in the board
-        if not all(user_id in board_member_ids for user_id in assigned_user_ids):
-            raise HTTPException(status_code=400, detail="One or more users are not members of this board")
-
-    # ✅ Perform the update
-    await db.tasks.update_one({"_id": ObjectId(task_id)}, {"$set": task_update})
+    # ✅ Perform the update, keeping the exact previous version for the board counters
+    previous_task = await db.tasks.find_one_and_update(
+        {"_id": ObjectId(task_id)}, {"$set": task_update}, projection=TASK_FIELDS, return_document=ReturnDocument.BEFORE
+    )
+    if not previous_task:
+        raise HTTPException(status_code=404, detail="Task not found")
 
-    # ✅ Debugging log to check saved values
-    updated_task = await get_task_by_id(task_id)
-    print(f"📌 Updated Task in DB: {updated_task}")
+    updated_task = {**previous_task, **task_update}
+    logger.debug("📌 Updated task %s: %s", task_id, task_update)
+    await record_task_change(previous_task, updated_task)
+    await publish_task_event("task.updated", updated_task)
 
     return {"message": "Task updated successfully"}
 
@@ -205,6 +445,7 @@ async def assign_task(task_id: str, user_id: str):
         raise HTTPException(status_code=400, detail="User is not assigned to this board")
 
     await assign_task_to_user(task_id, user_id)
+    await publish_task_event("task.updated", {**task, "owner_id": ObjectId(user_id)})
     return {"message": "Task assigned successfully"}
 
 # 📌 **Unassign a task from a user**
@@ -216,14 +457,23 @@ async def unassign_task(task_id: str, user_id: str):
     if not ObjectId.is_valid(user_id) or not ObjectId.is_valid(task_id):
         raise HTTPException(status_code=400, detail="Invalid ID format")
 
-    task = await get_users_tasks(task_id)
+    task = await get_task_by_id(task_id)
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
 
-    await db.tasks.update_one(
+    previous_task = await db.tasks.find_one_and_update(
         {"_id": ObjectId(task_id)},
-        {"$pull": {"assigned_to": ObjectId(user_id)}}
+        {"$pull": {"assigned_to": ObjectId(user_id)}},
+        projection=TASK_FIELDS,
+        return_document=ReturnDocument.BEFORE
     )
+    if previous_task:
+        updated_task = {
+            **previous_task,
+            "assigned_to": [uid for uid in previous_task.get("assigned_to", []) if uid != ObjectId(user_id)],
+        }
+        await record_task_change(previous_task, updated_task)
+        await publish_task_event("task.updated", updated_task)
     return {"message": "Task unassigned successfully"}
 
 # 📌 **Delete a task**
@@ -240,4 +490,5 @@ async def remove_task(task_id: str):
         raise HTTPException(status_code=404, detail="Task not found")
 
     await delete_task(task_id)
+    await publish_task_event("task.deleted", task)
     return {"message": f"Task with ID {task_id} deleted successfully"}
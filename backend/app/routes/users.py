@@ -1,36 +1,42 @@
 import logging
-from fastapi import APIRouter, Form, HTTPException, Depends, Request
+from fastapi import APIRouter, Form, HTTPException, Depends, Request, Response
 from fastapi.security import OAuth2PasswordBearer
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, TypeAdapter
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import List, Optional
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from app.db import db  # MongoDB connection
+from app.projections import ID_ONLY, USER_LOGIN, USER_PROFILE, USER_PUBLIC
+from app.pagination import PageParams, paginate
+from app.read_routing import RoutedReads, routed_reads
+from app.passwords import hash_password, verify_password, needs_rehash
+from app.revocation import is_revoked, revoke
+from app.user_directory import user_directory
+from app.config import settings
+from uuid import uuid4
 from bson import ObjectId
 from fastapi import UploadFile, File
+from app.photos import save_photo
+from app.schemas import UserProfileOut, UserSummaryOut
+from app.responses import model_response
 import os
-import shutil
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
-# Create an uploads folder
-UPLOAD_FOLDER = "static/profile_pics"
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-
 # Create a router instance
 router = APIRouter()
+logger = logging.getLogger(__name__)
+
+user_profile_adapter = TypeAdapter(UserProfileOut)
+users_adapter = TypeAdapter(List[UserSummaryOut])
 
 # JWT Configuration
 SECRET_KEY = os.getenv("SECRET_KEY", "super-secret-key")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 60))
 
-# Password Hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 ### 📌 **Schemas**
 
 class LoginRequest(BaseModel):
@@ -42,14 +48,6 @@ class Token(BaseModel):
     token_type: str
 
 ### 📌 **Helper Functions**
-def hash_password(password: str) -> str:
-    """ Hashes a password before storing it. """
-    return pwd_context.hash(password)
-
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """ Verifies a password against its hash. """
-    return pwd_context.verify(plain_password, hashed_password)
-
 def create_access_token(data: dict, user: dict, expires_delta: Optional[timedelta] = None):
     """ Generates a JWT token. """
     to_encode = data.copy()
@@ -60,12 +58,13 @@ def create_access_token(data: dict, user: dict, expires_delta: Optional[timedelt
     to_encode.update({
         "user_id": str(user["_id"]),  # Convert ObjectId to string
         "username": user["username"],
-        "photo": user["photo"] if "photo" in user else None
+        "photo": user["photo"] if "photo" in user else None,
+        "photo_thumb": user.get("photo_thumb")
     })
     expire = datetime.utcnow() + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "jti": uuid4().hex})  # jti lets a single token be revoked
     
-    logging.info(f"🔑 Creating JWT Token with: {to_encode}")  # ✅ Debugging
+    logger.debug("🔑 Creating JWT for user %s", to_encode["user_id"])  # ✅ Never log the claims or the token
 
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
@@ -76,24 +75,41 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 SECRET_KEY = "your-secret-key"  # Replace this with an actual secret key
 ALGORITHM = "HS256"
 
-# Enable logging
-logging.basicConfig(level=logging.INFO)
+def decode_access_token(token: str) -> dict:
+    """Verify a JWT and reject revoked ones. Raises `JWTError` for bad tokens."""
+    payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    if is_revoked(payload.get("jti")):
+        raise JWTError("Token has been revoked")
+    return payload
+
+async def load_token_user(payload: dict) -> Optional[dict]:
+    """
+    The user document a verified token belongs to.
+    In `stateless` auth mode the signed claims are trusted as is and MongoDB is not queried;
+    in `db` mode (default) the user is read by email on every request.
+    """
+    if settings.AUTH_MODE == "stateless" and ObjectId.is_valid(payload.get("user_id") or ""):
+        return {
+            "_id": ObjectId(payload["user_id"]),
+            "username": payload.get("username"),
+            "email": payload["sub"],
+            "photo": payload.get("photo"),
+            "photo_thumb": payload.get("photo_thumb"),
+        }
+    return await db.users.find_one({"email": payload["sub"]}, USER_PUBLIC)
 
 ### 📌 **Dependency Injection**
 async def get_current_user(token: str = Depends(oauth2_scheme)):
     """Extracts the current user from the JWT token."""
     try:
-        logging.info(f"🔑 Received Token: {token}")  # ✅ Debugging
-
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        logging.info(f"📌 Decoded JWT Payload: {payload}")  # ✅ Debugging
+        payload = decode_access_token(token)
 
         email: str = payload.get("sub")
         if not email:
             raise HTTPException(status_code=401, detail="Invalid authentication credentials")
 
-        # ✅ Get user from MongoDB using email
-        user = await db.users.find_one({"email": email})
+        # ✅ Get user from the token claims or from MongoDB, depending on AUTH_MODE
+        user = await load_token_user(payload)
         if not user:
             raise HTTPException(status_code=401, detail="User not found")
 
@@ -104,11 +120,11 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
             "email": user["email"],
             "photo": user.get("photo")
         }
-        logging.info(f"✅ Token valid, user authenticated: {user_data}")
+        logger.debug("✅ Token valid, user authenticated: %s", user_data["id"])
         return user_data
 
     except JWTError as e:
-        logging.error(f"❌ JWT Error: {e}")
+        logger.error("❌ JWT Error: %s", e)
         raise HTTPException(status_code=401, detail="Invalid authentication credentials")
      
 ### 📌 **Signup Endpoint**
@@ -123,25 +139,17 @@ async def signup(
 ):
     """Signup user and handle image upload."""
 
-    existing_user = await db.users.find_one({"email": email})
+    existing_user = await db.users.find_one({"email": email}, ID_ONLY)
     if existing_user:
         raise HTTPException(status_code=400, detail="Email already registered")
 
-    hashed_password = hash_password(password)
-
-    # ✅ Handle Image Upload
-    photo_url = None
-    if photo:
-        file_ext = os.path.splitext(photo.filename)[1].lower()
-        if file_ext not in [".jpg", ".jpeg", ".png"]:
-            raise HTTPException(status_code=400, detail="Only JPG, JPEG, PNG allowed")
-        
-        filename = f"{username}_{photo.filename}"
-        file_path = os.path.join(UPLOAD_FOLDER, filename)
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(photo.file, buffer)
-        
-        photo_url = f"/static/profile_pics/{filename}"  # URL to serve the image
+    hashed_password = await hash_password(password)
+
+    # ✅ Handle Image Upload (streamed, size-capped, stored by content hash, thumbnailed)
+    photos = {"photo": None, "photo_thumb": None}
+    if photo and photo.filename:
+        photos = await save_photo(photo)
+    photo_url = photos["photo"]
 
     # ✅ Create user document
     new_user = {
@@ -151,11 +159,11 @@ async def signup(
         "email": email,
         "hashed_password": hashed_password,
         "photo": photo_url,  # Store the uploaded image URL
-        "groups": [],
-        "tasks": []
+        "photo_thumb": photos["photo_thumb"],  # Small avatar for lists and headers
     }
 
     await db.users.insert_one(new_user)
+    user_directory.invalidate(new_user["_id"])
     access_token = create_access_token(data={"sub": email}, user=new_user)
 
     return {"access_token": access_token, "token_type": "bearer", "photo_url": photo_url}
@@ -163,9 +171,16 @@ async def signup(
 ### 📌 **Login Endpoint**
 @router.post("/login", response_model=Token)
 async def login(request: LoginRequest):
-    user = await db.users.find_one({"email": request.email})
-    if not user or not verify_password(request.password, user["hashed_password"]):
+    user = await db.users.find_one({"email": request.email}, USER_LOGIN)
+    if not user or not await verify_password(request.password, user["hashed_password"]):
         raise HTTPException(status_code=401, detail="Invalid email or password")
+
+    # ✅ Upgrade the stored hash when BCRYPT_ROUNDS changed since it was created
+    if needs_rehash(user["hashed_password"]):
+        await db.users.update_one(
+            {"_id": user["_id"], "hashed_password": user["hashed_password"]},
+            {"$set": {"hashed_password": await hash_password(request.password)}}
+        )
     
     # Generate JWT Token
     access_token = create_access_token(data={"sub": request.email}, user=user)
@@ -181,31 +196,51 @@ async def login(request: LoginRequest):
 async def get_current_user(token: str = Depends(oauth2_scheme)):
     """ Verify JWT token and return user info """
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = decode_access_token(token)
         email = payload.get("sub")
         if email is None:
             raise HTTPException(status_code=401, detail="Invalid token")
     except JWTError:
         raise HTTPException(status_code=401, detail="Invalid token")
 
-    user = await db.users.find_one({"email": email})
+    user = await load_token_user(payload)
     if user is None:
         raise HTTPException(status_code=404, detail="User not found")
 
     return {"id": str(user["_id"]), "username": user["username"], "email": user["email"], "photo": user.get("photo")}
 
+### 📌 **Logout (revoke the current token)**
+@router.post("/logout")
+async def logout(token: str = Depends(oauth2_scheme)):
+    """Revoke the presented token so it can no longer be used, even before it expires."""
+    try:
+        payload = decode_access_token(token)
+    except JWTError:
+        raise HTTPException(status_code=401, detail="Invalid token")
+
+    if not payload.get("jti"):
+        raise HTTPException(status_code=400, detail="Token cannot be revoked, please log in again")
+    await revoke(payload["jti"], datetime.utcfromtimestamp(payload["exp"]))
+    return {"message": "Logged out successfully"}
+
 ### 📌 **Get User Info (Protected)**
-@router.get("/{user_id}")
+@router.get("/{user_id}", response_model=UserProfileOut)
 async def get_user(user_id: str):
-    user = await db.users.find_one({"_id": ObjectId(user_id)})
+    user = await db.users.find_one({"_id": ObjectId(user_id)}, USER_PROFILE)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
-    return {"id": str(user["_id"]), "username": user["username"], "email": user["email"], "photo": user.get("photo"), "first_name": user["first_name"], "last_name": user["last_name"]}
+    return model_response(user_profile_adapter, UserProfileOut.model_construct(
+        id=user["_id"], username=user["username"], email=user["email"], photo=user.get("photo"),
+        first_name=user["first_name"], last_name=user["last_name"],
+    ))
 
 ### 📌 **Get All Users**
-@router.get("/", response_model=list)
-async def get_all_users():
-    """Retrieve all registered users"""
-    users = await db.users.find().to_list(length=100)
-    return [{"id": str(user["_id"]), "username": user["username"], "email": user["email"]} for user in users]
+@router.get("/", response_model=List[UserSummaryOut])
+async def get_all_users(response: Response, page: PageParams = Depends(), reads: RoutedReads = Depends(routed_reads)):
+    """Retrieve all registered users (paginated, next cursor in `X-Next-Cursor`)"""
+    users = await paginate(reads.db.users, {}, page, response, USER_PUBLIC, reads.session)
+    return model_response(users_adapter, [
+        UserSummaryOut.model_construct(id=user["_id"], username=user["username"], email=user["email"], photo=user.get("photo_thumb"))
+        for user in users
+    ], response)
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, EmailStr
-from typing import List, Optional
+from pydantic import BaseModel, EmailStr, PlainSerializer, WithJsonSchema
+from typing import Annotated, Any, Dict, List, Optional
 from bson import ObjectId
 from datetime import datetime
 
@@ -40,8 +40,6 @@ class UserCreate(BaseModel):
 
 class UserResponse(UserBase):
     id: str
-    groups: List[str] = []
-    tasks: List[str] = []
 
     class Config:
         json_encoders = {ObjectId: str}
@@ -57,7 +55,6 @@ class GroupResponse(GroupBase):
     id: str
     created_by: str
     members: List[str] = []
-    tasks: List[str] = []
 
     class Config:
         json_encoders = {ObjectId: str}
@@ -65,7 +62,6 @@ class GroupResponse(GroupBase):
 class GroupUpdate(BaseModel):
     name: str
     members: Optional[List[str]] = None
-    tasks: Optional[List[str]] = None
 
 # ✅ Task Schemas
 class TaskBase(BaseModel):
@@ -94,3 +90,70 @@ class TaskResponse(TaskBase):
 
     class Config:
         json_encoders = {ObjectId: str}
+
+# ✅ Response Schemas
+# Rows coming straight from MongoDB are trusted: routes build these with `model_construct`
+# (no validation) and serialize them in one pass with `app.responses.model_response`.
+# `ObjectIdStr` fields take the raw ObjectId (or str) and render it as a string.
+ObjectIdStr = Annotated[Any, PlainSerializer(str, return_type=str), WithJsonSchema({"type": "string"})]
+
+class BoardTaskOut(BaseModel):
+    id: ObjectIdStr
+    title: str
+    description: Optional[str] = ""
+    status: str
+    priority: str
+    board_id: ObjectIdStr
+    deadline: Optional[datetime] = None
+    assigned_to: List[str] = []  # Usernames
+    assigned_to_ids: List[ObjectIdStr] = []
+    created_by: ObjectIdStr
+
+class UserTaskOut(BaseModel):
+    id: ObjectIdStr
+    title: str
+    description: Optional[str] = ""
+    status: str
+    priority: str
+    board_Name: str
+    deadline: Optional[datetime] = None
+    assigned_to: List[ObjectIdStr] = []
+    created_by: ObjectIdStr
+
+class GroupSummaryOut(BaseModel):
+    id: ObjectIdStr
+    name: str
+
+class GroupOut(GroupSummaryOut):
+    created_by: ObjectIdStr
+    members: List[ObjectIdStr] = []
+
+class UserSummaryOut(BaseModel):
+    id: ObjectIdStr
+    username: str
+    email: str
+    photo: Optional[str] = None
+
+class UserProfileOut(UserSummaryOut):
+    first_name: str
+    last_name: str
+
+class DashboardTaskOut(BaseModel):
+    task_id: str
+    title: Optional[str] = None
+    status: Optional[str] = None
+    priority: Optional[str] = None
+
+class DashboardAssigneeOut(BaseModel):
+    name: str
+    tasks: List[DashboardTaskOut]
+    high: int = 0
+    medium: int = 0
+    low: int = 0
+
+class DashboardOut(BaseModel):
+    total: int
+    status_counts: Dict[str, int]
+    priority_counts: Dict[str, int]
+    assigned_tasks: List[DashboardAssigneeOut]
+    priority_breakdown: Dict[str, Dict[str, int]]
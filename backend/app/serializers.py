@@ -0,0 +1,24 @@
+from app.schemas import BoardTaskOut
+from app.user_directory import user_directory
+
+# 📌 **Task payloads shared by the list endpoint and the board event stream**
+def board_task_response(task: dict, user_map: dict) -> BoardTaskOut:
+    """One task as returned by `GET /api/tasks`, with assignee usernames from `user_map`."""
+    assigned_to = task.get("assigned_to", [])
+    return BoardTaskOut.model_construct(
+        id=task["_id"],
+        title=task["title"],
+        description=task.get("description", ""),
+        status=task["status"],
+        priority=task["priority"],
+        board_id=task["board_id"],
+        deadline=task.get("deadline", None),
+        assigned_to=[user_map.get(str(user_id), "Unknown User") for user_id in assigned_to],  # ✅ Usernames
+        assigned_to_ids=assigned_to,  # ✅ Show IDs as well (rendered as strings)
+        created_by=task.get("created_by"),
+    )
+
+async def board_task_payload(task: dict) -> dict:
+    """`board_task_response` for a single task as plain JSON data, resolving its assignees on the fly."""
+    task_response = board_task_response(task, await user_directory.usernames(task.get("assigned_to", [])))
+    return task_response.model_dump(mode="json")
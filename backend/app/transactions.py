@@ -0,0 +1,63 @@
+import asyncio
+from app.config import settings
+from app.db import get_client
+
+# 📌 **Multi-document writes**
+# A logical write that touches several documents (a task plus the references to it, a board
+# plus its stats) goes through `write_all`. Each operation is a callable taking a session:
+#
+#     await write_all(
+#         lambda s: db.tasks.insert_one(task, session=s),
+#         lambda s: db.groups.update_one(..., session=s),
+#     )
+#
+# On a replica set or sharded cluster they run in one transaction, so a crash can't leave half
+# of them applied. Either way they run one after another, in the order given, and a failure
+# stops the ones after it: list the data write first and what depends on it (counters, the
+# board version) after, so a failed write never bumps a counter or invalidates an ETag.
+# Writes that really are independent can be grouped with `concurrently`.
+# `MONGO_TRANSACTIONS=auto|on|off` overrides the detection.
+TRANSACTION_TOPOLOGIES = {"ReplicaSetWithPrimary", "ReplicaSetNoPrimary", "Sharded", "LoadBalanced"}
+
+_detected = None  # (client, supported): the deployment type never changes for a client
+
+async def detect_transactions(client) -> bool:
+    """Whether `client` talks to a deployment with transactions, from the driver's server monitoring."""
+    if client.topology_description.topology_type_name == "Unknown":
+        # ✅ Nothing discovered yet (CLIs, tests, writes ahead of `connect_db`): select a server for real
+        await client.admin.command("ping")
+    return client.topology_description.topology_type_name in TRANSACTION_TOPOLOGIES
+
+async def transactions_supported() -> bool:
+    global _detected
+    if settings.MONGO_TRANSACTIONS != "auto":
+        return settings.MONGO_TRANSACTIONS == "on"
+    client = get_client()
+    if _detected is None or _detected[0] is not client:
+        _detected = (client, await detect_transactions(client))
+    return _detected[1]
+
+async def in_order(operations, session=None) -> list:
+    """Run `operations` (callables taking a session) one after another, stopping at the first failure."""
+    return [await operation(session) for operation in operations]
+
+def concurrently(*operations):
+    """
+    One operation running independent `operations` concurrently (one round trip instead of one each),
+    or in order inside a transaction, since a session must not be used concurrently.
+    """
+    async def run(session):
+        if session is None:
+            return await asyncio.gather(*(operation(None) for operation in operations))
+        return await in_order(operations, session)
+    return run
+
+async def write_all(*operations) -> list:
+    """Apply `operations` in order, atomically when the server supports it. Returns their results."""
+    if not await transactions_supported():
+        return await in_order(operations)
+
+    async with await get_client().start_session() as session:
+        async def transaction(session):
+            return await in_order(operations, session)
+        return await session.with_transaction(transaction)
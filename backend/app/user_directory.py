@@ -0,0 +1,136 @@
+import asyncio
+import time
+from collections import OrderedDict
+from bson import ObjectId
+from app.config import settings
+from app.db import db
+from app.projections import USER_PUBLIC
+
+# 📌 **In-process user directory**
+# id -> {"username", "email", "photo", "photo_thumb"} for resolving assignees and members without a
+# `users.find` per request. Entries expire after a TTL and the least recently used ones are
+# evicted past `max_size`. Misses from concurrent requests in the same event loop tick
+# are fetched together with one `$in` query.
+USER_DIRECTORY_FIELDS = USER_PUBLIC
+
+class UserDirectory:
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()  # user_id -> (expires_at, entry)
+        self._waiting = {}  # user_id -> Future shared by every caller missing that id
+        self._in_flight = {}  # user_id -> Future of a `$in` query already sent
+        self._stale = set()  # invalidated while in flight: answer the waiters, don't cache
+        self._flush_scheduled = False
+        self._flush_tasks = set()  # strong references, the loop only keeps weak ones
+        self.hits = 0
+        self.misses = 0
+        self.batches = 0
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "batches": self.batches,
+        }
+
+    def invalidate(self, user_id):
+        self._entries.pop(str(user_id), None)
+        if str(user_id) in self._in_flight:
+            self._stale.add(str(user_id))
+
+    def clear(self):
+        self._entries.clear()
+
+    def _get_cached(self, user_id: str):
+        cached = self._entries.get(user_id)
+        if not cached:
+            return None
+        expires_at, entry = cached
+        if expires_at < time.monotonic():
+            del self._entries[user_id]
+            return None
+        self._entries.move_to_end(user_id)
+        return entry
+
+    def _store(self, user_id: str, entry: dict):
+        self._entries[user_id] = (time.monotonic() + self.ttl_seconds, entry)
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    async def _flush(self):
+        self._flush_scheduled = False
+        waiting, self._waiting = self._waiting, {}
+        self._in_flight.update(waiting)
+        self.batches += 1
+        try:
+            users = await db.users.find(
+                {"_id": {"$in": [ObjectId(user_id) for user_id in waiting]}}, USER_DIRECTORY_FIELDS
+            ).to_list(length=len(waiting))
+        except Exception as e:
+            for future in waiting.values():
+                if not future.done():
+                    future.set_exception(e)
+            users = None
+        finally:
+            for user_id in waiting:
+                self._in_flight.pop(user_id, None)
+        if users is None:
+            self._stale -= set(waiting)
+            return
+
+        found = {}
+        for user in users:
+            user_id = str(user.pop("_id"))
+            found[user_id] = user
+            if user_id not in self._stale:
+                self._store(user_id, user)
+        self._stale -= set(waiting)
+        for user_id, future in waiting.items():
+            if not future.done():
+                future.set_result(found.get(user_id))  # None for unknown users, not cached
+
+    def _start_flush(self):
+        task = asyncio.ensure_future(self._flush())
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+
+    async def get_many(self, user_ids) -> dict:
+        """Resolve user IDs (str or ObjectId) to directory entries; unknown or invalid IDs are left out."""
+        result = {}
+        futures = {}
+        loop = asyncio.get_running_loop()
+
+        for user_id in {str(user_id) for user_id in user_ids if ObjectId.is_valid(str(user_id))}:
+            entry = self._get_cached(user_id)
+            if entry is not None:
+                self.hits += 1
+                result[user_id] = entry
+                continue
+
+            self.misses += 1
+            if user_id in self._in_flight:
+                futures[user_id] = self._in_flight[user_id]
+                continue
+            if user_id not in self._waiting:
+                self._waiting[user_id] = loop.create_future()
+            futures[user_id] = self._waiting[user_id]
+
+        if self._waiting and not self._flush_scheduled:
+            self._flush_scheduled = True
+            loop.call_soon(self._start_flush)
+
+        for user_id, future in futures.items():
+            # ✅ Shared with other callers: a cancelled request must not cancel their future
+            entry = await asyncio.shield(future)
+            if entry is not None:
+                result[user_id] = entry
+        return result
+
+    async def usernames(self, user_ids) -> dict:
+        """{user_id: username} for every known user ID."""
+        return {user_id: entry["username"] for user_id, entry in (await self.get_many(user_ids)).items()}
+
+user_directory = UserDirectory(settings.USER_CACHE_SIZE, settings.USER_CACHE_TTL_SECONDS)
@@ -0,0 +1,4 @@
+def percentile(samples: list, pct: float) -> float:
+    """Nearest-rank percentile of `samples` (any order)."""
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
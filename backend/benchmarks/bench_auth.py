@@ -0,0 +1,53 @@
+"""
+Compare the two AUTH_MODEs of `get_current_user` against a local MongoDB.
+
+    python -m benchmarks.bench_auth [iterations]
+
+Prints one JSON object per mode with throughput and latency percentiles.
+"""
+import asyncio
+import json
+import sys
+import time
+from app.config import settings
+from app.db import db
+from app.routes.users import create_access_token, get_current_user
+from benchmarks import percentile
+
+async def _run_mode(mode: str, token: str, iterations: int) -> dict:
+    settings.AUTH_MODE = mode
+    await get_current_user(token)  # warm up the connection pool
+
+    samples = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        await get_current_user(token)
+        samples.append((time.perf_counter() - t0) * 1e6)
+    elapsed = time.perf_counter() - started
+
+    return {
+        "mode": mode,
+        "iterations": iterations,
+        "ops_per_sec": round(iterations / elapsed, 1),
+        "mean_us": round(sum(samples) / len(samples), 1),
+        "p50_us": round(percentile(samples, 50), 1),
+        "p99_us": round(percentile(samples, 99), 1),
+    }
+
+async def main(iterations: int):
+    user = {"username": "bench_auth", "email": "bench_auth@example.com", "hashed_password": "-", "photo": None}
+    await db.users.delete_many({"email": user["email"]})
+    await db.users.insert_one(user)
+    token = create_access_token(data={"sub": user["email"]}, user=user)
+
+    original_mode = settings.AUTH_MODE
+    try:
+        for mode in ("db", "stateless"):
+            print(json.dumps(await _run_mode(mode, token, iterations)))
+    finally:
+        settings.AUTH_MODE = original_mode
+        await db.users.delete_many({"email": user["email"]})
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000))
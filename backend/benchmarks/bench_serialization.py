@@ -0,0 +1,87 @@
+"""
+Time the `GET /api/tasks` serialization path per 1,000 tasks, before and after the typed models.
+
+    python -m benchmarks.bench_serialization [rounds]
+
+"before" is the old route: hand-built dicts with `str(ObjectId)` conversions, FastAPI's
+`jsonable_encoder` walk and `json.dumps`. "after" is `model_construct` + one Rust `dump_json`.
+Needs no database; prints one JSON object per path.
+"""
+import json
+import sys
+import time
+from datetime import datetime
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from app.responses import model_response
+from app.routes.tasks import board_tasks_adapter
+from app.serializers import board_task_response
+
+TASKS_PER_ROUND = 1000
+
+def _fake_tasks(count: int):
+    users = [ObjectId() for _ in range(20)]
+    board_id = ObjectId()
+    tasks = [
+        {
+            "_id": ObjectId(),
+            "title": f"Task {i}",
+            "description": "Benchmark task " * 4,
+            "status": "Working on It",
+            "priority": "Medium",
+            "board_id": board_id,
+            "deadline": datetime(2025, 1, 1 + i % 28),
+            "assigned_to": [str(users[i % 20]), str(users[(i + 7) % 20])],
+            "created_by": users[0],
+        }
+        for i in range(count)
+    ]
+    return tasks, {str(user): f"user{n}" for n, user in enumerate(users)}
+
+def _before(tasks: list, user_map: dict) -> bytes:
+    rows = [
+        {
+            "id": str(task["_id"]),
+            "title": task["title"],
+            "description": task.get("description", ""),
+            "status": task["status"],
+            "priority": task["priority"],
+            "board_id": str(task["board_id"]),
+            "deadline": task.get("deadline", None),
+            "assigned_to": [user_map.get(str(user_id), "Unknown User") for user_id in task.get("assigned_to", [])],
+            "assigned_to_ids": [str(user_id) for user_id in task.get("assigned_to", [])],
+            "created_by": str(task.get("created_by")),
+        }
+        for task in tasks
+    ]
+    return JSONResponse(jsonable_encoder(rows)).body
+
+def _after(tasks: list, user_map: dict) -> bytes:
+    return model_response(board_tasks_adapter, [board_task_response(task, user_map) for task in tasks]).body
+
+def _measure(name: str, serialize, tasks: list, user_map: dict, rounds: int) -> dict:
+    serialize(tasks, user_map)  # warm up
+    samples = []
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        serialize(tasks, user_map)
+        samples.append((time.perf_counter() - t0) * 1e3)
+    samples.sort()
+    return {
+        "path": name,
+        "tasks": len(tasks),
+        "rounds": rounds,
+        "mean_ms": round(sum(samples) / rounds, 3),
+        "p50_ms": round(samples[rounds // 2], 3),
+        "min_ms": round(samples[0], 3),
+    }
+
+def main(rounds: int):
+    tasks, user_map = _fake_tasks(TASKS_PER_ROUND)
+    assert json.loads(_before(tasks, user_map)) == json.loads(_after(tasks, user_map)), "Payloads differ"
+    for name, serialize in (("before", _before), ("after", _after)):
+        print(json.dumps(_measure(name, serialize, tasks, user_map, rounds)))
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
@@ -0,0 +1,123 @@
+"""
+Latency of the multi-document writes in `app.crud`, before and after `write_all`.
+
+    python -m benchmarks.bench_writes [iterations]
+
+"sequential" replays the old code: every write awaited one after another, including the
+`groups.tasks` / `users.tasks` / `users.groups` references it used to maintain. "write_all" is
+`write_all` without transactions (the remaining writes, in order), "transaction"
+is `write_all` in one transaction and only runs against a replica set. Each iteration creates a
+task, adds a member to the board and deletes the task. Prints one JSON object per mode.
+"""
+import asyncio
+import json
+import sys
+import time
+from datetime import datetime
+from types import SimpleNamespace
+from bson import ObjectId
+from app import crud
+from app.board_stats import empty_stats, record_task_change
+from app.board_version import BOARD_VERSION_INC
+from app.config import settings
+from app.db import db
+from app.projections import TASK_FIELDS
+from app.transactions import transactions_supported
+from benchmarks import percentile
+
+BENCH_BOARD_NAME = "bench-writes"
+
+### 📌 **The old, one-write-at-a-time code paths**
+async def _sequential_create_task(task_data) -> dict:
+    task = {
+        "_id": ObjectId(),
+        "title": task_data.title,
+        "description": task_data.description,
+        "status": task_data.status,
+        "priority": task_data.priority,
+        "deadline": task_data.deadline,
+        "created_at": datetime.utcnow(),
+        "board_id": ObjectId(task_data.board_id),
+        "owner_id": ObjectId(task_data.owner_id),
+    }
+    await db.tasks.insert_one(task)
+    await record_task_change(None, task)
+    await db.groups.update_one({"_id": task["board_id"]}, {"$push": {"tasks": task["_id"]}})
+    await db.users.update_one({"_id": task["owner_id"]}, {"$push": {"tasks": task["_id"]}})
+    return task
+
+async def _sequential_add_user_to_group(user_id: str, group_id: str):
+    await db.groups.update_one({"_id": ObjectId(group_id)}, {"$push": {"members": ObjectId(user_id)}, **BOARD_VERSION_INC})
+    await db.users.update_one({"_id": ObjectId(user_id)}, {"$push": {"groups": ObjectId(group_id)}})
+
+async def _sequential_delete_task(task_id: str):
+    task = await db.tasks.find_one({"_id": ObjectId(task_id)}, {"board_id": 1, "created_by": 1})
+    if not task:
+        return
+    await db.groups.update_one({"_id": task["board_id"]}, {"$pull": {"tasks": ObjectId(task_id)}})
+    await db.users.update_one({"_id": task.get("created_by")}, {"$pull": {"tasks": ObjectId(task_id)}})
+    deleted_task = await db.tasks.find_one_and_delete({"_id": ObjectId(task_id)}, projection=TASK_FIELDS)
+    if deleted_task:
+        await record_task_change(deleted_task, None)
+
+SEQUENTIAL = (_sequential_create_task, _sequential_add_user_to_group, _sequential_delete_task)
+WRITE_ALL = (crud.create_task, crud.add_user_to_group, crud.delete_task)
+
+### 📌 **Measurement**
+async def _run_mode(mode: str, operations: tuple, board_id: ObjectId, user_id: ObjectId, iterations: int) -> dict:
+    create_task, add_user_to_group, delete_task = operations
+    task_data = SimpleNamespace(
+        title="Bench write", description="", status="Not Started", priority="Low",
+        deadline=None, board_id=str(board_id), owner_id=str(user_id),
+    )
+    samples = {"create_task": [], "add_user_to_group": [], "delete_task": []}
+
+    async def timed(name: str, call):
+        t0 = time.perf_counter()
+        result = await call
+        samples[name].append((time.perf_counter() - t0) * 1e3)
+        return result
+
+    await delete_task(str((await create_task(task_data))["_id"]))  # warm up
+    for _ in range(iterations):
+        task = await timed("create_task", create_task(task_data))
+        await timed("add_user_to_group", add_user_to_group(str(user_id), str(board_id)))
+        await timed("delete_task", delete_task(str(task["_id"])))
+
+    return {
+        "mode": mode,
+        "iterations": iterations,
+        **{
+            operation: {
+                "mean_ms": round(sum(latencies) / len(latencies), 3),
+                "p50_ms": round(percentile(latencies, 50), 3),
+                "p99_ms": round(percentile(latencies, 99), 3),
+            }
+            for operation, latencies in samples.items()
+        },
+    }
+
+async def main(iterations: int):
+    user_id, board_id = ObjectId(), ObjectId()
+    await db.users.insert_one({"_id": user_id, "username": "bench_writes", "email": f"bench_writes_{user_id}@example.com"})
+    await db.groups.insert_one({"_id": board_id, "name": BENCH_BOARD_NAME, "created_by": user_id, "members": [user_id]})
+    await db.board_stats.insert_one(empty_stats(board_id))
+
+    modes = [("sequential", SEQUENTIAL, "off"), ("write_all", WRITE_ALL, "off")]
+    original = settings.MONGO_TRANSACTIONS
+    settings.MONGO_TRANSACTIONS = "auto"
+    if await transactions_supported():
+        modes.append(("transaction", WRITE_ALL, "on"))
+    try:
+        for mode, operations, transactions in modes:
+            settings.MONGO_TRANSACTIONS = transactions
+            print(json.dumps(await _run_mode(mode, operations, board_id, user_id, iterations)))
+    finally:
+        settings.MONGO_TRANSACTIONS = original
+        await db.tasks.delete_many({"board_id": board_id})
+        await db.board_stats.delete_one({"_id": board_id})
+        await db.groups.delete_one({"_id": board_id})
+        await db.users.delete_one({"_id": user_id})
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 500))
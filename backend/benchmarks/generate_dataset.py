@@ -0,0 +1,206 @@
+"""
+Generate a large synthetic dataset directly in MongoDB for scale testing.
+
+    python -m benchmarks.generate_dataset [--users 100000] [--boards 20000] [--tasks 10000000]
+                                          [--seed 1] [--workers N] [--batch-size 5000] [--drop]
+
+Documents have the shapes written by the routes (`signup`, `create_new_group`,
+`create_new_task` + assignments), but are produced in batches by worker processes and
+written with `insert_many`; every user shares a few precomputed bcrypt hashes of
+`password-<n>`. Board sizes and task counts per board are Pareto-skewed, assignees per task
+fan out from 0 to 4.
+
+Everything, including `_id`s, is derived from `--seed`, and finished batches are recorded in
+`dataset_progress`: rerunning the same command resumes where it stopped (a half-written batch
+is simply inserted again, duplicates ignored). Board stats and indexes are built at the end.
+"""
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import os
+import random
+import struct
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from bson import ObjectId
+from pymongo import MongoClient
+from pymongo.errors import BulkWriteError
+from app.config import settings
+
+PROGRESS_COLLECTION = "dataset_progress"
+PASSWORD_HASHES = 4  # distinct passwords; user n logs in with `password-<n % PASSWORD_HASHES>`
+BASE_TIMESTAMP = int(datetime(2024, 1, 1, tzinfo=timezone.utc).timestamp())
+KINDS = {"users": 1, "groups": 2, "tasks": 3}
+
+STATUSES = (["Not Started", "Working on It", "Done"], [35, 25, 40])
+PRIORITIES = (["High", "Medium", "Low"], [20, 50, 30])
+ASSIGNEE_FAN_OUT = ([0, 1, 2, 3, 4], [25, 45, 18, 8, 4])
+WORDS = "plan review ship draft fix test deploy design sync write update check migrate clean".split()
+
+### 📌 **Deterministic ids and random streams**
+def object_id(kind: str, index: int, seed: int) -> ObjectId:
+    """Same (kind, index, seed) -> same ObjectId; the timestamp part follows the index."""
+    return ObjectId(struct.pack(">IBH", BASE_TIMESTAMP + index, KINDS[kind], seed & 0xFFFF) + index.to_bytes(5, "big"))
+
+def created_at(index: int) -> datetime:
+    return datetime.utcfromtimestamp(BASE_TIMESTAMP + index)
+
+@lru_cache(maxsize=None)
+def board_members(seed: int, board: int, users: int) -> tuple:
+    """Member indexes of a board, the first one being its creator."""
+    rng = random.Random(f"{seed}:members:{board}")
+    size = min(users, 2 + int(rng.paretovariate(1.5) * 2), 500)
+    return tuple(rng.sample(range(users), size))
+
+@lru_cache(maxsize=1)
+def board_cumulative_weights(seed: int, boards: int) -> list:
+    """Pareto-distributed share of tasks per board, as cumulative weights for `choices`."""
+    rng = random.Random(f"{seed}:board-weights")
+    total, cumulative = 0.0, []
+    for _ in range(boards):
+        total += rng.paretovariate(1.2)
+        cumulative.append(total)
+    return cumulative
+
+### 📌 **Documents**
+def user_documents(config: dict, start: int, stop: int) -> list:
+    seed = config["seed"]
+    return [
+        {
+            "_id": object_id("users", i, seed),
+            "username": f"user{i}",
+            "first_name": "Synthetic",
+            "last_name": f"User {i}",
+            "email": f"user{i}@dataset.example.com",
+            "hashed_password": config["password_hashes"][i % PASSWORD_HASHES],
+            "photo": None,
+            "photo_thumb": None,
+        }
+        for i in range(start, stop)
+    ]
+
+def group_documents(config: dict, start: int, stop: int) -> list:
+    seed, users = config["seed"], config["users"]
+    documents = []
+    for i in range(start, stop):
+        members = [object_id("users", member, seed) for member in board_members(seed, i, users)]
+        documents.append({"_id": object_id("groups", i, seed), "name": f"Board {i}", "members": members, "created_by": members[0]})
+    return documents
+
+def task_documents(config: dict, start: int, stop: int) -> list:
+    seed, users, boards = config["seed"], config["users"], config["boards"]
+    rng = random.Random(f"{seed}:tasks:{start}")
+    board_indexes = rng.choices(range(boards), cum_weights=board_cumulative_weights(seed, boards), k=stop - start)
+    documents = []
+    for i, board in zip(range(start, stop), board_indexes):
+        members = board_members(seed, board, users)
+        fan_out = min(len(members), rng.choices(*ASSIGNEE_FAN_OUT)[0])
+        created = created_at(i)
+        documents.append({
+            "_id": object_id("tasks", i, seed),
+            "title": f"{rng.choice(WORDS).capitalize()} {rng.choice(WORDS)} #{i}",
+            "description": " ".join(rng.choices(WORDS, k=rng.randint(0, 12))),
+            "status": rng.choices(*STATUSES)[0],
+            "priority": rng.choices(*PRIORITIES)[0],
+            "board_id": object_id("groups", board, seed),
+            "created_by": object_id("users", members[0], seed),
+            "created_at": created,
+            "deadline": created + timedelta(days=rng.randint(1, 90)) if rng.random() < 0.7 else None,
+            "assigned_to": [str(object_id("users", member, seed)) for member in rng.sample(members, fan_out)],
+        })
+    return documents
+
+GENERATORS = {"users": user_documents, "groups": group_documents, "tasks": task_documents}
+
+### 📌 **Workers**
+_worker_db = None
+
+def _init_worker():
+    global _worker_db
+    _worker_db = MongoClient(settings.MONGO_URI)[settings.DB_NAME]
+
+def _write_batch(job: tuple) -> tuple:
+    kind, batch, config = job
+    start = batch * config["batch_size"]
+    stop = min(start + config["batch_size"], config[kind])
+    documents = GENERATORS[kind](config, start, stop)
+    try:
+        _worker_db[kind].insert_many(documents, ordered=False)
+    except BulkWriteError as e:
+        # ✅ Resuming a half-written batch: only duplicate-key errors are expected
+        if any(error["code"] != 11000 for error in e.details.get("writeErrors", [])):
+            raise
+    _worker_db[PROGRESS_COLLECTION].update_one({"_id": f"{kind}:{batch}"}, {"$set": {"count": len(documents)}}, upsert=True)
+    return kind, len(documents)
+
+### 📌 **Driver**
+def _precompute_hashes() -> list:
+    from app.passwords import pwd_context
+    return [pwd_context.hash(f"password-{n}") for n in range(PASSWORD_HASHES)]
+
+def _check_config(database, config: dict) -> dict:
+    """Store the run's parameters on first use; a resumed run must match them."""
+    keys = ("seed", "users", "boards", "tasks", "batch_size")
+    stored = database[PROGRESS_COLLECTION].find_one({"_id": "config"})
+    if stored is None:
+        config["password_hashes"] = _precompute_hashes()
+        database[PROGRESS_COLLECTION].insert_one({"_id": "config", **config})
+        return config
+    mismatched = [key for key in keys if stored.get(key) != config[key]]
+    if mismatched:
+        raise SystemExit(f"❌ Existing dataset was generated with different {', '.join(mismatched)}; use --drop to start over")
+    return {**config, "password_hashes": stored["password_hashes"]}
+
+def generate(args):
+    database = MongoClient(settings.MONGO_URI)[settings.DB_NAME]
+    if args.drop:
+        for collection in (*KINDS, "board_stats", PROGRESS_COLLECTION):
+            database.drop_collection(collection)
+    config = _check_config(database, {
+        "seed": args.seed, "users": args.users, "boards": args.boards, "tasks": args.tasks, "batch_size": args.batch_size,
+    })
+    done = {entry["_id"] for entry in database[PROGRESS_COLLECTION].find({"_id": {"$ne": "config"}}, {"_id": 1})}
+
+    # ✅ Users and boards first, so tasks never reference missing documents
+    with multiprocessing.get_context("spawn").Pool(args.workers, initializer=_init_worker) as pool:
+        for kind in KINDS:
+            batches = -(-config[kind] // config["batch_size"])
+            jobs = [(kind, batch, config) for batch in range(batches) if f"{kind}:{batch}" not in done]
+            logging.info(f"📌 {kind}: {batches - len(jobs)}/{batches} batches already written")
+            started, written = time.perf_counter(), 0
+            for finished, (_, count) in enumerate(pool.imap_unordered(_write_batch, jobs), start=1):
+                written += count
+                if finished % max(1, len(jobs) // 20) == 0 or finished == len(jobs):
+                    rate = written / max(time.perf_counter() - started, 1e-9)
+                    logging.info(f"   {kind}: {finished}/{len(jobs)} batches, {rate:,.0f} docs/s")
+
+    if "stats" not in done:
+        asyncio.run(_finish())
+        database[PROGRESS_COLLECTION].insert_one({"_id": "stats"})
+    logging.info("✅ Dataset complete")
+
+async def _finish():
+    from app.board_stats import rebuild_all_board_stats
+    from app.indexes import ensure_indexes
+    await ensure_indexes()
+    logging.info("📌 Building board stats")
+    count = await rebuild_all_board_stats()
+    logging.info(f"✅ Rebuilt stats for {count} boards")
+
+def parse_args(argv: list):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--boards", type=int, default=20_000)
+    parser.add_argument("--tasks", type=int, default=10_000_000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--drop", action="store_true", help="Drop users, groups, tasks and board_stats of DB_NAME and start over")
+    return parser.parse_args(argv)
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    generate(parse_args(sys.argv[1:]))
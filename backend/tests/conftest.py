@@ -1,13 +1,16 @@
 import pytest
 import asyncio
+import os
+os.environ.setdefault("PYTEST_RUNNING", "1")  # app settings pick test_db, also without pytest-env
 from motor.motor_asyncio import AsyncIOMotorClient
 from app.main import app
+from app.config import settings
 from httpx import AsyncClient
-import os
+from .query_budget import BudgetHooks, query_budget  # noqa: F401 (fixture)
 
 # Use a test database
 MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017")
-TEST_DB_NAME = "test_db"
+TEST_DB_NAME = settings.DB_NAME
 
 client = AsyncIOMotorClient(MONGO_URI)
 test_db = client[TEST_DB_NAME]
@@ -28,7 +31,8 @@ async def db():
 @pytest.fixture(scope="session")
 async def async_client():
     """Fixture for async test client"""
-    async with AsyncClient(app=app, base_url="http://test") as client:
+    # ✅ Every request is checked against its route's query budget (tests/query_budget.py)
+    async with AsyncClient(app=app, base_url="http://test", event_hooks=BudgetHooks().event_hooks()) as client:
         yield client
 
 @pytest.fixture(scope="session")
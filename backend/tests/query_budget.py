@@ -0,0 +1,119 @@
+"""
+Query-count budgets for the API tests.
+
+Every request sent through the `async_client` fixture is measured with the per-route
+MongoDB command counters of `app.metrics` (fed by the pymongo CommandListener), and the
+request fails the test when its route issues more commands than `QUERY_BUDGETS` allows.
+Budgets are ceilings for `AUTH_MODE=db` (one extra `find` for the current user); lower them
+when a handler gets cheaper, never raise them to make a test pass without a reason.
+
+Within a test, `query_budget(n)` asserts a tighter limit over a block of requests:
+
+    async with query_budget(2):
+        await async_client.get("/api/tasks/", params={"board_id": board_id})
+
+Commands are only seen on a real server (local mongod or the docker-compose one);
+an in-memory stand-in without command monitoring measures nothing.
+"""
+from contextlib import asynccontextmanager
+import warnings
+import pytest
+from app import metrics
+
+# (method, route template) -> max MongoDB commands per request, None = not budgeted (streams)
+QUERY_BUDGETS = {
+    ("GET", "/"): 0,
+    ("GET", "/health"): 1,                     # ping
+    # Users
+    ("POST", "/api/users/signup"): 2,          # email check, insert
+    ("POST", "/api/users/login"): 3,           # user, hash upgrade when BCRYPT_ROUNDS changed
+    ("GET", "/api/users/me"): 1,
+    ("POST", "/api/users/logout"): 1,          # revocation upsert
+    ("GET", "/api/users/{user_id}"): 1,
+    ("GET", "/api/users/"): 1,
+    # Groups
+    ("GET", "/api/groups/"): 2,                # current user, page
+    ("POST", "/api/groups/"): 3,               # current user, group, board_stats
+    ("GET", "/api/groups/{group_id}"): 1,
+    ("GET", "/api/groups/{group_id}/dashboard"): 4,  # version, board_stats, assignee tasks, directory miss
+    ("GET", "/api/groups/{group_id}/events"): None,
+    ("PATCH", "/api/groups/{group_id}/add_user/{user_id}"): 3,
+    ("GET", "/api/groups/{group_id}/users"): 2,
+    ("DELETE", "/api/groups/{group_id}/remove_user/{user_id}"): 5,
+    ("POST", "/api/groups/{group_id}/members:batch"): 8,  # current user, group, users, unassign, stats, 2 member updates, commit
+    ("DELETE", "/api/groups/{group_id}"): 4,
+    ("PATCH", "/api/groups/{group_id}"): 2,
+    # Tasks
+    ("GET", "/api/tasks/"): 3,                 # version, page, assignee directory miss
+    ("GET", "/api/tasks/user/{user_id}"): 2,   # page, board names
+    ("GET", "/api/tasks/export"): None,
+    ("POST", "/api/tasks/"): 6,                # current user, board, insert, version, board_stats, commit
+    ("POST", "/api/tasks/bulk"): 7,            # user, tasks, boards, insert_many, bulk_write, board_stats, version
+    ("PATCH", "/api/tasks/{task_id}"): 5,
+    ("PATCH", "/api/tasks/{task_id}/assign"): 4,
+    ("PATCH", "/api/tasks/{user_id}"): 4,
+    ("DELETE", "/api/tasks/{task_id}"): 7,
+}
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+def _snapshot() -> tuple:
+    return dict(metrics.requests_total.series), dict(metrics.mongo_commands.series)
+
+def _measure(before: tuple) -> list:
+    """`(method, route, commands)` for every method and route served since `before` was taken."""
+    requests_before, commands_before = before
+    requests_after, commands_after = _snapshot()
+    # ✅ One entry per (method, route), whatever statuses its requests returned
+    served = {
+        (method, route)
+        for (method, route, status), count in requests_after.items()
+        if count != requests_before.get((method, route, status), 0)
+    }
+    measured = []
+    for method, route in served:
+        commands = sum(
+            value - commands_before.get(key, 0)
+            for key, value in commands_after.items()
+            if key[:2] == (method, route)
+        )
+        measured.append((method, route, commands))
+    return measured
+
+def check_budgets(measured: list):
+    for method, route, commands in measured:
+        if (method, route) not in QUERY_BUDGETS:
+            warnings.warn(f"No query budget declared for {method} {route} ({commands} commands)")
+            continue
+        budget = QUERY_BUDGETS[(method, route)]
+        if budget is not None and commands > budget:
+            raise QueryBudgetExceeded(f"{method} {route} issued {commands} MongoDB commands, budget is {budget}")
+
+class BudgetHooks:
+    """httpx event hooks that check each request of the test client against `QUERY_BUDGETS`."""
+    def __init__(self):
+        self._before = None
+
+    async def on_request(self, request):
+        self._before = _snapshot()
+
+    async def on_response(self, response):
+        if self._before is not None:
+            check_budgets(_measure(self._before))
+            self._before = None
+
+    def event_hooks(self) -> dict:
+        return {"request": [self.on_request], "response": [self.on_response]}
+
+@pytest.fixture
+def query_budget():
+    """`async with query_budget(n):` fails when the requests in the block issue more than `n` commands."""
+    @asynccontextmanager
+    async def limit(max_commands: int):
+        before = _snapshot()
+        yield
+        commands = sum(count for _, _, count in _measure(before))
+        if commands > max_commands:
+            raise QueryBudgetExceeded(f"Block issued {commands} MongoDB commands, budget is {max_commands}")
+    return limit
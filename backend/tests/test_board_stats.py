@@ -0,0 +1,53 @@
+from bson import ObjectId
+from app.board_stats import assignee_tasks_pipeline, merge_stats_updates, stats_update
+
+board_id = ObjectId()
+user_id = str(ObjectId())
+task = {
+    "_id": ObjectId(),
+    "title": "Write report",
+    "status": "Not Started",
+    "priority": "High",
+    "board_id": board_id,
+    "assigned_to": [user_id],
+}
+
+def test_stats_update_on_create():
+    update = stats_update(None, task)
+    assert update["$inc"] == {
+        "total": 1,
+        "status.not_started": 1,
+        "priority.high": 1,
+        "breakdown.high.not_started": 1,
+        f"assignees.{user_id}.total": 1,
+        f"assignees.{user_id}.high": 1,
+    }
+    assert set(update) == {"$inc"}
+
+def test_stats_update_on_status_change():
+    update = stats_update(task, {**task, "status": "Done"})
+    assert update["$inc"] == {
+        "status.not_started": -1,
+        "status.done": 1,
+        "breakdown.high.not_started": -1,
+        "breakdown.high.done": 1,
+    }
+    assert set(update) == {"$inc"}
+
+def test_stats_update_on_delete():
+    update = stats_update(task, None)
+    assert update["$inc"]["total"] == -1
+    assert update["$inc"][f"assignees.{user_id}.total"] == -1
+
+def test_stats_update_without_changes_is_empty():
+    assert stats_update(task, {**task, "description": "edited"}) == {}
+
+def test_merge_stats_updates_drops_cancelled_counters():
+    merged = merge_stats_updates([stats_update(None, task), stats_update(task, None)])
+    assert merged == {}
+
+def test_assignee_tasks_are_capped_inside_the_group():
+    pipeline = assignee_tasks_pipeline(board_id, [user_id], 5)
+    group = next(stage["$group"] for stage in pipeline if "$group" in stage)
+    assert group["tasks"]["$firstN"]["n"] == 5
+    assert pipeline[-1] is next(stage for stage in pipeline if "$group" in stage), "No stage should trim the lists after grouping"
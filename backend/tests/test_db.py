@@ -0,0 +1,55 @@
+from types import SimpleNamespace
+import pytest
+from httpx import AsyncClient
+from app import db as mongo
+from app.config import settings
+
+ADDRESS = ("localhost", 27017)
+
+def _event():
+    return SimpleNamespace(address=ADDRESS)
+
+def test_only_installed_compressors_are_requested(monkeypatch):
+    monkeypatch.setitem(mongo.COMPRESSOR_MODULES, "snappy", "not_an_installed_module")
+    assert mongo.available_compressors("zstd, snappy,zlib,brotli") == ["zstd", "zlib"]
+
+def test_client_options_come_from_settings(monkeypatch):
+    monkeypatch.setattr(settings, "MONGO_MAX_POOL_SIZE", 42)
+    monkeypatch.setattr(settings, "MONGO_SOCKET_TIMEOUT_MS", 0)
+    options = mongo.client_options()
+    assert options["maxPoolSize"] == 42
+    assert options["socketTimeoutMS"] is None  # 0 = no timeout
+
+def test_pool_monitor_saturation(monkeypatch):
+    monkeypatch.setattr(settings, "MONGO_MAX_POOL_SIZE", 4)
+    monitor = mongo.PoolMonitor()
+    monitor.pool_created(_event())
+    for _ in range(3):
+        monitor.connection_created(_event())
+        monitor.connection_check_out_started(_event())
+        monitor.connection_checked_out(_event())
+    monitor.connection_checked_in(_event())
+    monitor.connection_check_out_started(_event())
+    monitor.connection_check_out_failed(_event())
+
+    stats = monitor.stats()
+    assert (stats["open"], stats["in_use"], stats["waiting"]) == (3, 2, 0)
+    assert stats["saturation"] == 0.5
+    assert stats["checkout_failures"] == 1
+    assert stats["servers"] == {"localhost:27017": {"open": 3, "in_use": 2, "waiting": 0}}
+
+    monitor.pool_closed(_event())
+    assert monitor.stats()["open"] == 0
+
+def test_db_proxy_reuses_one_client():
+    assert mongo.db.tasks.database is mongo.db["users"].database
+    assert mongo.db.client is mongo.get_client()
+
+@pytest.mark.asyncio
+async def test_health_endpoint(async_client: AsyncClient):
+    response = await async_client.get("/health")
+    assert response.status_code == 200
+    body = response.json()
+    assert body["status"] in ("ok", "degraded")
+    assert body["mongo"]["ping_ms"] is not None
+    assert body["pool"]["max_size"] == settings.MONGO_MAX_POOL_SIZE
@@ -0,0 +1,33 @@
+import pytest
+from bson import ObjectId
+from app.events import SUBSCRIBER_QUEUE_SIZE, BoardEventBus, _handle_task_change, event_bus
+
+@pytest.mark.asyncio
+async def test_events_reach_only_the_board_subscribers():
+    bus = BoardEventBus()
+    async with bus.subscribe("board-a") as queue_a, bus.subscribe("board-b") as queue_b:
+        bus.publish("board-a", {"type": "task.created"})
+        assert (await queue_a.get())["type"] == "task.created"
+        assert queue_b.empty()
+    assert not bus.has_subscribers("board-a"), "Subscription leaked after disconnect"
+
+@pytest.mark.asyncio
+async def test_slow_subscriber_gets_resync():
+    bus = BoardEventBus()
+    async with bus.subscribe("board-a") as queue:
+        for _ in range(SUBSCRIBER_QUEUE_SIZE + 1):
+            bus.publish("board-a", {"type": "task.updated"})
+        assert queue.qsize() == 1
+        assert (await queue.get())["type"] == "resync"
+
+@pytest.mark.asyncio
+async def test_change_stream_delete_reaches_only_its_board():
+    board_id, task_id = ObjectId(), ObjectId()
+    delete = {"operationType": "delete", "documentKey": {"_id": task_id}}
+    async with event_bus.subscribe(str(board_id)) as own, event_bus.subscribe(str(ObjectId())) as other:
+        await _handle_task_change(delete)
+        assert own.empty() and other.empty(), "A delete without pre-image must not be broadcast"
+
+        await _handle_task_change({**delete, "fullDocumentBeforeChange": {"_id": task_id, "board_id": board_id}})
+        assert (await own.get())["task_id"] == str(task_id)
+        assert other.empty()
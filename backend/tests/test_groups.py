@@ -2,6 +2,9 @@ import pytest
 from httpx import AsyncClient
 from app.main import app
 from .test_users import test_signup  # Import user creation test
+from app.board_stats import summarize_status_priority
+from app.db import db
+from bson import ObjectId
 
 test_group = {}
 
@@ -32,6 +35,61 @@ async def test_get_groups(async_client: AsyncClient, test_user_fixture):
     response = await async_client.get("/api/groups/", headers=headers)
     assert response.status_code == 200, f"Get groups failed: {response.text}"
 
+@pytest.mark.asyncio
+async def test_get_board_dashboard(async_client: AsyncClient, test_user_fixture):
+    assert "group_id" in test_group, "Group must be created first"
+
+    response = await async_client.get(f"/api/groups/{test_group['group_id']}/dashboard")
+    assert response.status_code == 200, f"Get dashboard failed: {response.text}"
+    data = response.json()
+    assert set(data) == {"total", "status_counts", "priority_counts", "assigned_tasks", "priority_breakdown"}
+    assert set(data["priority_breakdown"]["high"]) == {"not_started", "working_on_it", "done"}
+
+def test_summarize_status_priority():
+    rows = [
+        {"_id": {"status": "Done", "priority": "High"}, "count": 3},
+        {"_id": {"status": "Not Started", "priority": "Low"}, "count": 2},
+        {"_id": {"status": "Pending", "priority": "Medium"}, "count": 1},
+    ]
+    summary = summarize_status_priority(rows)
+    assert summary["total"] == 6
+    assert summary["status_counts"] == {"not_started": 2, "working_on_it": 0, "done": 3}
+    assert summary["priority_counts"] == {"high": 3, "medium": 1, "low": 2}
+    assert summary["priority_breakdown"]["high"]["done"] == 3
+
+@pytest.mark.asyncio
+async def test_batch_members(async_client: AsyncClient, test_user_fixture):
+    assert "group_id" in test_group, "Group must be created first"
+    group_id = test_group["group_id"]
+    headers = {"Authorization": f"Bearer {test_user_fixture['access_token']}"}
+    users = [{"_id": ObjectId(), "username": f"batch{i}", "email": f"batch{i}-{ObjectId()}@example.com"} for i in range(3)]
+    await db.users.insert_many(users)
+    user_ids = [str(user["_id"]) for user in users]
+    task = {"_id": ObjectId(), "title": "Batch", "status": "Done", "priority": "Low", "board_id": ObjectId(group_id), "assigned_to": [user_ids[0]]}
+    try:
+        response = await async_client.post(f"/api/groups/{group_id}/members:batch", json={"add": user_ids})
+        assert response.status_code == 401, "Batch membership changes require authentication"
+
+        response = await async_client.post(
+            f"/api/groups/{group_id}/members:batch", json={"add": user_ids + [str(ObjectId())]}, headers=headers
+        )
+        assert response.status_code == 200, f"Batch add failed: {response.text}"
+        body = response.json()
+        assert body["added"] == 3
+        assert [result["status"] for result in body["results"]] == ["ok", "ok", "ok", "error"]
+
+        await db.tasks.insert_one(task)
+        response = await async_client.post(f"/api/groups/{group_id}/members:batch", json={"remove": user_ids[:2]}, headers=headers)
+        assert response.status_code == 200, f"Batch remove failed: {response.text}"
+        assert (response.json()["removed"], response.json()["unassigned_tasks"]) == (2, 1)
+
+        group = await db.groups.find_one({"_id": ObjectId(group_id)}, {"members": 1})
+        assert users[2]["_id"] in group["members"] and users[0]["_id"] not in group["members"]
+        assert (await db.tasks.find_one({"_id": task["_id"]}, {"assigned_to": 1}))["assigned_to"] == []
+    finally:
+        await db.tasks.delete_one({"_id": task["_id"]})
+        await db.users.delete_many({"_id": {"$in": [user["_id"] for user in users]}})
+
 @pytest.mark.asyncio
 async def test_delete_group(async_client: AsyncClient, test_user_fixture):
     global test_group
@@ -0,0 +1,26 @@
+import pytest
+from app.db import db
+from app.indexes import INDEXES, check_indexes, ensure_indexes
+
+@pytest.mark.asyncio
+async def test_ensure_indexes_is_idempotent():
+    """Running the index manager twice creates everything once and reports no drift."""
+    await ensure_indexes(db)
+    report = await ensure_indexes(db)
+
+    expected = {f"{collection}.{spec['name']}" for collection, specs in INDEXES.items() for spec in specs}
+    assert set(report["ok"]) == expected, f"Unexpected index report: {report}"
+    assert not report["missing"] and not report["drifted"]
+
+@pytest.mark.asyncio
+async def test_check_indexes_reports_drift():
+    """An index with the expected name but different keys is reported as drifted."""
+    await ensure_indexes(db)
+    await db.groups.drop_index("members_id")
+    await db.groups.create_index([("members", -1), ("_id", 1)], name="members_id")
+    try:
+        report = await check_indexes(db)
+        assert "groups.members_id" in report["drifted"], f"Drift not detected: {report}"
+    finally:
+        await db.groups.drop_index("members_id")
+        await ensure_indexes(db)
@@ -0,0 +1,46 @@
+import json
+import logging
+import queue
+from app.logs import DeferredQueueHandler, JsonFormatter, PolicyFilter, parse_policy
+
+def _record(name: str, level=logging.INFO, msg="hello %s", args=("world",)):
+    return logging.LogRecord(name, level, __file__, 1, msg, args, None)
+
+def test_parse_policy():
+    assert parse_policy("app.routes.tasks=0.1, app=5") == {"app.routes.tasks": 0.1, "app": 5.0}
+    assert parse_policy("") == {}
+
+def test_json_formatter_includes_extra_fields():
+    record = _record("app.routes.tasks")
+    record.board_id = "abc"
+    entry = json.loads(JsonFormatter().format(record))
+    assert entry["msg"] == "hello world"
+    assert entry["logger"] == "app.routes.tasks"
+    assert entry["board_id"] == "abc"
+
+def test_sampling_applies_to_child_loggers_but_not_warnings():
+    policy = PolicyFilter(sampling={"app.routes": 0.0}, rate_limits={})
+    assert not policy.filter(_record("app.routes.tasks"))
+    assert policy.filter(_record("app.routes.tasks", level=logging.WARNING))
+    assert policy.filter(_record("app.events"))
+
+def test_rate_limit():
+    policy = PolicyFilter(sampling={}, rate_limits={"app.routes.users": 3})
+    kept = sum(policy.filter(_record("app.routes.users")) for _ in range(10))
+    assert kept == 3
+
+def test_records_are_queued_unformatted_and_dropped_when_full():
+    handler = DeferredQueueHandler(queue.Queue(maxsize=1))
+    record = _record("app")
+    handler.handle(record)
+    handler.handle(_record("app"))
+    assert handler.queue.get_nowait() is record
+    assert not hasattr(record, "message"), "Message was formatted on the calling thread"
+    assert handler.dropped == 1
+
+def test_mutable_arguments_are_formatted_when_queued():
+    handler = DeferredQueueHandler(queue.Queue())
+    user_ids = {"a"}
+    handler.handle(_record("app", msg="users %s", args=(user_ids,)))
+    user_ids.add("b")
+    assert handler.queue.get_nowait().getMessage() == "users {'a'}"
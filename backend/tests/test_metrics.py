@@ -0,0 +1,35 @@
+from types import SimpleNamespace
+import pytest
+from httpx import AsyncClient
+from app import metrics
+
+def _command(name: str, micros: int):
+    return SimpleNamespace(command_name=name, duration_micros=micros)
+
+def test_commands_are_attributed_to_the_current_request():
+    timings = metrics.RequestTimings({"root_path": ""})
+    token = metrics._current_request.set(timings)
+    try:
+        metrics.command_listener.succeeded(_command("find", 1500))
+        metrics.command_listener.failed(_command("find", 500))
+        metrics.command_listener.succeeded(_command("update", 1000))
+    finally:
+        metrics._current_request.reset(token)
+
+    assert timings.commands == {"find": [2, 0.002], "update": [1, 0.001]}
+    assert 'db;dur=3.0;desc="3 commands"' in timings.server_timing()
+
+def test_background_commands_are_labelled():
+    before = metrics.mongo_commands.series.get((metrics.BACKGROUND_METHOD, metrics.BACKGROUND_ROUTE, "hello"), 0)
+    metrics.command_listener.succeeded(_command("hello", 100))
+    assert metrics.mongo_commands.series[(metrics.BACKGROUND_METHOD, metrics.BACKGROUND_ROUTE, "hello")] == before + 1
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_and_server_timing(async_client: AsyncClient):
+    response = await async_client.get("/")
+    assert response.headers["Server-Timing"].startswith("app;dur=")
+
+    response = await async_client.get("/metrics")
+    assert response.status_code == 200
+    assert 'http_requests_total{method="GET",route="/",status="200"}' in response.text
+    assert "# TYPE http_request_duration_seconds histogram" in response.text
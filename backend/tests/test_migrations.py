@@ -0,0 +1,24 @@
+import pytest
+from bson import ObjectId
+from app.db import db
+from app.migrations import MIGRATIONS_COLLECTION, strip_collection
+
+@pytest.mark.asyncio
+async def test_strip_embedded_arrays_resumes_from_checkpoint():
+    """Documents before the checkpoint are skipped, the rest lose their arrays, and reruns are no-ops."""
+    collection = "migration_test_groups"
+    checkpoint_id = f"strip_embedded_arrays:{collection}"
+    ids = sorted(ObjectId() for _ in range(5))
+    await db[collection].insert_many([{"_id": oid, "name": "Board", "tasks": [ObjectId()]} for oid in ids])
+    # ✅ A previous run stopped after the second document
+    await db[MIGRATIONS_COLLECTION].insert_one({"_id": checkpoint_id, "last_id": ids[1]})
+    try:
+        report = await strip_collection(collection, ["tasks"], batch_size=2)
+        assert (report["scanned"], report["modified"]) == (3, 3)
+
+        remaining = {doc["_id"] for doc in await db[collection].find({"tasks": {"$exists": True}}).to_list(length=None)}
+        assert remaining == set(ids[:2])
+        assert (await strip_collection(collection, ["tasks"]))["scanned"] == 0
+    finally:
+        await db[collection].drop()
+        await db[MIGRATIONS_COLLECTION].delete_one({"_id": checkpoint_id})
@@ -0,0 +1,18 @@
+import pytest
+from passlib.hash import bcrypt
+from app.passwords import hash_password, verify_password, needs_rehash, pool_stats
+
+@pytest.mark.asyncio
+async def test_hash_and_verify_in_pool():
+    hashed = await hash_password("password123")
+    assert await verify_password("password123", hashed)
+    assert not await verify_password("wrong", hashed)
+    assert not needs_rehash(hashed)
+
+    stats = pool_stats()
+    assert stats["queued"] == 0 and stats["running"] == 0
+    assert stats["completed"] >= 3
+
+def test_needs_rehash_when_cost_changes():
+    cheap_hash = bcrypt.using(rounds=4).hash("password123")
+    assert needs_rehash(cheap_hash)
@@ -0,0 +1,75 @@
+import io
+import os
+import struct
+import zlib
+import pytest
+from PIL import Image
+from fastapi import HTTPException, UploadFile
+from app.photos import UPLOAD_FOLDER, save_photo
+
+def _png_bytes(color) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (300, 200), color).save(buffer, "PNG")
+    return buffer.getvalue()
+
+@pytest.mark.asyncio
+async def test_signup_photo_is_deduplicated_and_thumbnailed(async_client):
+    image = _png_bytes((200, 30, 30))
+    urls = []
+    for unique_id in (1, 2):
+        response = await async_client.post(
+            "/api/users/signup",
+            files={"photo": ("avatar.png", image, "image/png")},
+            data={
+                "username": f"photo_user{unique_id}_{os.getpid()}",
+                "first_name": "Photo",
+                "last_name": "User",
+                "email": f"photo_user{unique_id}_{os.getpid()}@example.com",
+                "password": "password123",
+            },
+        )
+        assert response.status_code == 200, f"Signup with photo failed: {response.text}"
+        urls.append(response.json()["photo_url"])
+
+    assert urls[0] == urls[1], "Identical uploads must share one stored file"
+    digest = os.path.splitext(os.path.basename(urls[0]))[0]
+    with Image.open(os.path.join(UPLOAD_FOLDER, f"{digest}_thumb.webp")) as thumbnail:
+        assert thumbnail.size == (128, 128)
+
+    # ✅ Content-addressed avatars are cached forever and revalidate with a 304
+    response = await async_client.get(urls[0])
+    assert response.status_code == 200
+    assert "immutable" in response.headers["cache-control"]
+    etag = response.headers["etag"]
+    response = await async_client.get(urls[0], headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+@pytest.mark.asyncio
+async def test_signup_rejects_non_image(async_client):
+    response = await async_client.post(
+        "/api/users/signup",
+        files={"photo": ("avatar.png", b"not an image", "image/png")},
+        data={
+            "username": f"bad_photo_{os.getpid()}",
+            "first_name": "Bad",
+            "last_name": "Photo",
+            "email": f"bad_photo_{os.getpid()}@example.com",
+            "password": "password123",
+        },
+    )
+    assert response.status_code == 400
+
+def _bomb_png_bytes() -> bytes:
+    """A tiny PNG whose header claims far more pixels than Pillow agrees to decode."""
+    data = bytearray(_png_bytes((0, 0, 0)))
+    ihdr = struct.pack(">II", 100_000, 100_000) + bytes(data[24:29])
+    data[16:29] = ihdr
+    data[29:33] = struct.pack(">I", zlib.crc32(b"IHDR" + ihdr))
+    return bytes(data)
+
+@pytest.mark.asyncio
+async def test_decompression_bomb_is_rejected():
+    upload = UploadFile(io.BytesIO(_bomb_png_bytes()), filename="bomb.png")
+    with pytest.raises(HTTPException) as error:
+        await save_photo(upload)
+    assert error.value.status_code == 400
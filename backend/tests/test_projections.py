@@ -0,0 +1,38 @@
+import ast
+from pathlib import Path
+import pytest
+
+APP_DIR = Path(__file__).resolve().parent.parent / "app"
+CHECKED_FILES = sorted(APP_DIR.glob("routes/*.py")) + [APP_DIR / "crud.py", APP_DIR / "export.py"]
+
+# method name -> index of the positional projection argument
+READ_METHODS = {"find": 1, "find_one": 1, "find_one_and_update": None, "find_one_and_delete": None, "find_one_and_replace": None}
+PAGINATE_PROJECTION_ARG = 4
+
+def _unprojected_reads(path: Path) -> list:
+    """`file:line` of every MongoDB read in `path` that does not pass a projection."""
+    found = []
+    for node in ast.walk(ast.parse(path.read_text(encoding="utf-8"))):
+        if not isinstance(node, ast.Call):
+            continue
+        keywords = {kw.arg for kw in node.keywords}
+        if isinstance(node.func, ast.Attribute) and node.func.attr in READ_METHODS:
+            position = READ_METHODS[node.func.attr]
+            projected = "projection" in keywords or (position is not None and len(node.args) > position)
+        elif isinstance(node.func, ast.Name) and node.func.id == "paginate":
+            projected = "projection" in keywords or len(node.args) > PAGINATE_PROJECTION_ARG
+        else:
+            continue
+        if not projected:
+            found.append(f"{path.relative_to(APP_DIR.parent)}:{node.lineno}")
+    return found
+
+@pytest.mark.parametrize("path", CHECKED_FILES, ids=lambda path: path.name)
+def test_reads_are_projected(path):
+    unprojected = _unprojected_reads(path)
+    assert not unprojected, f"Reads without a projection from app/projections.py: {unprojected}"
+
+def test_password_hash_only_read_by_login():
+    from app import projections
+    carrying_hash = [name for name, value in vars(projections).items() if isinstance(value, dict) and "hashed_password" in value]
+    assert carrying_hash == ["USER_LOGIN"]
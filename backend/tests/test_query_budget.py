@@ -0,0 +1,34 @@
+import pytest
+from httpx import AsyncClient
+from app import metrics
+from app.main import app
+from .query_budget import QUERY_BUDGETS, QueryBudgetExceeded, _measure, _snapshot, check_budgets
+
+def test_every_api_route_has_a_budget():
+    routes = {(method, route.path) for route in app.routes if hasattr(route, "methods") for method in route.methods}
+    routes -= {("GET", "/metrics"), ("HEAD", "/metrics")}
+    api_routes = {key for key in routes if key[0] != "HEAD" and not key[1].startswith(("/docs", "/redoc", "/openapi"))}
+    assert api_routes <= set(QUERY_BUDGETS), f"Declare budgets for: {sorted(api_routes - set(QUERY_BUDGETS))}"
+
+def test_over_budget_request_fails():
+    before = _snapshot()
+    metrics.requests_total.inc(("GET", "/api/users/me", "200"))
+    metrics.mongo_commands.inc(("GET", "/api/users/me", "find"), 2)
+    with pytest.raises(QueryBudgetExceeded):
+        check_budgets(_measure(before))
+
+def test_commands_are_counted_once_per_method_and_route():
+    before = _snapshot()
+    metrics.requests_total.inc(("GET", "/api/tasks/", "200"))
+    metrics.requests_total.inc(("GET", "/api/tasks/", "304"))
+    metrics.requests_total.inc(("DELETE", "/api/tasks/{task_id}", "200"))
+    metrics.mongo_commands.inc(("GET", "/api/tasks/", "find"), 3)
+    metrics.mongo_commands.inc(("PATCH", "/api/tasks/{task_id}", "update"), 2)
+    metrics.mongo_commands.inc(("DELETE", "/api/tasks/{task_id}", "delete"), 1)
+    assert sorted(_measure(before)) == [("DELETE", "/api/tasks/{task_id}", 1), ("GET", "/api/tasks/", 3)]
+
+@pytest.mark.asyncio
+async def test_query_budget_block(async_client: AsyncClient, query_budget):
+    async with query_budget(0):
+        response = await async_client.get("/")
+    assert response.status_code == 200
@@ -0,0 +1,81 @@
+from types import SimpleNamespace
+import pytest
+from bson import Timestamp
+from httpx import AsyncClient
+from pymongo.read_preferences import SecondaryPreferred
+from app import causal
+from app.causal import CAUSAL_TOKEN_HEADER, CausalPoint, CallerClocks, decode_token, encode_token
+from app.db import db
+from app.read_routing import parse_read_policy
+from .test_users import test_signup
+from .test_groups import test_create_group, test_group
+
+def _cluster_time(seconds: int) -> dict:
+    return {"clusterTime": Timestamp(seconds, 1), "signature": {"hash": b"\x00" * 20, "keyId": 0}}
+
+def test_read_policy_parsing():
+    policy = parse_read_policy("get_tasks=secondaryPreferred, get_all_users=primary")
+    assert isinstance(policy["get_tasks"], SecondaryPreferred)
+    assert policy["get_all_users"].mode == 0
+    with pytest.raises(ValueError):
+        parse_read_policy("get_tasks=secondaryOnly")
+
+def test_causal_token_round_trip():
+    point = CausalPoint(Timestamp(1700000000, 7), _cluster_time(1700000000))
+    decoded = decode_token(encode_token(point))
+    assert decoded.operation_time == point.operation_time
+    assert decoded.cluster_time == point.cluster_time
+    assert decode_token("not-a-token") is None
+
+def test_caller_clocks_keep_the_latest_write():
+    clocks = CallerClocks(max_size=2)
+    clocks.record("alice", CausalPoint(Timestamp(20, 1)))
+    clocks.record("alice", CausalPoint(Timestamp(10, 1)))  # an older write finishing late
+    assert clocks.get("alice").operation_time == Timestamp(20, 1)
+
+    clocks.record("bob", CausalPoint(Timestamp(30, 1)))
+    clocks.record("carol", CausalPoint(Timestamp(40, 1)))
+    assert clocks.get("alice") is None  # least recently written caller evicted
+
+def test_listener_records_only_writes_of_the_current_request():
+    clock = causal.RequestClock(caller=None, read_after=None)
+    token = causal._current_clock.set(clock)
+    try:
+        for name, seconds in (("find", 50), ("update", 20), ("insert", 10)):
+            reply = {"ok": 1, "operationTime": Timestamp(seconds, 1), "$clusterTime": _cluster_time(seconds)}
+            causal.causal_listener.succeeded(SimpleNamespace(command_name=name, reply=reply))
+    finally:
+        causal._current_clock.reset(token)
+    assert clock.written.operation_time == Timestamp(20, 1)
+
+async def _is_replica_set() -> bool:
+    return "setName" in await db.client.admin.command("hello")
+
+@pytest.mark.asyncio
+async def test_read_your_writes_on_secondaries(async_client: AsyncClient, test_user_fixture: dict):
+    """Against a replica set (see docker-compose.replicaset.yml): the write is visible on the very next read."""
+    if not await _is_replica_set():
+        pytest.skip("Needs a MongoDB replica set")
+    if "access_token" not in test_user_fixture:
+        await test_signup(async_client, test_user_fixture)
+    if "group_id" not in test_group:
+        await test_create_group(async_client, test_user_fixture)
+    headers = {"Authorization": f"Bearer {test_user_fixture['access_token']}"}
+
+    response = await async_client.post("/api/tasks/", headers=headers, json={
+        "title": "Causal task", "status": "Not Started", "priority": "Low", "board_id": test_group["group_id"], "deadline": None,
+    })
+    assert response.status_code == 200
+    assert CAUSAL_TOKEN_HEADER in response.headers
+    task_id = response.json()["task_id"]
+
+    for status in ("Working on It", "Done", "Not Started", "Done"):
+        response = await async_client.patch(f"/api/tasks/{task_id}", json={"status": status}, headers=headers)
+        assert response.status_code == 200
+        tasks = (await async_client.get("/api/tasks/", params={"board_id": test_group["group_id"]}, headers=headers)).json()
+        assert {task["id"]: task["status"] for task in tasks}[task_id] == status
+
+        # ✅ A caller without the Authorization key can send the token back instead
+        token = {CAUSAL_TOKEN_HEADER: response.headers[CAUSAL_TOKEN_HEADER]}
+        dashboard = await async_client.get(f"/api/groups/{test_group['group_id']}/dashboard", headers=token)
+        assert dashboard.status_code == 200
@@ -1,9 +1,15 @@
+import json
 from datetime import datetime
 import pytest
 from httpx import AsyncClient
 from app.main import app
 from .test_users import test_signup
 from .test_groups import test_create_group, test_group
+from app.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
+from app.responses import model_response
+from app.routes.tasks import board_tasks_adapter
+from app.serializers import board_task_response
+from bson import ObjectId
 
 # ✅ Store test task globally
 test_task = {}
@@ -54,6 +60,93 @@ async def test_get_tasks(async_client: AsyncClient, test_user_fixture: dict):
     response_data = response.json()
     assert isinstance(response_data, list), "Expected a list of tasks"
 
+@pytest.mark.asyncio
+async def test_get_tasks_pagination(async_client: AsyncClient, test_user_fixture: dict):
+    headers = {"Authorization": f"Bearer {test_user_fixture['access_token']}"}
+    seen = []
+    cursor = None
+    for _ in range(3):
+        params = {"limit": 1, **({"cursor": cursor} if cursor else {})}
+        response = await async_client.get("/api/tasks/", params=params, headers=headers)
+        assert response.status_code == 200, f"Get tasks page failed: {response.text}"
+        page = response.json()
+        assert len(page) <= 1, "Page larger than limit"
+        seen.extend(task["id"] for task in page)
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if not cursor:
+            break
+    assert len(seen) == len(set(seen)), "Pages overlap"
+
+@pytest.mark.asyncio
+async def test_export_tasks(async_client: AsyncClient, test_user_fixture: dict):
+    response = await async_client.get("/api/tasks/export", params={"board_id": test_group["group_id"], "format": "ndjson"})
+    assert response.status_code == 200, f"Export failed: {response.text}"
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert test_task["id"] in [row["id"] for row in rows], "Created task missing from export"
+
+    response = await async_client.get("/api/tasks/export", params={"board_id": test_group["group_id"], "format": "csv"})
+    assert response.status_code == 200, f"CSV export failed: {response.text}"
+    assert response.text.splitlines()[0].startswith("id,title,")
+
+def test_cursor_round_trip():
+    oid = ObjectId()
+    assert decode_cursor(encode_cursor(oid)) == oid
+
+def test_board_task_serialization():
+    user_id, board_id = ObjectId(), ObjectId()
+    task = {
+        "_id": ObjectId(), "title": "Ship", "status": "Done", "priority": "High", "board_id": board_id,
+        "deadline": datetime(2025, 3, 1), "assigned_to": [str(user_id)], "created_by": user_id,
+    }
+    body = model_response(board_tasks_adapter, [board_task_response(task, {str(user_id): "alice"})]).body
+    assert json.loads(body) == [{
+        "id": str(task["_id"]), "title": "Ship", "description": "", "status": "Done", "priority": "High",
+        "board_id": str(board_id), "deadline": "2025-03-01T00:00:00", "assigned_to": ["alice"],
+        "assigned_to_ids": [str(user_id)], "created_by": str(user_id),
+    }]
+
+@pytest.mark.asyncio
+async def test_bulk_tasks(async_client: AsyncClient, test_user_fixture: dict):
+    headers = {"Authorization": f"Bearer {test_user_fixture['access_token']}"}
+    new_task = {
+        "title": "Bulk Task",
+        "description": "Created in bulk",
+        "status": "Not Started",
+        "priority": "Low",
+        "board_id": test_group["group_id"],
+        "deadline": None,
+    }
+    response = await async_client.post(
+        "/api/tasks/bulk",
+        json={"operations": [
+            {"op": "create", "task": new_task},
+            {"op": "create", "task": new_task},
+            {"op": "update", "task_id": test_task["id"], "changes": {"priority": "High"}},
+            {"op": "delete", "task_id": str(ObjectId())},
+            {"op": "update", "task_id": test_task["id"], "changes": {"board_id": str(ObjectId())}},
+        ]},
+        headers=headers,
+    )
+    assert response.status_code == 200, f"Bulk request failed: {response.text}"
+    data = response.json()
+    assert [result["status"] for result in data["results"]] == ["ok", "ok", "ok", "error", "error"]
+    assert data["succeeded"] == 3 and data["failed"] == 2
+    assert data["results"][4]["error"] == "Fields cannot be updated: board_id"
+
+    created = [result["task_id"] for result in data["results"][:2]]
+    response = await async_client.post(
+        "/api/tasks/bulk",
+        json={"operations": [
+            {"op": "update", "task_id": created[0], "changes": {"status": "Completed"}},
+            *({"op": "delete", "task_id": task_id} for task_id in created),
+            {"op": "update", "task_id": created[1], "changes": {"priority": "High"}},
+        ]},
+        headers=headers,
+    )
+    data = response.json()
+    assert [result["status"] for result in data["results"]] == ["ok", "ok", "ok", "error"], f"Bulk delete failed: {response.text}"
+    assert data["results"][3]["error"] == "Task not found"
+
 @pytest.mark.asyncio
 async def test_update_task(async_client: AsyncClient, test_user_fixture: dict):
     global test_task
@@ -69,6 +162,36 @@ async def test_update_task(async_client: AsyncClient, test_user_fixture: dict):
     response_data = response.json()
     assert response_data.get("message") == "Task updated successfully", "Unexpected response message"
 
+    response = await async_client.patch(
+        f"/api/tasks/{test_task['id']}", json={"board_id": str(ObjectId())}, headers=headers
+    )
+    assert response.status_code == 400, "Moving a task to another board should be rejected"
+    assert response.json()["detail"] == "Fields cannot be updated: board_id"
+
+@pytest.mark.asyncio
+async def test_get_tasks_etag(async_client: AsyncClient, test_user_fixture: dict, query_budget):
+    assert "id" in test_task, "Task must be created first"
+
+    headers = {"Authorization": f"Bearer {test_user_fixture['access_token']}"}
+    url = f"/api/tasks/?board_id={test_group['group_id']}"
+    response = await async_client.get(url, headers=headers)
+    etag = response.headers["ETag"]
+
+    async with query_budget(1):  # ✅ Only the board version is read
+        response = await async_client.get(url, headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 304, "Unchanged board should not be re-sent"
+
+    # ✅ Any task write moves the board version
+    await async_client.patch(f"/api/tasks/{test_task['id']}", json={"description": "etag"}, headers=headers)
+    response = await async_client.get(url, headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+    # ✅ Another page of the same board version has its own ETag
+    etag = response.headers["ETag"]
+    response = await async_client.get(f"{url}&limit=1", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 200 and response.headers["ETag"] != etag
+
 @pytest.mark.asyncio
 async def test_delete_task(async_client: AsyncClient, test_user_fixture: dict):
     global test_task
@@ -0,0 +1,67 @@
+import asyncio
+import pytest
+from motor.motor_asyncio import AsyncIOMotorClient
+from app import transactions
+from app.config import settings
+
+def _recording(log: list, name: str, delay: float):
+    async def operation(session):
+        log.append(("start", name, session))
+        await asyncio.sleep(delay)
+        log.append(("end", name, session))
+        return name
+    return operation
+
+@pytest.mark.asyncio
+async def test_write_all_runs_in_order_without_transactions(monkeypatch):
+    monkeypatch.setattr(settings, "MONGO_TRANSACTIONS", "off")
+    log = []
+    results = await transactions.write_all(_recording(log, "a", 0.02), _recording(log, "b", 0.01))
+    assert results == ["a", "b"]
+    assert [entry[:2] for entry in log] == [("start", "a"), ("end", "a"), ("start", "b"), ("end", "b")]
+    assert all(session is None for *_, session in log)
+
+@pytest.mark.asyncio
+async def test_write_all_stops_at_the_first_failure(monkeypatch):
+    monkeypatch.setattr(settings, "MONGO_TRANSACTIONS", "off")
+    log = []
+
+    async def failing(session):
+        raise RuntimeError("insert failed")
+
+    with pytest.raises(RuntimeError):
+        await transactions.write_all(failing, _recording(log, "counters", 0))
+    assert log == []
+
+@pytest.mark.asyncio
+async def test_concurrently_gathers_without_a_session():
+    log = []
+    results = await transactions.concurrently(_recording(log, "a", 0.02), _recording(log, "b", 0.01))(None)
+    assert results == ["a", "b"]
+    assert [entry[:2] for entry in log] == [("start", "a"), ("start", "b"), ("end", "b"), ("end", "a")]
+
+@pytest.mark.asyncio
+async def test_concurrently_in_a_session_runs_in_order():
+    log, session = [], object()
+    await transactions.concurrently(_recording(log, "a", 0.02), _recording(log, "b", 0.01))(session)
+    assert [entry[:2] for entry in log] == [("start", "a"), ("end", "a"), ("start", "b"), ("end", "b")]
+    assert all(entry[2] is session for entry in log)
+
+@pytest.mark.asyncio
+async def test_transactions_setting_overrides_detection(monkeypatch):
+    monkeypatch.setattr(settings, "MONGO_TRANSACTIONS", "on")
+    assert await transactions.transactions_supported()
+    monkeypatch.setattr(settings, "MONGO_TRANSACTIONS", "off")
+    assert not await transactions.transactions_supported()
+
+@pytest.mark.asyncio
+async def test_detection_waits_for_an_unknown_topology():
+    client = AsyncIOMotorClient(settings.MONGO_URI)
+    try:
+        assert client.topology_description.topology_type_name == "Unknown"
+        supported = await transactions.detect_transactions(client)
+        topology = client.topology_description.topology_type_name
+        assert topology != "Unknown", "Detection decided before a server was selected"
+        assert supported == (topology in transactions.TRANSACTION_TOPOLOGIES)
+    finally:
+        client.close()
@@ -0,0 +1,51 @@
+import asyncio
+import pytest
+from bson import ObjectId
+from app.db import db
+from app.user_directory import UserDirectory
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_query():
+    user = {"_id": ObjectId(), "username": "directory_user", "email": "directory_user@example.com"}
+    await db.users.insert_one(user)
+    try:
+        directory = UserDirectory(max_size=10, ttl_seconds=60)
+        first, second = await asyncio.gather(
+            directory.get_many([user["_id"]]),
+            directory.get_many([str(user["_id"]), str(ObjectId())]),
+        )
+        assert first[str(user["_id"])]["username"] == "directory_user"
+        assert list(second) == [str(user["_id"])], "Unknown users must be left out"
+        assert directory.batches == 1, "Concurrent misses were not batched"
+
+        await directory.get_many([user["_id"]])
+        assert directory.hits == 1
+
+        directory.invalidate(user["_id"])
+        await directory.get_many([user["_id"]])
+        assert directory.batches == 2, "Invalidated entry was served from cache"
+    finally:
+        await db.users.delete_one({"_id": user["_id"]})
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_break_the_batch():
+    user = {"_id": ObjectId(), "username": "directory_cancel", "email": "directory_cancel@example.com"}
+    await db.users.insert_one(user)
+    try:
+        directory = UserDirectory(max_size=10, ttl_seconds=60)
+        cancelled = asyncio.ensure_future(directory.get_many([user["_id"]]))
+        waiting = asyncio.ensure_future(directory.get_many([user["_id"]]))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        result = await asyncio.wait_for(waiting, timeout=5)
+        assert result[str(user["_id"])]["username"] == "directory_cancel"
+    finally:
+        await db.users.delete_one({"_id": user["_id"]})
+
+@pytest.mark.asyncio
+async def test_lru_eviction():
+    directory = UserDirectory(max_size=2, ttl_seconds=60)
+    for user_id in ("a", "b", "c"):
+        directory._store(user_id, {"username": user_id})
+    assert directory.stats()["size"] == 2
+    assert directory._get_cached("a") is None
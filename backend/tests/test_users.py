@@ -88,3 +88,34 @@ async def test_get_current_user(async_client, test_user_fixture):
     response = await async_client.get("/api/users/me", headers=headers)
 
     assert response.status_code == 200, f"Fetching current user failed: {response.text}"
+
+
+@pytest.mark.asyncio
+async def test_get_current_user_stateless(async_client, test_user_fixture):
+    """Stateless auth mode builds the user from the token claims alone"""
+    from app.config import settings
+    headers = {"Authorization": f"Bearer {test_user_fixture['access_token']}"}
+
+    settings.AUTH_MODE = "stateless"
+    try:
+        response = await async_client.get("/api/users/me", headers=headers)
+    finally:
+        settings.AUTH_MODE = "db"
+
+    assert response.status_code == 200, f"Stateless auth failed: {response.text}"
+    assert response.json()["email"] == test_user_fixture["email"]
+
+@pytest.mark.asyncio
+async def test_logout_revokes_token(async_client, test_user_fixture):
+    """A logged out token is rejected"""
+    response = await async_client.post(
+        "/api/users/login",
+        json={"email": test_user_fixture["email"], "password": "password123"},
+    )
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    response = await async_client.post("/api/users/logout", headers=headers)
+    assert response.status_code == 200, f"Logout failed: {response.text}"
+
+    response = await async_client.get("/api/users/me", headers=headers)
+    assert response.status_code == 401, "Revoked token was accepted"
@@ -230,7 +230,7 @@ const Board = () => {
                     {/* User Avatar */}
                     <div className="avatar-container ">
                         <img 
-                            src={`http://localhost:8000${decodedToken.photo}`} 
+                            src={`http://localhost:8000${decodedToken.photo_thumb || decodedToken.photo}`} 
                             alt="User Avatar" 
                             className="avatar"
                         />
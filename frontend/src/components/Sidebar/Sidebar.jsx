@@ -140,7 +140,7 @@ function Sidebar() {
             <h2>Planner</h2>
             <div className="avatar-container">
                 <img 
-                    src={`http://localhost:8000${decodedToken.photo}`} 
+                    src={`http://localhost:8000${decodedToken.photo_thumb || decodedToken.photo}`} 
                     alt="User Avatar" 
                     className="avatar"
                 />